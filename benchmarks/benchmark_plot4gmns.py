@@ -0,0 +1,322 @@
+# -*- coding:utf-8 -*-
+##############################################################
+# Created Date: Monday, October 19th 2026
+# Contact Info: luoxiangyong01@gmail.com
+# Author/Copyright: Mr. Xiangyong Luo
+##############################################################
+"""Benchmark suite of plot4gmns on synthetic GMNS networks
+
+Times the package import, generate_multi_network_from_csv, every extract_coordinates_by_*
+function and every show_* function at the given scales, and writes the results to a JSON
+file, so that results of different versions can be compared. The roundtrip cases save the
+network with save_multi_network and check that the reloaded layers equal the loaded ones. The
+cache case draws a figure with a miss and a hit of the figure cache, and checks that the hit
+leaves the same selection as the miss.
+
+Usage:
+    python benchmarks/benchmark_plot4gmns.py --links 10000 100000 --zones 100 --output bench.json
+    python benchmarks/benchmark_plot4gmns.py --links 10000 --compare bench_old.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# run against the source tree of this checkout
+repo_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.insert(0, repo_dir)
+
+import matplotlib  # noqa: E402
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+import plot4gmns as p4g  # noqa: E402
+from plot4gmns import func_lib  # noqa: E402
+from plot4gmns import plot4gmns as p4g_plot  # noqa: E402
+from plot4gmns.synthetic_lib import generate_synthetic_network  # noqa: E402
+
+
+def time_call(func, repeat: int = 3) -> dict:
+    # wall time of repeated calls in seconds
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+        plt.close('all')
+    return {'min': min(runs), 'median': statistics.median(runs), 'runs': runs}
+
+
+# import statements timed in fresh interpreters, and heavy dependencies reported if they were loaded
+import_cases = {
+    'import plot4gmns': 'import plot4gmns',
+    'import generate_multi_network_from_csv': 'from plot4gmns import generate_multi_network_from_csv',
+    'import show_network_by_modes': 'from plot4gmns import show_network_by_modes'}
+heavy_modules = ['keplergl', 'seaborn', 'matplotlib.pyplot', 'shapely', 'pandas']
+
+
+def time_import(statement: str, repeat: int = 3) -> dict:
+    # wall time of an import statement in a new interpreter, so that no module is cached
+    code = ("import sys, time, json\n"
+            "start = time.perf_counter()\n"
+            f"{statement}\n"
+            "wall_time = time.perf_counter() - start\n"
+            f"print(json.dumps([wall_time, [m for m in {heavy_modules!r} if m in sys.modules]]))")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([repo_dir, os.environ.get('PYTHONPATH', '')]))
+    runs, modules = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+        wall_time, modules = json.loads(output.stdout.strip().splitlines()[-1])
+        runs.append(wall_time)
+    return {'min': min(runs), 'median': statistics.median(runs), 'runs': runs, 'loaded_modules': modules}
+
+
+def run_import_cases(repeat: int) -> dict:
+    results = {}
+    for name, statement in import_cases.items():
+        results[name] = time_import(statement, repeat)
+        print(f"{name}: {results[name]['median']:.4f} s, loaded {results[name]['loaded_modules']}")
+    return results
+
+
+def get_origins(mnet, number_of_origins: int = 1) -> list:
+    # node ids spread evenly over the node table, the first one is in the middle of the synthetic grid
+    node_ids = mnet.node.value['node_id'].to_numpy()
+    return node_ids[(len(node_ids) // 2 + np.arange(number_of_origins) * (len(node_ids) // number_of_origins))
+                    % len(node_ids)].tolist()
+
+
+def set_demand_periods(mnet, number_of_periods: int = 24) -> None:
+    # the synthetic demand has no time periods, its rows are spread over hourly periods
+    if mnet.demand_loaded and 'time_period' not in mnet.demand.value.columns:
+        mnet.demand.value['time_period'] = np.arange(len(mnet.demand.value)) % number_of_periods
+
+
+def get_extract_cases(mnet) -> dict:
+    return {
+        'extract_coordinates_by_network_mode': lambda: func_lib.extract_coordinates_by_network_mode(mnet, ['bike']),
+        'extract_coordinates_by_node_types':
+            lambda: func_lib.extract_coordinates_by_node_types(mnet, ['traffic_signals', 'crossing']),
+        'extract_coordinates_by_link_types':
+            lambda: func_lib.extract_coordinates_by_link_types(mnet, ['primary', 'secondary']),
+        'extract_coordinates_by_link_lane': lambda: func_lib.extract_coordinates_by_link_lane(mnet, (1, 2)),
+        'extract_coordinates_by_link_free_speed':
+            lambda: func_lib.extract_coordinates_by_link_free_speed(mnet, (20, 60)),
+        'extract_coordinates_by_link_length': lambda: func_lib.extract_coordinates_by_link_length(mnet, (0, 100)),
+        'extract_coordinates_by_link_attr_distribution':
+            lambda: func_lib.extract_coordinates_by_link_attr_distribution(mnet, 'lanes'),
+        'extract_coordinates_by_poi_type': lambda: func_lib.extract_coordinates_by_poi_type(mnet, ['school', 'park']),
+        'extract_coordinates_by_poi_attr_distribution':
+            lambda: func_lib.extract_coordinates_by_poi_attr_distribution(mnet, 'attraction'),
+        'count_demand_matrix': lambda: func_lib.count_demand_matrix(mnet),
+        'extract_coordinates_by_demand_OD': lambda: func_lib.extract_coordinates_by_demand_OD(mnet, True, True),
+        'extract_coordinates_by_connected_components':
+            lambda: func_lib.extract_coordinates_by_connected_components(mnet, 'auto', 'strong'),
+        'extract_coordinates_by_travel_time':
+            lambda: func_lib.extract_coordinates_by_travel_time(mnet, get_origins(mnet), 'auto'),
+        'extract_coordinates_by_travel_time_10_origins':
+            lambda: func_lib.extract_coordinates_by_travel_time(mnet, get_origins(mnet, 10), 'auto'),
+        'extract_demand_OD_by_periods': lambda: func_lib.extract_demand_OD_by_periods(mnet, 'time_period')}
+
+
+def get_show_cases(mnet, output_dir: str) -> dict:
+    kwargs = {'output_dir': output_dir}
+    return {
+        'show_network_by_modes': lambda: p4g_plot.show_network_by_modes(mnet, ['all'], **kwargs),
+        'show_network_by_node_types':
+            lambda: p4g_plot.show_network_by_node_types(mnet, ['traffic_signals', 'crossing'], **kwargs),
+        'show_network_by_link_types':
+            lambda: p4g_plot.show_network_by_link_types(mnet, ['primary', 'secondary'], **kwargs),
+        'show_network_by_link_lanes': lambda: p4g_plot.show_network_by_link_lanes(mnet, 1, 2, **kwargs),
+        'show_network_by_link_free_speed': lambda: p4g_plot.show_network_by_link_free_speed(mnet, 20, 60, **kwargs),
+        'show_network_by_link_length': lambda: p4g_plot.show_network_by_link_length(mnet, 0, 100, **kwargs),
+        'show_network_by_link_lane_distribution':
+            lambda: p4g_plot.show_network_by_link_lane_distribution(mnet, **kwargs),
+        'show_network_by_link_capacity_distribution':
+            lambda: p4g_plot.show_network_by_link_capacity_distribution(mnet, **kwargs),
+        'show_network_by_link_free_speed_distribution':
+            lambda: p4g_plot.show_network_by_link_free_speed_distribution(mnet, **kwargs),
+        'show_network_by_poi_types': lambda: p4g_plot.show_network_by_poi_types(mnet, ['school', 'park'], **kwargs),
+        'show_network_by_poi_production_distribution':
+            lambda: p4g_plot.show_network_by_poi_production_distribution(mnet, **kwargs),
+        'show_network_by_poi_attraction_distribution':
+            lambda: p4g_plot.show_network_by_poi_attraction_distribution(mnet, **kwargs),
+        'show_network_demand_matrix_heatmap': lambda: p4g_plot.show_network_demand_matrix_heatmap(mnet, **kwargs),
+        'show_network_by_demand_OD':
+            lambda: p4g_plot.show_network_by_demand_OD(mnet, load_zone=True, load_network=True, **kwargs),
+        'show_network_by_connected_components':
+            lambda: p4g_plot.show_network_by_connected_components(mnet, 'auto', 'strong', **kwargs),
+        'show_network_by_travel_time':
+            lambda: p4g_plot.show_network_by_travel_time(mnet, get_origins(mnet), 'auto', **kwargs),
+        'animate_network_by_demand_OD':
+            lambda: p4g_plot.animate_network_by_demand_OD(mnet, 'time_period', load_network=True, **kwargs)}
+
+
+def get_scenario_cases(mnet, output_dir: str, number_of_changes: int = 100) -> dict:
+    # scenarios of a small delta on the synthetic network: wider links, and closed links
+    link_ids = mnet.link.value['link_id'].to_numpy()
+    number_of_changes = min(number_of_changes, len(link_ids) // 2)
+    lanes = mnet.link.value['lanes'].to_numpy()
+    sset = p4g.ScenarioSet(mnet)
+    sset.add_scenario('widening', modified_links=pd.DataFrame({'link_id': link_ids[:number_of_changes],
+                                                               'lanes': lanes[:number_of_changes] + 1}))
+    sset.add_scenario('closure', removed_links=link_ids[-number_of_changes:].tolist())
+    kwargs = {'output_dir': output_dir}
+    return {
+        'show_scenarios_side_by_side': lambda: p4g_plot.show_scenarios_side_by_side(sset, column='lanes', **kwargs),
+        'show_scenario_differences': lambda: p4g_plot.show_scenario_differences(sset, column='lanes', **kwargs)}
+
+
+def check_roundtrip(mnet, output_dir: str, file_format: str) -> None:
+    # save the network, load it again and compare the rows and vertices of each layer
+    roundtrip_dir = tempfile.mkdtemp(prefix=f'p4g_roundtrip_{file_format}_', dir=output_dir)
+    p4g.save_multi_network(mnet, roundtrip_dir, file_format=file_format)
+    reloaded = p4g.generate_multi_network_from_csv(roundtrip_dir, file_format=file_format, isVisMap=False)
+    layers = {'node': (mnet.node, reloaded.node), 'link': (mnet.link, reloaded.link), 'poi': (mnet.POI, reloaded.POI),
+              'demand': (mnet.demand, reloaded.demand), 'zone': (mnet.zone, reloaded.zone)}
+    for element, (layer, reloaded_layer) in layers.items():
+        if layer.value is None:
+            continue
+        if reloaded_layer.value is None or len(reloaded_layer.value) != len(layer.value):
+            raise Exception(f"{element} layer is not reloaded with {len(layer.value)} rows")
+        if getattr(layer, 'geometry', None) is not None and reloaded_layer.geometry is not None:
+            coords = layer.geometry.take(layer.value['geometry_id'].to_numpy()).coords
+            reloaded_coords = reloaded_layer.geometry.take(reloaded_layer.value['geometry_id'].to_numpy()).coords
+            if not np.allclose(coords, reloaded_coords, equal_nan=True):
+                raise Exception(f"{element} geometries differ after the roundtrip")
+
+
+def get_roundtrip_cases(mnet, output_dir: str) -> dict:
+    return {f'save_and_load_{file_format}': (lambda file_format=file_format: check_roundtrip(mnet, output_dir, file_format))
+            for file_format in ['parquet', 'feather', 'csv']}
+
+
+def check_figure_cache(mnet, output_dir: str) -> None:
+    # a hit skips drawing only, the selection must equal the one of the miss, e.g. for export_network_layer
+    figure_cache = mnet.figure_cache
+    mnet.figure_cache = p4g.FigureCache(tempfile.mkdtemp(prefix='p4g_figure_cache_', dir=output_dir))
+    try:
+        p4g_plot.show_network_by_modes(mnet, ['bike'], output_dir=output_dir)
+        selected_index = mnet.link.selected_index
+        p4g_plot.show_network_by_modes(mnet, ['all'], output_dir=output_dir)
+        p4g_plot.show_network_by_modes(mnet, ['bike'], output_dir=output_dir)
+        if len(mnet.figure_cache._entries()) != 2:
+            raise Exception("figures are not cached")
+        if not mnet.link.selected_index.equals(selected_index):
+            raise Exception("selection after a figure cache hit differs from the one after a miss")
+    finally:
+        mnet.figure_cache = figure_cache
+
+
+def run_scale(number_of_links: int, number_of_zones: int, data_dir: str, output_dir: str,
+              repeat: int, cases: list) -> dict:
+    # generate the synthetic network once and reuse it in later runs
+    dataset_dir = os.path.join(data_dir, f"synthetic_{number_of_links}_links_{number_of_zones}_zones")
+    if not os.path.exists(os.path.join(dataset_dir, 'demand.csv')):
+        generate_synthetic_network(dataset_dir, number_of_links=number_of_links, number_of_zones=number_of_zones)
+
+    results = {}
+    mnet = None
+
+    def load():
+        nonlocal mnet
+        mnet = p4g.generate_multi_network_from_csv(dataset_dir, output_dir=output_dir, isVisMap=False)
+
+    results['generate_multi_network_from_csv'] = time_call(load, repeat)
+    print(f"generate_multi_network_from_csv: {results['generate_multi_network_from_csv']['median']:.4f} s")
+
+    set_demand_periods(mnet)
+    all_cases = {}
+    if 'extract' in cases:
+        all_cases.update(get_extract_cases(mnet))
+    if 'show' in cases:
+        all_cases.update(get_show_cases(mnet, output_dir))
+        all_cases.update(get_scenario_cases(mnet, output_dir))
+    if 'roundtrip' in cases:
+        all_cases.update(get_roundtrip_cases(mnet, output_dir))
+    if 'cache' in cases:
+        all_cases['show_network_by_modes_cache_hit'] = lambda: check_figure_cache(mnet, output_dir)
+    for name, func in all_cases.items():
+        try:
+            results[name] = time_call(func, repeat)
+            print(f"{name}: {results[name]['median']:.4f} s")
+        except Exception as e:
+            results[name] = {'error': str(e)}
+            print(f"{name}: failed for the reason: {e}")
+    return {'links': number_of_links, 'zones': number_of_zones, 'results': results}
+
+
+def compare_results(results: dict, path_baseline: str) -> None:
+    # print the ratio of median times against a previous result file
+    with open(path_baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    baseline_scales = {(scale['links'], scale['zones']): scale['results'] for scale in baseline['scales']}
+    print(f"\nComparison against {path_baseline} (version {baseline.get('version')}), ratio = new / old")
+    if results.get('import') and baseline.get('import'):
+        print("import:")
+        print_ratios(results['import'], baseline['import'])
+    for scale in results['scales']:
+        baseline_results = baseline_scales.get((scale['links'], scale['zones']))
+        if baseline_results is None:
+            continue
+        print(f"{scale['links']} links, {scale['zones']} zones:")
+        print_ratios(scale['results'], baseline_results)
+
+
+def print_ratios(results: dict, baseline_results: dict) -> None:
+    for name, result in results.items():
+        old = baseline_results.get(name, {})
+        if 'median' in result and 'median' in old and old['median'] > 0:
+            print(f"  {name}: {old['median']:.4f} s -> {result['median']:.4f} s, "
+                  f"ratio {result['median'] / old['median']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark plot4gmns on synthetic GMNS networks")
+    parser.add_argument('--links', type=int, nargs='+', default=[10000], help="number of links of each scale")
+    parser.add_argument('--zones', type=int, default=100, help="number of zones")
+    parser.add_argument('--repeat', type=int, default=3, help="number of runs of each case")
+    parser.add_argument('--cases', nargs='+', default=['import', 'extract', 'show', 'roundtrip', 'cache'],
+                        choices=['import', 'extract', 'show', 'roundtrip', 'cache'],
+                        help="groups of cases to run besides loading")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'p4g_benchmark_data'),
+                        help="directory to cache synthetic networks")
+    parser.add_argument('--output', default='p4g_benchmark_results.json', help="JSON file of results")
+    parser.add_argument('--compare', default=None, help="JSON file of previous results to compare with")
+    args = parser.parse_args()
+
+    output_dir = tempfile.mkdtemp(prefix='p4g_benchmark_fig_')
+    results = {'version': p4g.__version__,
+               'python': platform.python_version(),
+               'platform': platform.platform(),
+               'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+               'repeat': args.repeat,
+               'import': {},
+               'scales': []}
+    if 'import' in args.cases:
+        print("\nBenchmark of package import")
+        results['import'] = run_import_cases(args.repeat)
+    for number_of_links in args.links:
+        print(f"\nBenchmark on {number_of_links} links and {args.zones} zones")
+        results['scales'].append(run_scale(number_of_links, args.zones, args.data_dir, output_dir,
+                                           args.repeat, args.cases))
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nBenchmark results have been saved to {args.output}")
+
+    if args.compare:
+        compare_results(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
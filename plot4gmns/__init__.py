@@ -1,5 +1,5 @@
 
-from ._model import *
+from ._model import __all__, __getattr__
 
 __version__ = '0.1.1'
 __author__ = (
@@ -7,3 +7,7 @@ __author__ = (
     'Zanyang Cui: zanyangcui@outlook.com'
     'Xiangyong Luo: luoxiangyong01@gmail.com'
 )
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
@@ -1,17 +1,56 @@
 
-from .func_lib import generate_multi_network_from_csv
-from .plot4gmns import (show_network_by_modes,
-                        # show_network_by_node_types,
-                        show_network_by_link_types,
-                        show_network_by_link_free_speed,
-                        show_network_by_link_lanes,
-                        show_network_by_link_length,
-                        show_network_by_link_lane_distribution,
-                        show_network_by_link_capacity_distribution,
-                        show_network_by_link_free_speed_distribution,
-                        show_network_by_poi_types,
-                        show_network_by_poi_production_distribution,
-                        show_network_by_poi_attraction_distribution,
-                        show_network_demand_matrix_heatmap,
-                        show_network_by_demand_OD
-                        )
+import sys
+import importlib
+
+# public functions and the modules defining them, modules are imported on first access (PEP 562),
+# so that e.g. keplergl, seaborn and matplotlib are not loaded by "import plot4gmns"
+_lazy_attributes = {
+    'generate_multi_network_from_csv': '.func_lib',
+    'apply_network_delta': '.func_lib',
+    'show_network_by_modes': '.plot4gmns',
+    'show_network_by_node_types': '.plot4gmns',
+    'show_network_by_link_types': '.plot4gmns',
+    'show_network_by_link_free_speed': '.plot4gmns',
+    'show_network_by_link_lanes': '.plot4gmns',
+    'show_network_by_link_length': '.plot4gmns',
+    'show_network_by_link_lane_distribution': '.plot4gmns',
+    'show_network_by_link_capacity_distribution': '.plot4gmns',
+    'show_network_by_link_free_speed_distribution': '.plot4gmns',
+    'show_network_by_poi_types': '.plot4gmns',
+    'show_network_by_poi_production_distribution': '.plot4gmns',
+    'show_network_by_poi_attraction_distribution': '.plot4gmns',
+    'show_network_demand_matrix_heatmap': '.plot4gmns',
+    'show_network_by_demand_OD': '.plot4gmns',
+    'animate_network_by_demand_OD': '.plot4gmns',
+    'show_scenarios_side_by_side': '.plot4gmns',
+    'show_scenario_differences': '.plot4gmns',
+    'show_network_by_connected_components': '.plot4gmns',
+    'show_network_by_travel_time': '.plot4gmns',
+    'export_network_layer': '.export_lib',
+    'export_layer_to_geojson': '.export_lib',
+    'export_layer_to_flatgeobuf': '.export_lib',
+    'export_layer_to_csv': '.export_lib',
+    'export_layer_to_parquet': '.export_lib',
+    'export_layer_to_feather': '.export_lib',
+    'save_multi_network': '.export_lib',
+    'PipelineStats': '.stats_lib',
+    'add_stats_callback': '.stats_lib',
+    'remove_stats_callback': '.stats_lib',
+    'generate_synthetic_network': '.synthetic_lib',
+    'ScenarioSet': '.scenario_lib',
+    'NetworkGraph': '.graph_lib',
+    'get_network_graph': '.graph_lib',
+    'validate_multi_network': '.validation_lib',
+    'NetworkView': '.view_lib',
+    'FigureCache': '.cache_lib'}
+
+__all__ = list(_lazy_attributes)
+
+
+def __getattr__(name: str):
+    if name not in _lazy_attributes:
+        raise AttributeError(f"module 'plot4gmns' has no attribute '{name}'")
+    value = getattr(importlib.import_module(_lazy_attributes[name], __package__), name)
+    # cached in the package namespace, so later accesses do not call __getattr__ again
+    setattr(sys.modules[__package__], name, value)
+    return value
@@ -0,0 +1,235 @@
+# -*- coding:utf-8 -*-
+##############################################################
+# Created Date: Monday, October 19th 2026
+# Contact Info: luoxiangyong01@gmail.com
+# Author/Copyright: Mr. Xiangyong Luo
+##############################################################
+
+import os
+import shutil
+import inspect
+import functools
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+import matplotlib.image as mpl_image
+from matplotlib.colors import Colormap
+from .network import MultiNet
+from .utility_lib import get_object_digest, generate_absolute_path, path2linux
+
+# environment variable of the figure cache directory for all MultiNet objects, e.g. P4G_FIGURE_CACHE=./p4g_cache
+figure_cache_env_var = 'P4G_FIGURE_CACHE'
+
+# parameters of show_* functions which do not change the figure, or disable the cache
+uncached_parameters = ['mnet', 'fig_obj', 'isSave2png', 'output_dir']
+
+# MultiNet settings applied at load, the tables are identified by mnet.file_fingerprints and mnet.data_digest
+load_settings = ['link_geometry', 'demand_geometry', 'usecols', 'isDeriveAttributes', 'crs', 'validation']
+
+# rcParams which do not change saved figures
+uncached_rcparams = ['backend', 'interactive', 'webagg.port', 'savefig.directory']
+
+# (FigureCache, key) of the running show_* call, the figure saved by save_figure is stored with the key
+_pending_figure = None
+
+# path of the cached figure of the running show_* call with a cache hit, see show_cached_figure
+_cached_figure = None
+
+
+class FigureCache:
+    """a directory of show_* figures keyed by a digest of the data, function, parameters and style
+
+    A figure is stored as {key}.{file name}, e.g. 4f0c...e1.network_by_mode.png. If the cache
+    exceeds max_size, the least recently used figures are removed.
+    """
+
+    def __init__(self, cache_dir: str = './p4g_cache', max_size: int = 500 * 1024 ** 2):
+        """
+        Args:
+            cache_dir (str): directory of the cached figures, created if it does not exist. Defaults to './p4g_cache'.
+            max_size (int): maximum size of the cached figures in bytes. Defaults to 500 MB.
+        """
+        self.cache_dir = path2linux(os.path.abspath(cache_dir))
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def __repr__(self) -> str:
+        return f"FigureCache({self.cache_dir!r}, size={self.size}, max_size={self.max_size})"
+
+    def _entries(self) -> list:
+        # cached figures as os.DirEntry, temporary files of unfinished writes are skipped
+        return [entry for entry in os.scandir(self.cache_dir) if entry.is_file() and not entry.name.endswith('.tmp')]
+
+    @property
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def get(self, key: str) -> str:
+        """path of the cached figure of a key, None if not cached
+
+        The modification time of a hit is updated, as eviction removes the least recently used figures.
+        """
+        for entry in self._entries():
+            if entry.name.startswith(f"{key}."):
+                os.utime(entry.path)
+                return path2linux(entry.path)
+        return None
+
+    def put(self, key: str, path_figure: str) -> str:
+        """copy a figure into the cache, then evict figures until the cache fits max_size
+
+        Returns:
+            str: path of the cached figure
+        """
+        path_cached = path2linux(os.path.join(self.cache_dir, f"{key}.{os.path.basename(path_figure)}"))
+        # write to a temporary file first, so that other processes never read a partial figure
+        shutil.copyfile(path_figure, f"{path_cached}.tmp")
+        os.replace(f"{path_cached}.tmp", path_cached)
+        self.evict()
+        return path_cached
+
+    def evict(self) -> list:
+        """remove the least recently used figures until the cache fits max_size
+
+        Returns:
+            list: paths of the removed figures
+        """
+        entries = sorted(((entry.stat(), entry.path) for entry in self._entries()), key=lambda x: x[0].st_mtime_ns)
+        size = sum(stat.st_size for stat, _ in entries)
+        removed = []
+        for stat, path in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= stat.st_size
+            removed.append(path2linux(path))
+        return removed
+
+    def clear(self) -> None:
+        # remove all cached figures
+        for entry in self._entries():
+            os.remove(entry.path)
+
+
+def get_figure_cache(mnet: MultiNet) -> FigureCache:
+    # mnet.figure_cache has priority over the environment variable, None if the cache is off
+    if mnet.figure_cache is not None:
+        return mnet.figure_cache
+    cache_dir = os.environ.get(figure_cache_env_var, '').strip()
+    return FigureCache(cache_dir) if cache_dir else None
+
+
+def get_style_items(style) -> dict:
+    # nested attributes of a Style object, colormap objects by their colors
+    items = {}
+    for name, value in vars(style).items():
+        if type(value).__module__.startswith('plot4gmns'):
+            value = get_style_items(value)
+        elif isinstance(value, Colormap):
+            value = (value.name, value(np.linspace(0, 1, value.N)))
+        items[name] = value
+    return items
+
+
+def get_figure_key(mnet: MultiNet, function_name: str, parameters: dict) -> str:
+    """digest of everything a show_* figure depends on
+
+    The data is identified by the file fingerprints and the digest of in-memory changes of the
+    MultiNet, so tables edited in place are only noticed after mnet.update_data_digest.
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        function_name (str): name of the show_* function
+        parameters (dict): parameters of the call, without uncached_parameters
+
+    Returns:
+        str: hex digest
+    """
+    from . import __version__
+    file_digests = {element: fingerprint['digest'] for element, fingerprint in mnet.file_fingerprints.items()}
+    rcparams = {name: value for name, value in plt.rcParams.items() if name not in uncached_rcparams}
+    return get_object_digest(__version__, matplotlib.__version__, function_name, parameters,
+                             file_digests, mnet.data_digest, {name: getattr(mnet, name) for name in load_settings},
+                             get_style_items(mnet.style), rcparams)
+
+
+def cache_figure(show_function):
+    """cache the png figure of a show_* function, see FigureCache
+
+    The cache is used if it is set by mnet.figure_cache or the environment variable P4G_FIGURE_CACHE,
+    the figure is saved to png and no fig_obj is given. On a hit, the cached figure is copied to the
+    output directory and shown in a new figure after the extraction step of the function, which keeps the
+    selection of the layers, e.g. for export_network_layer, and the figure is not drawn.
+    """
+
+    signature = inspect.signature(show_function)
+
+    @functools.wraps(show_function)
+    def wrapper(*args, **kwargs):
+        global _pending_figure, _cached_figure
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        mnet = arguments.arguments['mnet']
+        figure_cache = get_figure_cache(mnet)
+        if figure_cache is None or arguments.arguments.get('fig_obj') or not arguments.arguments['isSave2png']:
+            return show_function(*args, **kwargs)
+
+        parameters = {name: value for name, value in arguments.arguments.items() if name not in uncached_parameters}
+        key = get_figure_key(mnet, show_function.__name__, parameters)
+        path_cached = figure_cache.get(key)
+        if path_cached is None:
+            _pending_figure = (figure_cache, key)
+            try:
+                return show_function(*args, **kwargs)
+            finally:
+                _pending_figure = None
+
+        # the function runs its extraction step, so that the selection of the layers is the same as on a
+        # miss, and returns the cached figure by show_cached_figure instead of drawing
+        _cached_figure = path_cached
+        try:
+            return show_function(*args, **kwargs)
+        finally:
+            _cached_figure = None
+
+    return wrapper
+
+
+def store_pending_figure(path_figure: str) -> None:
+    # store the figure saved by a show_* call running with a cache miss
+    if _pending_figure is not None:
+        figure_cache, key = _pending_figure
+        figure_cache.put(key, path_figure)
+
+
+def is_figure_cache_hit() -> bool:
+    # whether the running show_* call has a cached figure, checked after its extraction step
+    return _cached_figure is not None
+
+
+def show_cached_figure(mnet: MultiNet, output_dir: str, stats) -> plt:
+    """copy the cached figure of the running show_* call to the output directory and show it
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        output_dir (str): output directory of the show_* call
+        stats (PipelineStats): stats of the show_* call, finished here
+
+    Returns:
+        plt: figure object showing the cached figure
+    """
+    path_figure = generate_absolute_path(file_name=os.path.basename(_cached_figure).split('.', 1)[1],
+                                         folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
+    shutil.copyfile(_cached_figure, path_figure)
+    print(f"The image has been saved to the designated location: {path_figure}")
+
+    # the cached pixels are shown in a figure of the same size, so plt.show() works as on a miss
+    image = mpl_image.imread(_cached_figure)
+    fig = plt.figure(figsize=(image.shape[1] / mnet.style.dpi, image.shape[0] / mnet.style.dpi), dpi=mnet.style.dpi)
+    fig.figimage(image)
+    stats.lap('figure_cache_hit')
+    stats.finish(mnet)
+    return plt
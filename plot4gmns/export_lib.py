@@ -0,0 +1,425 @@
+# -*- coding:utf-8 -*-
+##############################################################
+# Created Date: Monday, October 19th 2026
+# Contact Info: luoxiangyong01@gmail.com
+# Author/Copyright: Mr. Xiangyong Luo
+##############################################################
+
+import json
+import os
+import numpy as np
+import pandas as pd
+import shapely
+from .network import MultiNet
+from .projection_lib import project_shapely
+from .utility_lib import network_modes, path2linux, import_pyarrow
+
+export_layers = ['node', 'link', 'poi', 'demand', 'zone']
+
+export_formats = {
+    'geojson': ['.geojsonl', '.geojsons', '.geojson', '.ndjson', '.jsonl'],
+    'flatgeobuf': ['.fgb'],
+    'parquet': ['.parquet', '.geoparquet'],
+    'feather': ['.feather', '.arrow'],
+    'csv': ['.csv']}
+
+# geometry type of each layer used in the FlatGeobuf header
+layer_geometry_types = {
+    'node': 'Point',
+    'link': 'LineString',
+    'poi': 'Unknown',
+    'demand': 'LineString',
+    'zone': 'Unknown'}
+
+
+def _get_layer(mnet: MultiNet, layer: str):
+    # return the layer object of the MultiNet, raise exception if not loaded
+    if layer not in export_layers:
+        raise Exception(f"ValueError: layer should be one of {export_layers}")
+
+    layers = {'node': (mnet.node, mnet.node_loaded),
+              'link': (mnet.link, mnet.link_loaded),
+              'poi': (mnet.POI, mnet.POI_loaded),
+              'demand': (mnet.demand, mnet.demand_loaded),
+              'zone': (mnet.zone, mnet.zone_loaded)}
+    layer_obj, isLoaded = layers[layer]
+    if not isLoaded or layer_obj.value is None:
+        raise Exception(f"{layer} layer is not loaded!")
+    return layer_obj
+
+
+def _get_attribute_columns(layer: str, df: pd.DataFrame) -> list:
+    # attribute columns to export, derived mode columns of links are excluded
+    derived_columns = ['geometry', 'geometry_id']
+    if layer == 'link':
+        derived_columns += [mode for mode in network_modes if mode != 'all']
+    return [column for column in df.columns if column not in derived_columns]
+
+
+def _get_chunk_geometry(layer: str, layer_obj, chunk: pd.DataFrame) -> np.ndarray:
+    # shapely geometries of a chunk of rows, created from the geometry buffer
+    if layer == 'node':
+        return shapely.points(chunk['x_coord'].to_numpy(dtype=float), chunk['y_coord'].to_numpy(dtype=float))
+    return layer_obj.geometry.to_shapely(chunk['geometry_id'].to_numpy())
+
+
+def _json_default(value):
+    # convert numpy scalar values to python values for json serialization
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _to_records(df: pd.DataFrame) -> list:
+    # convert a dataframe to a list of dict, NaN values are converted to None
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def iter_selected_features(mnet: MultiNet, layer: str, selected_only: bool = True, chunk_size: int = 10000):
+    """iterate the features of a network layer chunk by chunk
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        layer (str): one of 'node', 'link', 'poi', 'demand' and 'zone'
+        selected_only (bool): if True, only iterate the features selected by the latest
+            extract_coordinates_by_* call. Defaults to True.
+        chunk_size (int): number of features in each chunk. Defaults to 10000.
+
+    Yields:
+        tuple: (attribute dataframe, array of shapely geometries) of each chunk
+    """
+
+    layer_obj = _get_layer(mnet, layer)
+    if selected_only and layer_obj.selected_index is not None:
+        index = layer_obj.selected_index
+    else:
+        index = layer_obj.value.index
+
+    attr_columns = _get_attribute_columns(layer, layer_obj.value)
+    for start in range(0, len(index), chunk_size):
+        chunk = layer_obj.value.loc[index[start:start + chunk_size]]
+        yield chunk[attr_columns], _get_chunk_geometry(layer, layer_obj, chunk)
+
+
+def _prepare_output_path(path_filename: str) -> str:
+    path_filename = path2linux(os.path.abspath(path_filename))
+    output_dir = os.path.dirname(path_filename)
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    return path_filename
+
+
+def export_layer_to_geojson(mnet: MultiNet,
+                            layer: str,
+                            path_filename: str,
+                            selected_only: bool = True,
+                            chunk_size: int = 10000) -> str:
+    """write features of a network layer to a newline-delimited GeoJSON file
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        layer (str): one of 'node', 'link', 'poi', 'demand' and 'zone'
+        path_filename (str): output file, one GeoJSON feature per line
+        selected_only (bool): if True, only write the features selected by the latest
+            extract_coordinates_by_* call. Defaults to True.
+        chunk_size (int): number of features serialized at a time. Defaults to 10000.
+
+    Returns:
+        str: absolute path of the output file
+    """
+
+    path_filename = _prepare_output_path(path_filename)
+    with open(path_filename, 'w', encoding='utf-8') as f:
+        for attributes, geometries in iter_selected_features(mnet, layer, selected_only, chunk_size):
+            if mnet.crs is not None:
+                # GeoJSON coordinates are longitude and latitude (RFC 7946)
+                geometries = project_shapely(geometries, mnet.crs, isInverse=True)
+            lines = [json.dumps({'type': 'Feature',
+                                 'geometry': geometry.__geo_interface__ if geometry is not None else None,
+                                 'properties': properties}, default=_json_default)
+                     for properties, geometry in zip(_to_records(attributes), geometries)]
+            if lines:
+                f.write('\n'.join(lines) + '\n')
+    print(f"Successfully export {layer} features to {path_filename}")
+    return path_filename
+
+
+def export_layer_to_csv(mnet: MultiNet,
+                        layer: str,
+                        path_filename: str,
+                        selected_only: bool = True,
+                        chunk_size: int = 10000) -> str:
+    """write features of a network layer to a GMNS-style CSV file with WKT geometry
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        layer (str): one of 'node', 'link', 'poi', 'demand' and 'zone'
+        path_filename (str): output CSV file
+        selected_only (bool): if True, only write the features selected by the latest
+            extract_coordinates_by_* call. Defaults to True.
+        chunk_size (int): number of rows written at a time. Defaults to 10000.
+
+    Returns:
+        str: absolute path of the output file
+    """
+
+    path_filename = _prepare_output_path(path_filename)
+    layer_obj = _get_layer(mnet, layer)
+    with open(path_filename, 'w', encoding='utf-8', newline='') as f:
+        isHeader = True
+        for attributes, geometries in iter_selected_features(mnet, layer, selected_only, chunk_size):
+            # nodes are written with x_coord and y_coord only, as GMNS node.csv does
+            # WKT is written at the place of the geometry column, or at the end if it was dropped
+            geometry_column = 'geometry' if 'geometry' in layer_obj.value.columns else 'geometry_id'
+            if geometry_column in layer_obj.value.columns:
+                attributes = attributes.copy()
+                position = layer_obj.value.columns.get_loc(geometry_column)
+                attributes.insert(min(position, attributes.shape[1]), 'geometry',
+                                  shapely.to_wkt(geometries, rounding_precision=-1))
+            attributes.to_csv(f, header=isHeader, index=False)
+            isHeader = False
+    print(f"Successfully export {layer} features to {path_filename}")
+    return path_filename
+
+
+def _get_fiona_schema(layer: str, attributes: pd.DataFrame) -> dict:
+    properties = {}
+    for column, dtype in attributes.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            properties[column] = 'bool'
+        elif pd.api.types.is_integer_dtype(dtype):
+            properties[column] = 'int'
+        elif pd.api.types.is_float_dtype(dtype):
+            properties[column] = 'float'
+        else:
+            properties[column] = 'str'
+    return {'geometry': layer_geometry_types[layer], 'properties': properties}
+
+
+def export_layer_to_flatgeobuf(mnet: MultiNet,
+                               layer: str,
+                               path_filename: str,
+                               selected_only: bool = True,
+                               chunk_size: int = 10000) -> str:
+    """write features of a network layer to a FlatGeobuf file, fiona is required
+
+    The spatial index of FlatGeobuf is disabled so that the features can be written
+    incrementally instead of being buffered before writing.
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        layer (str): one of 'node', 'link', 'poi', 'demand' and 'zone'
+        path_filename (str): output FlatGeobuf file
+        selected_only (bool): if True, only write the features selected by the latest
+            extract_coordinates_by_* call. Defaults to True.
+        chunk_size (int): number of features written at a time. Defaults to 10000.
+
+    Returns:
+        str: absolute path of the output file
+    """
+
+    try:
+        import fiona
+    except ImportError:
+        raise Exception("ImportError: fiona is required to export FlatGeobuf files, "
+                        "please install it by: pip install fiona") from None
+
+    path_filename = _prepare_output_path(path_filename)
+    layer_obj = _get_layer(mnet, layer)
+    schema = _get_fiona_schema(layer, layer_obj.value[_get_attribute_columns(layer, layer_obj.value)])
+    str_columns = [column for column, v in schema['properties'].items() if v == 'str']
+
+    with fiona.open(path_filename, 'w', driver='FlatGeobuf', schema=schema,
+                    crs=mnet.crs or 'EPSG:4326', SPATIAL_INDEX='NO') as dst:
+        for attributes, geometries in iter_selected_features(mnet, layer, selected_only, chunk_size):
+            attributes = attributes.copy()
+            for column in str_columns:
+                attributes[column] = attributes[column].map(lambda x: None if pd.isna(x) else str(x))
+            dst.writerecords(
+                {'geometry': geometry.__geo_interface__ if geometry is not None else None,
+                 'properties': properties}
+                for properties, geometry in zip(_to_records(attributes), geometries))
+    print(f"Successfully export {layer} features to {path_filename}")
+    return path_filename
+
+
+def _get_arrow_schema(pa, attributes: pd.DataFrame) -> tuple:
+    # arrow schema of the attribute columns, columns of mixed or unknown types are written as strings
+    fields, str_columns = [], []
+    for column in attributes.columns:
+        try:
+            arrow_type = pa.array(attributes[column], from_pandas=True).type
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrow_type = pa.null()
+        if pa.types.is_null(arrow_type):
+            arrow_type = pa.string()
+            str_columns.append(column)
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields), str_columns
+
+
+def _get_geo_metadata(layer: str, crs: str = None) -> dict:
+    # GeoParquet metadata of the WKB geometry column, coordinates are longitude and latitude if crs is None
+    geometry_type = layer_geometry_types[layer]
+    column = {'encoding': 'WKB', 'geometry_types': [] if geometry_type == 'Unknown' else [geometry_type]}
+    if crs is not None:
+        # the crs is written as PROJJSON, or as null (unknown) if pyproj is not installed
+        try:
+            from pyproj import CRS
+            column['crs'] = CRS.from_user_input(crs).to_json_dict()
+        except ImportError:
+            column['crs'] = None
+    return {'version': '1.0.0', 'primary_column': 'geometry', 'columns': {'geometry': column}}
+
+
+def _iter_arrow_tables(pa, mnet: MultiNet, layer: str, selected_only: bool, chunk_size: int):
+    # arrow schema with GeoParquet metadata, followed by one arrow table of each chunk of features
+    layer_obj = _get_layer(mnet, layer)
+    attr_schema, str_columns = _get_arrow_schema(pa, layer_obj.value[_get_attribute_columns(layer, layer_obj.value)])
+    schema = attr_schema.append(pa.field('geometry', pa.binary())).with_metadata(
+        {'geo': json.dumps(_get_geo_metadata(layer, mnet.crs))})
+    yield schema
+    for attributes, geometries in iter_selected_features(mnet, layer, selected_only, chunk_size):
+        if str_columns:
+            attributes = attributes.copy()
+            for column in str_columns:
+                attributes[column] = attributes[column].map(lambda x: None if pd.isna(x) else str(x))
+        table = pa.Table.from_pandas(attributes, schema=attr_schema, preserve_index=False)
+        yield table.append_column('geometry', pa.array(shapely.to_wkb(geometries), pa.binary())).cast(schema)
+
+
+def export_layer_to_parquet(mnet: MultiNet,
+                            layer: str,
+                            path_filename: str,
+                            selected_only: bool = True,
+                            chunk_size: int = 100000) -> str:
+    """write features of a network layer to a GeoParquet file with WKB geometry, pyarrow is required
+
+    Each chunk is written as a row group, so that the file can be read back row group by row group.
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        layer (str): one of 'node', 'link', 'poi', 'demand' and 'zone'
+        path_filename (str): output Parquet file
+        selected_only (bool): if True, only write the features selected by the latest
+            extract_coordinates_by_* call. Defaults to True.
+        chunk_size (int): number of features of each row group. Defaults to 100000.
+
+    Returns:
+        str: absolute path of the output file
+    """
+
+    pa = import_pyarrow()
+    path_filename = _prepare_output_path(path_filename)
+    tables = _iter_arrow_tables(pa, mnet, layer, selected_only, chunk_size)
+    with pa.parquet.ParquetWriter(path_filename, next(tables)) as writer:
+        for table in tables:
+            writer.write_table(table)
+    print(f"Successfully export {layer} features to {path_filename}")
+    return path_filename
+
+
+def export_layer_to_feather(mnet: MultiNet,
+                            layer: str,
+                            path_filename: str,
+                            selected_only: bool = True,
+                            chunk_size: int = 100000) -> str:
+    """write features of a network layer to an uncompressed Feather (Arrow IPC) file with WKB geometry,
+    which can be memory-mapped when it is read back. pyarrow is required
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        layer (str): one of 'node', 'link', 'poi', 'demand' and 'zone'
+        path_filename (str): output Feather file
+        selected_only (bool): if True, only write the features selected by the latest
+            extract_coordinates_by_* call. Defaults to True.
+        chunk_size (int): number of features of each record batch. Defaults to 100000.
+
+    Returns:
+        str: absolute path of the output file
+    """
+
+    pa = import_pyarrow()
+    path_filename = _prepare_output_path(path_filename)
+    tables = _iter_arrow_tables(pa, mnet, layer, selected_only, chunk_size)
+    with pa.ipc.new_file(path_filename, next(tables)) as writer:
+        for table in tables:
+            writer.write_table(table)
+    print(f"Successfully export {layer} features to {path_filename}")
+    return path_filename
+
+
+def export_network_layer(mnet: MultiNet,
+                         layer: str,
+                         path_filename: str,
+                         file_format: str = None,
+                         selected_only: bool = True,
+                         chunk_size: int = 10000) -> str:
+    """write features of a network layer to a vector file, e.g. the bike links
+    selected by extract_coordinates_by_network_mode(mnet, ['bike'])
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        layer (str): one of 'node', 'link', 'poi', 'demand' and 'zone'
+        path_filename (str): output file
+        file_format (str): 'geojson', 'flatgeobuf', 'parquet', 'feather' or 'csv'. Defaults to None,
+            which means the format is inferred from the file extension.
+        selected_only (bool): if True, only write the features selected by the latest
+            extract_coordinates_by_* call. Defaults to True.
+        chunk_size (int): number of features written at a time. Defaults to 10000.
+
+    Returns:
+        str: absolute path of the output file
+    """
+
+    if file_format is None:
+        suffix = os.path.splitext(path_filename)[-1].lower()
+        file_format = next((k for k, v in export_formats.items() if suffix in v), None)
+        if file_format is None:
+            raise Exception(f"ValueError: unable to infer the file format from {path_filename}, "
+                            f"please specify file_format as one of {list(export_formats)}")
+
+    if file_format == 'geojson':
+        return export_layer_to_geojson(mnet, layer, path_filename, selected_only, chunk_size)
+    if file_format == 'flatgeobuf':
+        return export_layer_to_flatgeobuf(mnet, layer, path_filename, selected_only, chunk_size)
+    if file_format == 'parquet':
+        return export_layer_to_parquet(mnet, layer, path_filename, selected_only, chunk_size)
+    if file_format == 'feather':
+        return export_layer_to_feather(mnet, layer, path_filename, selected_only, chunk_size)
+    if file_format == 'csv':
+        return export_layer_to_csv(mnet, layer, path_filename, selected_only, chunk_size)
+    raise Exception(f"ValueError: file_format should be one of {list(export_formats)}")
+
+
+def save_multi_network(mnet: MultiNet,
+                       output_dir: str,
+                       file_format: str = 'parquet',
+                       layers: list = None,
+                       chunk_size: int = 100000) -> dict:
+    """write all features of the loaded layers of a MultiNet to GMNS tables, e.g. to convert CSV
+    files to Parquet once and load the Parquet files with file_format='parquet' afterwards
+
+    Out-of-core layers are written with the attribute columns kept in memory only.
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        output_dir (str): folder of the output tables, named as node.parquet, link.parquet, ...
+        file_format (str): 'parquet', 'feather' or 'csv'. Defaults to 'parquet'.
+        layers (list): layers to write. Defaults to None, which means all loaded layers.
+        chunk_size (int): number of features written at a time. Defaults to 100000.
+
+    Returns:
+        dict: {layer: absolute path of the output file}
+    """
+
+    if file_format not in ['parquet', 'feather', 'csv']:
+        raise Exception("ValueError: file_format should be one of ['parquet', 'feather', 'csv']")
+
+    loaded_layers = {'node': mnet.node_loaded, 'link': mnet.link_loaded, 'poi': mnet.POI_loaded,
+                     'demand': mnet.demand_loaded, 'zone': mnet.zone_loaded}
+    files_saved = {}
+    for layer in layers or [layer for layer in export_layers if loaded_layers[layer]]:
+        path_filename = os.path.join(output_dir, f"{layer}{export_formats[file_format][0]}")
+        files_saved[layer] = export_network_layer(mnet, layer, path_filename, file_format, False, chunk_size)
+    return files_saved
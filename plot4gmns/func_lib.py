@@ -1,114 +1,761 @@
 import os
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from .utility_lib import (required_files,
-                          required_columns,
-                          check_dir,
-                          get_file_names_from_folder_by_type,
-                          check_required_files_exist,
+from .utility_lib import (required_columns,
+                          network_tables,
+                          table_formats,
+                          find_network_tables,
+                          import_pyarrow,
+                          compression_formats,
+                          get_table_compression,
+                          open_network_table,
+                          split_archive_path,
+                          is_archive,
+                          archive_formats,
                           update_filename,
                           generate_absolute_path,
+                          get_file_fingerprint,
+                          out_of_core_columns,
+                          link_node_columns,
+                          demand_od_columns,
                           path2linux)
-from .network import MultiNet
-from keplergl import KeplerGl
+from .network import MultiNet, Node, Link, POI, Demand, Zone
+from .geometry_lib import GeometryBuffer, GeometryBufferWriter
+from .graph_lib import get_network_graph, get_link_travel_time, patch_network_graph
+from .projection_lib import (projections, resolve_crs, get_projection, project_coords, project_geometry_buffer,
+                             project_shapely)
+from .validation_lib import validate_multi_network
+from .stats_lib import start_stats, disabled_stats
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from keplergl import KeplerGl
 
-def read_single_csv_file(file_name: str, geo_type: str) -> tuple:
-    df = pd.read_csv(os.path.join(file_name))
+# number of rows of each dataset embedded in the KeplerGl map if datasets are written to sidecar files
+sidecar_preview_rows = 1000
+
+
+def get_table_format(path_filename: str) -> str:
+    # 'csv', 'parquet' or 'feather' by the file extension, e.g. 'csv' for link.csv.gz
+    path_filename, suffix = os.path.splitext(path_filename.lower())
+    if suffix in compression_formats:
+        suffix = os.path.splitext(path_filename)[-1]
+    return next((k for k, v in table_formats.items() if suffix in v), 'csv')
+
+
+def _open_arrow_source(pa, stream, path_filename: str):
+    # plain files are memory-mapped, members of archives are read into memory as pyarrow needs random access
+    if split_archive_path(path_filename)[1] is None:
+        return pa.memory_map(path_filename)
+    return pa.BufferReader(stream.read())
+
+
+def _project_columns(names: list, columns: list = None) -> list:
+    # columns of the file to read, in the order of the file
+    return names if columns is None else [name for name in names if name in columns]
+
+
+def read_network_table(path_filename: str, columns: list = None) -> pd.DataFrame:
+    """read a GMNS table from a CSV, Parquet (including GeoParquet) or Feather file
+
+    Args:
+        path_filename (str): path of the table file, the format is inferred from the file extension.
+            CSV files may be compressed, e.g. link.csv.gz, and the file may be a member of a zip or
+            tar archive, e.g. ./scenario.zip/link.csv, both are decompressed while parsing.
+        columns (list): columns to read, columns not in the file are ignored. Defaults to None, which means all.
+
+    Returns:
+        pd.DataFrame: table, WKB geometries of GeoParquet files are kept as bytes
+    """
+
+    table_format = get_table_format(path_filename)
+    with open_network_table(path_filename) as f:
+        if table_format == 'csv':
+            return pd.read_csv(f, compression=get_table_compression(path_filename),
+                               usecols=None if columns is None else lambda name: name in columns)
+
+        pa = import_pyarrow()
+        source = _open_arrow_source(pa, f, path_filename)
+        if table_format == 'parquet':
+            parquet_file = pa.parquet.ParquetFile(source)
+            return parquet_file.read(columns=_project_columns(parquet_file.schema_arrow.names, columns)).to_pandas()
+        reader = pa.ipc.open_file(source)
+        return reader.read_all().select(_project_columns(reader.schema.names, columns)).to_pandas()
+
+
+def iter_network_table_chunks(path_filename: str, chunk_size: int = 100000, columns: list = None):
+    """iterate a GMNS table chunk by chunk, Parquet files are read row group by row group
+
+    Args:
+        path_filename (str): path of the table file
+        chunk_size (int): maximum number of rows of each chunk. Defaults to 100000.
+        columns (list): columns to read, columns not in the file are ignored. Defaults to None, which means all.
+
+    Yields:
+        pd.DataFrame: chunk of the table
+    """
+
+    table_format = get_table_format(path_filename)
+    with open_network_table(path_filename) as f:
+        if table_format == 'csv':
+            with pd.read_csv(f, chunksize=chunk_size, compression=get_table_compression(path_filename),
+                             usecols=None if columns is None else lambda name: name in columns) as reader:
+                yield from reader
+            return
+
+        pa = import_pyarrow()
+        source = _open_arrow_source(pa, f, path_filename)
+        if table_format == 'parquet':
+            parquet_file = pa.parquet.ParquetFile(source)
+            for batch in parquet_file.iter_batches(
+                    batch_size=chunk_size, columns=_project_columns(parquet_file.schema_arrow.names, columns)):
+                yield batch.to_pandas()
+            return
+
+        reader = pa.ipc.open_file(source)
+        names = _project_columns(reader.schema.names, columns)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i).select(names)
+            for start in range(0, batch.num_rows, chunk_size):
+                yield batch.slice(start, chunk_size).to_pandas()
+
+
+def add_node_coords_from_geometry(df: pd.DataFrame) -> pd.DataFrame:
+    # x_coord and y_coord of nodes stored as point geometries, e.g. in GeoParquet files
+    if 'geometry' not in df.columns:
+        return df
+    if not {'x_coord', 'y_coord'} <= set(df.columns):
+        import shapely
+        points = GeometryBuffer.to_shapely_values(df['geometry'])
+        df = df.assign(x_coord=shapely.get_x(points), y_coord=shapely.get_y(points))
+    # WKB points are not needed once x_coord and y_coord exist
+    if pd.api.types.infer_dtype(df['geometry'], skipna=True) == 'bytes':
+        df = df.drop(columns=['geometry'])
+    return df
+
+
+def read_single_csv_file(file_name: str, geo_type: str, columns: list = None, usecols: list = None) -> tuple:
+    # read a GMNS table file, CSV, Parquet and Feather files are supported despite the name
+    df = read_network_table(file_name, usecols)
+    if geo_type == 'node':
+        df = add_node_coords_from_geometry(df)
 
     # check if the required columns exists
-    for column in required_columns[geo_type]:
+    for column in columns or required_columns[geo_type]:
         if column not in df.columns:
             print(f"{file_name} does not contain required column {column}!")
             return (None, False)
     return (df, True)
 
 
-def generate_multi_network_from_csv(input_dir: str = './', output_dir: str = None) -> MultiNet:
-    """read Multi-mode network from CSV file in the format of GMNS
+def get_node_coords(mnet: MultiNet) -> pd.DataFrame:
+    # source x_coord and y_coord of loaded nodes indexed by node_id, for building link geometries
+    if not mnet.node_loaded or mnet.node.value is None:
+        raise Exception("node layer is required to build link geometries from node coordinates!")
+    nodes = mnet.node.value.drop_duplicates('node_id').set_index('node_id')
+    if mnet.crs is None:
+        return nodes[['x_coord', 'y_coord']]
+    # link geometries are projected with the other layers, so they are built from the source coordinates
+    if {'source_x_coord', 'source_y_coord'} <= set(nodes.columns):
+        return nodes[['source_x_coord', 'source_y_coord']].set_axis(['x_coord', 'y_coord'], axis=1)
+    coords = project_coords(nodes[['x_coord', 'y_coord']].to_numpy(dtype=float), mnet.crs, isInverse=True)
+    return pd.DataFrame(coords, index=nodes.index, columns=['x_coord', 'y_coord'])
+
+
+def project_table_rows(mnet: MultiNet, df: pd.DataFrame, element: str) -> pd.DataFrame:
+    # project the coordinates of node or link rows given in source coordinates, e.g. of a network delta
+    if mnet.crs is None or df is None or not len(df):
+        return df
+    df = df.copy()
+    if element == 'node' and {'x_coord', 'y_coord'} <= set(df.columns):
+        coords = df[['x_coord', 'y_coord']].to_numpy(dtype=float)
+        if mnet.isKeepSourceCoords:
+            df['source_x_coord'], df['source_y_coord'] = coords[:, 0], coords[:, 1]
+        coords = project_coords(coords, mnet.crs)
+        df['x_coord'], df['y_coord'] = coords[:, 0], coords[:, 1]
+    elif element == 'link' and 'geometry' in df.columns:
+        df['geometry'] = project_shapely(GeometryBuffer.to_shapely_values(df['geometry']), mnet.crs)
+    return df
+
+
+def project_network_layer(mnet: MultiNet, element: str, layer) -> None:
+    """project the coordinates of a loaded layer to mnet.crs once, by vectorized transforms of the
+    node and centroid columns and of the vertex buffer
+
+    The crs is resolved from the coordinates of the first projected layer, e.g. 'utm' to the
+    UTM zone of the nodes, and the resolved crs is used for the other layers.
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        element (str): one of 'node', 'link', 'poi', 'demand' and 'zone'
+        layer: the layer object of the element
+    """
+
+    columns = {'node': ['x_coord', 'y_coord'], 'zone': ['centroid_x', 'centroid_y']}.get(element, [])
+    if columns and set(columns) <= set(layer.value.columns):
+        coords = layer.value[columns].to_numpy(dtype=float)
+        mnet.crs = resolve_crs(mnet.crs, coords)
+        if mnet.isKeepSourceCoords:
+            layer.value[[f'source_{column}' for column in columns]] = coords
+        layer.value[columns] = project_coords(coords, mnet.crs)
+
+    if getattr(layer, 'geometry', None) is not None:
+        coords = layer.geometry.coords
+        mnet.crs = resolve_crs(mnet.crs, coords[::max(1, len(coords) // 100000)])
+        layer.source_geometry = project_geometry_buffer(layer.geometry, mnet.crs, mnet.isKeepSourceCoords)
+
+
+def build_link_geometry_buffer(df: pd.DataFrame, node_coords: pd.DataFrame = None,
+                               link_geometry: str = 'auto') -> GeometryBuffer:
+    """build link geometries of a link table
+
+    Args:
+        df (pd.DataFrame): link table
+        node_coords (pd.DataFrame): x_coord and y_coord indexed by node_id, not used if link_geometry is 'wkt'
+        link_geometry (str): 'wkt' parses the geometry column, 'nodes' builds straight lines from the
+            coordinates of from_node_id and to_node_id, 'auto' parses WKT only for links with intermediate
+            vertices and builds the other links from nodes. Defaults to 'auto'.
+
+    Returns:
+        GeometryBuffer: geometry of each row, in the order of df
+    """
+
+    if link_geometry == 'wkt':
+        return GeometryBuffer.from_wkt(df['geometry'])
+
+    # links whose WKT has more than two vertices, found by counting commas without parsing
+    isCurved = np.zeros(len(df), dtype=np.bool_)
+    if link_geometry == 'auto' and 'geometry' in df.columns:
+        wkt = df['geometry']
+        isCurved = (wkt.notna() & (wkt.astype(str).str.count(',') >= 2)).to_numpy()
+
+    # vectorized join of from_node_id and to_node_id against the node table
+    from_positions = node_coords.index.get_indexer(df['from_node_id'])
+    to_positions = node_coords.index.get_indexer(df['to_node_id'])
+    isMissing = (from_positions < 0) | (to_positions < 0)
+    if link_geometry == 'auto' and 'geometry' in df.columns:
+        # links of unknown nodes fall back to their WKT
+        isCurved = isCurved | (isMissing & df['geometry'].notna().to_numpy())
+    isStraight = ~isCurved
+    isMissing = isMissing & isStraight
+    if isMissing.any():
+        print(f"Warning: {isMissing.sum()} link(s) refer to unknown nodes, their geometries are empty")
+
+    xy = node_coords.to_numpy(dtype=np.float64)
+    straight_buffer = GeometryBuffer.from_segments(xy[from_positions[isStraight]], xy[to_positions[isStraight]],
+                                                   ~isMissing[isStraight])
+    if not isCurved.any():
+        return straight_buffer
+    curved_buffer = GeometryBuffer.from_wkt(df['geometry'][isCurved])
+
+    # restore the row order of df
+    order = np.empty(len(df), dtype=np.int64)
+    order[np.flatnonzero(isStraight)] = np.arange(isStraight.sum())
+    order[np.flatnonzero(isCurved)] = np.arange(isCurved.sum()) + isStraight.sum()
+    return GeometryBuffer.concatenate([straight_buffer, curved_buffer]).take(order)
+
+
+def get_layer_usecols(mnet: MultiNet, element: str) -> list:
+    # columns of a layer to read, required columns are always read, None means all columns
+    columns = (mnet.usecols or {}).get(element)
+    if columns is None:
+        return None
+    columns = list(columns) + required_columns[element]
+    if element == 'node':
+        columns += ['node_id', 'geometry']
+    elif element == 'link':
+        columns += ['link_id', 'allowed_uses', 'geometry'] + link_node_columns
+    return list(dict.fromkeys(columns))
+
+
+def read_csv_file_to_geometry_buffer(file_name: str,
+                                     geo_type: str,
+                                     memmap_dir: str,
+                                     chunk_size: int = 100000,
+                                     node_coords: pd.DataFrame = None,
+                                     link_geometry: str = 'wkt') -> tuple:
+    """read a link or poi table chunk by chunk, geometries are written to memory-mapped files
+
+    Only the columns in out_of_core_columns are read and kept in the dataframe, and a geometry_id
+    column points to the geometry of each row in the buffer.
 
     Args:
-        input_dir (str, optional): a file path. Defaults to './'.
+        file_name (str): path of the link or poi table, CSV, Parquet or Feather
+        geo_type (str): 'link' or 'poi'
+        memmap_dir (str): directory of the memory-mapped files
+        chunk_size (int): number of rows parsed at a time. Defaults to 100000.
+        node_coords (pd.DataFrame): node coordinates used when link geometries are built from nodes.
+        link_geometry (str): 'wkt', 'nodes' or 'auto', see build_link_geometry_buffer. Defaults to 'wkt'.
+
+    Returns:
+        tuple: (dataframe, GeometryBuffer, isLoaded)
+    """
+
+    columns = link_node_columns if geo_type == 'link' and link_geometry != 'wkt' else required_columns[geo_type]
+    usecols = out_of_core_columns[geo_type] + ['geometry'] + link_node_columns
+    writer = GeometryBufferWriter(memmap_dir, geo_type)
+    chunks = []
+    for chunk in iter_network_table_chunks(file_name, chunk_size, usecols):
+        # check if the required columns exists
+        for column in columns:
+            if column not in chunk.columns:
+                print(f"{file_name} does not contain required column {column}!")
+                writer.close()
+                return (None, None, False)
+        if geo_type == 'link':
+            geometry_ids = writer.append(build_link_geometry_buffer(chunk, node_coords, link_geometry))
+        else:
+            geometry_ids = writer.append(GeometryBuffer.from_wkt(chunk['geometry']))
+        chunk = chunk[[column for column in out_of_core_columns[geo_type] if column in chunk.columns]].copy()
+        chunk['geometry_id'] = geometry_ids
+        chunks.append(chunk)
+    df = pd.concat(chunks, ignore_index=True) if chunks else None
+    return (df, writer.close(), df is not None)
+
+
+def generate_multi_network_from_csv(input_dir: str = './',
+                                    output_dir: str = None,
+                                    isPruneColumns: bool = False,
+                                    coord_precision: int = None,
+                                    simplify_tolerance: float = None,
+                                    isSidecarData: bool = False,
+                                    isStats: bool = None,
+                                    isVisMap: bool = True,
+                                    memmap_dir: str = None,
+                                    link_geometry: str = 'wkt',
+                                    file_format: str = 'csv',
+                                    usecols: dict = None,
+                                    demand_geometry: str = 'wkt',
+                                    isDeriveAttributes: bool = True,
+                                    crs: str = None,
+                                    isKeepSourceCoords: bool = False,
+                                    validation: str = None) -> MultiNet:
+    """read Multi-mode network from CSV, Parquet or Feather files in the format of GMNS
+
+    Args:
+        input_dir (str, optional): a folder of GMNS tables, or a zip or tar archive of them, e.g. './scenario.zip'.
+            CSV tables may be compressed as .gz, .bz2, .xz or .zst (requires zstandard), and are decompressed
+            while parsing without extracting files to disk. Defaults to './'.
         output_dir(str): a file path to save the visualization map. Defaults to None, which means the current working directory.
+        isPruneColumns (bool): if True, only keep the tooltip fields and geometry columns in the visualization map.
+            Defaults to False.
+        coord_precision (int): number of decimals of coordinates in the visualization map. Defaults to None.
+        simplify_tolerance (float): tolerance of geometry simplification in the visualization map. Defaults to None.
+        isSidecarData (bool): if True, write map datasets to gzip compressed CSV files next to the html file
+            and embed only their first rows as a preview, the full datasets are added to the map by hand.
+            Defaults to False.
+        isStats (bool): if True, record wall time, feature counts and peak memory of each stage to mnet.stats,
+            also for show_* calls of this MultiNet. Defaults to None, which means the environment variable
+            P4G_STATS is used.
+        isVisMap (bool): if True, generate the KeplerGl html map. Defaults to True.
+        memmap_dir (str): if specified, link and poi geometries are stored in memory-mapped files in this
+            directory instead of memory, WKT strings are dropped and only the attribute columns used for
+            filtering are kept in memory. Use it together with isVisMap=False for networks larger than memory. Defaults to None.
+        link_geometry (str): 'wkt' parses the geometry column of link.csv. 'nodes' builds straight link lines
+            from the coordinates of from_node_id and to_node_id, so link.csv needs no geometry column. 'auto'
+            parses WKT only for links with intermediate vertices and builds the other links from nodes.
+            Link geometries are kept in a GeometryBuffer for 'nodes' and 'auto'. Defaults to 'wkt'.
+        file_format (str): format of the GMNS tables, 'csv', 'parquet' (including GeoParquet with WKB
+            geometries), 'feather' or 'auto'. 'auto' prefers Parquet over Feather and CSV for each table.
+            Parquet and Feather files require pyarrow. Defaults to 'csv'.
+        usecols (dict): columns to read of each table, e.g. {'link': ['lanes', 'free_speed']}. Geometry and
+            id columns are always read, and columnar files only read the selected columns from disk.
+            Defaults to None, which means all columns of all tables.
+        demand_geometry (str): 'wkt' parses the geometry column of the demand table. 'zones' skips reading it,
+            and OD lines are joined from centroid_x and centroid_y of the zone table when they are drawn,
+            which is much faster for large OD tables. Defaults to 'wkt'.
+        isDeriveAttributes (bool): if True, missing link length is computed from link geometries, and missing
+            lanes, free_speed and capacity are set by facility_type, existing values are kept. Defaults to True.
+        crs (str): if specified, lon/lat coordinates of all layers are projected once at loading, so that
+            shapes are not distorted in plots and distances are in meters. 'web_mercator', 'utm' (UTM zone of
+            the nodes), 'equirectangular' (centered at the nodes) or a crs string such as 'EPSG:3035', which
+            requires pyproj. The resolved crs is stored in mnet.crs. Defaults to None, which means no projection.
+        isKeepSourceCoords (bool): if True, keep the source coordinates of projected layers in the
+            source_x_coord, source_y_coord, source_centroid_x and source_centroid_y columns and in
+            layer.source_geometry. Defaults to False.
+        validation (str): 'report' checks duplicate ids, dangling node references of links, empty or invalid
+            geometries, demand of unknown zones and zone ids outside 1..N after loading, and prints the report,
+            which is kept in mnet.validation_report. 'drop' also drops the failed rows, see
+            validation_lib.validate_multi_network. Defaults to None, which means no validation.
 
     Returns:
         MNet: MultiNet object
     """
+    stats = start_stats('generate_multi_network_from_csv', isStats)
     # Tell the user the input files format
-    print(f"Please note that required input files are {required_files}")
-    print(f"Reading network from CSV files in {input_dir}...")
+    print("Please note that required input tables are ['node', 'link']")
+    print(f"Reading network from {file_format} files in {input_dir}...")
 
     # Check if the input directory exists
     if not os.path.exists(input_dir):
         raise Exception(f"Input directory {input_dir} does not exist!")
+    if os.path.isfile(input_dir) and not is_archive(input_dir):
+        raise Exception(f"ValueError: {input_dir} should be a folder or one of {archive_formats} archives!")
 
     if not output_dir:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
         output_dir = Path.cwd()
 
-    # check if the input directory contains all required files
-    all_csv_files = get_file_names_from_folder_by_type(input_dir, 'csv')
-    isRequired = check_required_files_exist(required_files, all_csv_files)
+    # check if the input directory contains all required tables
+    table_files = find_network_tables(input_dir, file_format)
 
-    # raise exception if not all required files are found
-    if not isRequired:
+    # raise exception if not all required tables are found
+    if 'node' not in table_files or 'link' not in table_files:
         raise Exception(f"Input directory {input_dir} does not contain all required files!")
 
-    # Additional check for poi.csv
-    if 'poi.csv' not in all_csv_files:
-        print(f"Warning: poi.csv is not found in {input_dir}, poi layer will not be loaded!")
+    # Additional check for poi
+    if 'poi' not in table_files:
+        print(f"Warning: poi table is not found in {input_dir}, poi layer will not be loaded!")
 
     # initialize a MultiNet object
     mnet = MultiNet()
+    mnet.input_dir = path2linux(os.path.abspath(input_dir))
+    mnet.isStats = isStats
+    mnet.memmap_dir = path2linux(os.path.abspath(memmap_dir)) if memmap_dir else None
+    if link_geometry not in ['wkt', 'nodes', 'auto']:
+        raise Exception("ValueError: link_geometry should be one of ['wkt', 'nodes', 'auto']")
+    mnet.link_geometry = link_geometry
+    mnet.file_format = file_format
+    mnet.usecols = usecols or {}
+    if demand_geometry not in ['wkt', 'zones']:
+        raise Exception("ValueError: demand_geometry should be one of ['wkt', 'zones']")
+    mnet.demand_geometry = demand_geometry
+    mnet.isDeriveAttributes = isDeriveAttributes
+    if crs is not None and crs not in projections:
+        get_projection(crs)
+    mnet.crs = crs
+    mnet.isKeepSourceCoords = isKeepSourceCoords
+    if validation not in [None, 'report', 'drop']:
+        raise Exception("ValueError: validation should be one of [None, 'report', 'drop']")
+    mnet.validation = validation
 
     # add required files and / or  optional files to the MultiNet object
-    files_found = check_dir(input_dir)
-    for filename in files_found:
-        path_filename = os.path.join(input_dir, filename)
-        element = filename.split(".")[0]
-        if element == 'node':
-            mnet.node.value, mnet.node_loaded = read_single_csv_file(path_filename, element)
-        elif element == 'link':
-            mnet.link.value, mnet.link_loaded = read_single_csv_file(path_filename, element)
-            mnet.link.convert_str_to_geometry()
-            mnet.link.extract_link_modes()
-        elif element == 'poi':
-            mnet.POI.value, mnet.POI_loaded = read_single_csv_file(path_filename, element)
-            mnet.POI.convert_str_to_geometry()
-        elif element == 'demand':
-            mnet.demand.value, mnet.demand_loaded = read_single_csv_file(path_filename, element)
-            mnet.demand.convert_str_to_geometry()
-        elif element == 'zone':
-            mnet.zone.value, mnet.zone_loaded = read_single_csv_file(path_filename, element)
-            mnet.zone.convert_str_to_geometry()
+    stats.lap('file_checking', len(table_files))
+    for element, path_filename in table_files.items():
+        load_network_layer(mnet, element, path_filename, stats=stats)
     print("Complete file loading")
+    if mnet.validation:
+        run_network_validation(mnet)
+        stats.lap('validation')
+
+    if not isVisMap:
+        stats.finish(mnet)
+        return mnet
 
     # generate keplergl map, currently only support node, link, poi
     # The reason to load data again but not from mnet is to avoid errors after further operations for nodes, links and poi in mnet.
     map_layer_data = {}
     if mnet.node_loaded:
-        map_layer_data["node"] = pd.read_csv(path2linux(f"{input_dir}/node.csv")).fillna("None_")
-        print("Test path: ", f"{input_dir}/node.csv")
+        map_layer_data["node"] = read_map_layer_table(table_files['node'], 'node')
     if mnet.link_loaded:
-        map_layer_data["link"] = pd.read_csv(f"{input_dir}/link.csv").fillna("None_")
+        map_layer_data["link"] = read_map_layer_table(table_files['link'], 'link')
+        if mnet.link.geometry is not None and 'geometry' not in map_layer_data["link"].columns:
+            # links built from node coordinates, rows are in the order of the file
+            import shapely
+            geometries = mnet.link.geometry.to_shapely(mnet.link.value['geometry_id'].to_numpy())
+            if mnet.crs is not None:
+                geometries = project_shapely(geometries, mnet.crs, isInverse=True)
+            map_layer_data["link"]['geometry'] = shapely.to_wkt(geometries, rounding_precision=-1)
     if mnet.POI_loaded:
-        map_layer_data["poi"] = pd.read_csv(f"{input_dir}/poi.csv").fillna("None_")
+        map_layer_data["poi"] = read_map_layer_table(table_files['poi'], 'poi')
     if mnet.demand_loaded:
-        map_layer_data["demand"] = pd.read_csv(f"{input_dir}/demand.csv").fillna("None_")
+        map_layer_data["demand"] = read_map_layer_table(table_files['demand'], 'demand')
     if mnet.zone_loaded:
-        map_layer_data["zone"] = pd.read_csv(f"{input_dir}/zone.csv").fillna("None_")
+        map_layer_data["zone"] = read_map_layer_table(table_files['zone'], 'zone')
 
-    vis_map = generate_visualization_map_using_keplergl(map_layer_data)
     path_vis_map = generate_absolute_path(file_name="plot4gmns_vis_map.html",
                                           folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
+    vis_map = generate_visualization_map_using_keplergl(map_layer_data,
+                                                        isPruneColumns=isPruneColumns,
+                                                        coord_precision=coord_precision,
+                                                        simplify_tolerance=simplify_tolerance,
+                                                        sidecar_path=path_vis_map if isSidecarData else None)
     vis_map.save_to_html(file_name=path_vis_map)
     # print(f"Successfully generate interactive map visualization to {path_vis_map}")
+    stats.lap('vis_map_generation')
+    stats.finish(mnet)
 
     return mnet
 
 
-def generate_visualization_map_using_keplergl(map_layer_data: dict, map_config: dict = None) -> None:
+def read_map_layer_table(path_filename: str, element: str) -> pd.DataFrame:
+    # a GMNS table for the KeplerGl map, WKB geometries of columnar files are converted to WKT
+    df = read_network_table(path_filename)
+    if element == 'node':
+        df = add_node_coords_from_geometry(df)
+    if 'geometry' in df.columns and pd.api.types.infer_dtype(df['geometry'], skipna=True) == 'bytes':
+        import shapely
+        df['geometry'] = shapely.to_wkt(GeometryBuffer.to_shapely_values(df['geometry']), rounding_precision=-1)
+    return df.fillna("None_")
+
+
+def load_network_layer(mnet: MultiNet,
+                       element: str,
+                       path_filename: str,
+                       fingerprint: dict = None,
+                       stats=disabled_stats) -> None:
+    """read a GMNS table file into a new layer object of the MultiNet
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        element (str): one of 'node', 'link', 'poi', 'demand' and 'zone'
+        path_filename (str): path of the GMNS table, CSV, Parquet or Feather
+        fingerprint (dict): fingerprint of the file. Defaults to None, which means it will be computed.
+        stats (PipelineStats): stats of the calling loader. Defaults to disabled stats.
+    """
+
+    usecols = get_layer_usecols(mnet, element)
+    if element == 'node':
+        mnet.node = Node()
+        mnet.node.value, mnet.node_loaded = read_single_csv_file(path_filename, element, usecols=usecols)
+        layer = mnet.node
+    elif element == 'link':
+        mnet.link = Link()
+        node_coords = get_node_coords(mnet) if mnet.link_geometry != 'wkt' else None
+        if mnet.memmap_dir:
+            mnet.link.value, mnet.link.geometry, mnet.link_loaded = read_csv_file_to_geometry_buffer(
+                path_filename, element, mnet.memmap_dir, node_coords=node_coords, link_geometry=mnet.link_geometry)
+        elif mnet.link_geometry != 'wkt':
+            mnet.link.value, mnet.link_loaded = read_single_csv_file(path_filename, element, link_node_columns,
+                                                                     usecols)
+            if mnet.link_loaded:
+                mnet.link.geometry = build_link_geometry_buffer(mnet.link.value, node_coords, mnet.link_geometry)
+                mnet.link.value['geometry_id'] = np.arange(len(mnet.link.value))
+                mnet.link.value = mnet.link.value.drop(columns=['geometry'], errors='ignore')
+        else:
+            mnet.link.value, mnet.link_loaded = read_single_csv_file(path_filename, element, usecols=usecols)
+        layer = mnet.link
+    elif element == 'poi':
+        mnet.POI = POI()
+        if mnet.memmap_dir:
+            mnet.POI.value, mnet.POI.geometry, mnet.POI_loaded = read_csv_file_to_geometry_buffer(
+                path_filename, element, mnet.memmap_dir)
+        else:
+            mnet.POI.value, mnet.POI_loaded = read_single_csv_file(path_filename, element, usecols=usecols)
+        layer = mnet.POI
+    elif element == 'demand':
+        mnet.demand = Demand()
+        if mnet.demand_geometry == 'zones':
+            # OD lines are joined from zone centroids, so only the OD and time period columns are read
+            demand_columns = [column for column in (usecols or []) + demand_od_columns + ['time_period']
+                              if column != 'geometry']
+            mnet.demand.value, mnet.demand_loaded = read_single_csv_file(
+                path_filename, element, demand_od_columns, list(dict.fromkeys(demand_columns)))
+        else:
+            mnet.demand.value, mnet.demand_loaded = read_single_csv_file(path_filename, element, usecols=usecols)
+        layer = mnet.demand
+    elif element == 'zone':
+        mnet.zone = Zone()
+        mnet.zone.value, mnet.zone_loaded = read_single_csv_file(path_filename, element, usecols=usecols)
+        layer = mnet.zone
+    else:
+        return
+    number_of_rows = 0 if layer.value is None else layer.value.shape[0]
+    stats.lap(f'{element}.csv_reading', number_of_rows)
+
+    # geometries of out-of-core layers are parsed while reading
+    if element != 'node' and layer.value is not None and getattr(layer, 'geometry', None) is None \
+            and 'geometry' in layer.value.columns:
+        layer.convert_str_to_geometry()
+        # WKB bytes of GeoParquet files are not needed once parsed into the buffer
+        if pd.api.types.infer_dtype(layer.value['geometry'], skipna=True) == 'bytes':
+            layer.value = layer.value.drop(columns=['geometry'])
+        stats.lap(f'{element}.wkt_parsing', number_of_rows)
+    if element == 'link' and layer.value is not None:
+        layer.extract_link_modes()
+        stats.lap(f'{element}.mode_extraction', number_of_rows)
+        if mnet.isDeriveAttributes:
+            derived = layer.derive_missing_attributes()
+            if derived:
+                print(f"Missing link attributes are derived: {derived}")
+            stats.lap(f'{element}.attribute_derivation', number_of_rows)
+    if mnet.crs is not None and layer.value is not None:
+        project_network_layer(mnet, element, layer)
+        stats.lap(f'{element}.projection', number_of_rows)
+
+    mnet.file_fingerprints[element] = fingerprint or get_file_fingerprint(path_filename)
+    stats.lap(f'{element}.fingerprint')
+
+
+def run_network_validation(mnet: MultiNet) -> None:
+    # validate the loaded layers by mnet.validation and print the report
+    mnet.validation_report = validate_multi_network(mnet, isDropInvalid=mnet.validation == 'drop')
+    if mnet.validation_report.empty:
+        print("All integrity checks passed")
+    else:
+        print(f"Integrity check report:\n{mnet.validation_report.to_string(index=False)}")
+
+
+def unload_network_layer(mnet: MultiNet, element: str) -> None:
+    # remove a layer from the MultiNet, e.g. when its file was deleted
+    if element == 'node':
+        mnet.node, mnet.node_loaded = Node(), False
+    elif element == 'link':
+        mnet.link, mnet.link_loaded = Link(), False
+    elif element == 'poi':
+        mnet.POI, mnet.POI_loaded = POI(), False
+    elif element == 'demand':
+        mnet.demand, mnet.demand_loaded = Demand(), False
+    elif element == 'zone':
+        mnet.zone, mnet.zone_loaded = Zone(), False
+    mnet.file_fingerprints.pop(element, None)
+
+
+def apply_network_delta(mnet: MultiNet,
+                        added_links: pd.DataFrame = None,
+                        removed_links: list = None,
+                        modified_links: pd.DataFrame = None,
+                        added_nodes: pd.DataFrame = None,
+                        removed_nodes: list = None,
+                        modified_nodes: pd.DataFrame = None) -> None:
+    """apply a scenario delta of links and nodes to a loaded MultiNet without reloading files
+
+    Files are not read again and only the changed rows are parsed. Modified rows are set in place,
+    removed and added rows rebuild the node and link tables with O(N) vectorized work, and the
+    cached category partitions and network graph are patched for the changed rows, see
+    apply_table_delta and patch_network_graph.
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        added_links (pd.DataFrame): new link rows in GMNS format. Defaults to None.
+        removed_links (list): link_id of links to be removed. Defaults to None.
+        modified_links (pd.DataFrame): link_id and the changed columns, e.g. lanes or free_speed. Defaults to None.
+        added_nodes (pd.DataFrame): new node rows in GMNS format. Defaults to None.
+        removed_nodes (list): node_id of nodes to be removed. Defaults to None.
+        modified_nodes (pd.DataFrame): node_id and the changed columns. Defaults to None.
+    """
+
+    changed_elements = []
+    if any(v is not None for v in [added_nodes, removed_nodes, modified_nodes]):
+        if not mnet.node_loaded:
+            raise Exception("node layer is not loaded!")
+        # coordinates of the delta are in the source crs, as in the GMNS files
+        mnet.node.apply_delta(project_table_rows(mnet, added_nodes, 'node'), removed_nodes,
+                              project_table_rows(mnet, modified_nodes, 'node'))
+        changed_elements.append('node')
+
+    if any(v is not None for v in [added_links, removed_links, modified_links]):
+        if not mnet.link_loaded:
+            raise Exception("link layer is not loaded!")
+        if mnet.link_geometry != 'wkt' and added_links is not None and len(added_links):
+            # new links without WKT are drawn as straight lines between their nodes
+            added_links = added_links.copy()
+            if 'geometry' not in added_links.columns:
+                added_links['geometry'] = None
+            added_links['geometry'] = added_links['geometry'].astype(object)
+            isMissing = added_links['geometry'].isna().to_numpy()
+            if isMissing.any():
+                buffer = build_link_geometry_buffer(added_links[isMissing], get_node_coords(mnet), 'nodes')
+                added_links.loc[isMissing, 'geometry'] = buffer.to_shapely()
+        link = mnet.link.value
+        removed_positions, modified_positions = mnet.link.apply_delta(project_table_rows(mnet, added_links, 'link'),
+                                                                      removed_links,
+                                                                      project_table_rows(mnet, modified_links, 'link'))
+        patch_network_graph(mnet, link, removed_positions, modified_positions,
+                            [] if modified_links is None else list(modified_links.columns),
+                            added_links is not None and len(added_links) > 0)
+        changed_elements.append('link')
+
+    # links referring to removed nodes are kept, but the user should know about them
+    if mnet.node_loaded and mnet.link_loaded and removed_nodes is not None and len(removed_nodes):
+        isDangling = (mnet.link.value['from_node_id'].isin(removed_nodes) |
+                      mnet.link.value['to_node_id'].isin(removed_nodes))
+        if isDangling.any():
+            print(f"Warning: {isDangling.sum()} link(s) refer to removed nodes")
+
+    mnet.update_data_digest('network_delta', added_links, removed_links, modified_links,
+                            added_nodes, removed_nodes, modified_nodes)
+    mnet.clear_cache(changed_elements)
+
+
+def refresh_multi_network(mnet: MultiNet) -> list:
+    """re-read the GMNS table files changed since they were loaded
+
+    A file is considered changed only if its modification time or size differs and its
+    content digest differs as well, so saving a file without edits does not trigger a reload.
+    Layers of unchanged files and their cached data are left in place.
+
+    Args:
+        mnet (MultiNet): MultiNet object generated by generate_multi_network_from_csv
+
+    Returns:
+        list: reloaded layers, e.g. ['poi', 'demand']
+    """
+
+    if mnet.input_dir is None:
+        raise Exception("MultiNet is not loaded from GMNS files, nothing to refresh!")
+
+    changed_elements = []
+    table_files = find_network_tables(mnet.input_dir, mnet.file_format)
+    for element in network_tables:
+        path_filename = table_files.get(element)
+        fingerprint_old = mnet.file_fingerprints.get(element)
+
+        if path_filename is None:
+            if fingerprint_old is not None:
+                unload_network_layer(mnet, element)
+                changed_elements.append(element)
+            continue
+
+        # links built from node coordinates follow the changed nodes
+        if element == 'link' and 'node' in changed_elements and mnet.link_geometry != 'wkt':
+            load_network_layer(mnet, element, path_filename)
+            changed_elements.append(element)
+            continue
+
+        # cheap check by modification time and size before hashing the file content
+        fingerprint_new = get_file_fingerprint(path_filename, isContentHash=False)
+        if fingerprint_old is not None and fingerprint_old['mtime'] == fingerprint_new['mtime'] \
+                and fingerprint_old['size'] == fingerprint_new['size']:
+            continue
+        fingerprint_new = get_file_fingerprint(path_filename)
+        if fingerprint_old is not None and fingerprint_old['digest'] == fingerprint_new['digest']:
+            mnet.file_fingerprints[element] = fingerprint_new
+            continue
+
+        load_network_layer(mnet, element, path_filename, fingerprint_new)
+        changed_elements.append(element)
+
+    if changed_elements:
+        # reloaded layers lose their deltas, other layers keep them
+        mnet.update_data_digest('refresh', changed_elements, mnet.file_fingerprints)
+    mnet.clear_cache(changed_elements)
+    print(f"Reloaded layer(s): {changed_elements}" if changed_elements else "No layer changed")
+    if changed_elements and mnet.validation:
+        run_network_validation(mnet)
+    return changed_elements
+
+
+def generate_visualization_map_using_keplergl(map_layer_data: dict,
+                                              map_config: dict = None,
+                                              isPruneColumns: bool = False,
+                                              coord_precision: int = None,
+                                              simplify_tolerance: float = None,
+                                              sidecar_path: str = None) -> 'KeplerGl':
+    """generate KeplerGl map from network layer data
+
+    Args:
+        map_layer_data (dict): dataframes of network layers, e.g. {'node': df_node, 'link': df_link}
+        map_config (dict): KeplerGl map config. Defaults to None, which means the default config is used.
+        isPruneColumns (bool): if True, only keep the tooltip fields listed in interactionConfig and the
+            columns used by map layers. Defaults to False.
+        coord_precision (int): number of decimals of coordinates, including coordinates inside WKT.
+            Defaults to None, which means full precision.
+        simplify_tolerance (float): tolerance of geometry simplification, in units of coordinates.
+            Defaults to None, which means no simplification.
+        sidecar_path (str): if specified, each dataset is written to a gzip compressed CSV file next to
+            this html file, e.g. plot4gmns_vis_map_link.csv.gz, and only its first sidecar_preview_rows rows
+            are embedded in the map. The html does not load the sidecar files, decompress them and add them
+            by 'Add Data' of KeplerGl to show all features. Defaults to None.
+
+    Returns:
+        KeplerGl: KeplerGl map object
+    """
+
+    # keplergl loads the Jupyter widget stack, so it is imported only when a map is generated
+    from keplergl import KeplerGl
 
     # use default map config if map_config is not provided
     map_config_default = {'version': 'v1',
@@ -335,6 +982,20 @@ def generate_visualization_map_using_keplergl(map_layer_data: dict, map_config:
     map_config_default["config"]["mapState"]["latitude"] = y_coord_mean
     map_config_default["config"]["mapState"]["longitude"] = x_coord_mean
 
+    map_layer_data = compact_map_layer_data(map_layer_data, map_config or map_config_default,
+                                            isPruneColumns, coord_precision, simplify_tolerance)
+
+    # write datasets to sidecar files, only their first rows are embedded, so that the layers of the
+    # map config have their datasets and the map opens with a preview
+    if sidecar_path:
+        file_prefix = os.path.splitext(sidecar_path)[0]
+        for key in map_layer_data:
+            map_layer_data[key].to_csv(f"{file_prefix}_{key}.csv.gz", index=False, compression='gzip')
+            map_layer_data[key] = map_layer_data[key].head(sidecar_preview_rows)
+        print(f"Successfully save map datasets to {file_prefix}_*.csv.gz, the map only shows the first "
+              f"{sidecar_preview_rows} rows of each dataset. Decompress the files and add them to the map by "
+              f"'Add Data' of KeplerGl to show all features.")
+
     try:
         # initialize the map with default height
         vis_map = KeplerGl(height=600)
@@ -352,11 +1013,64 @@ def generate_visualization_map_using_keplergl(map_layer_data: dict, map_config:
     return vis_map
 
 
+def compact_map_layer_data(map_layer_data: dict,
+                           map_config: dict,
+                           isPruneColumns: bool = True,
+                           coord_precision: int = None,
+                           simplify_tolerance: float = None) -> dict:
+    """reduce the size of KeplerGl map layer data
+
+    Args:
+        map_layer_data (dict): dataframes of network layers, e.g. {'node': df_node, 'link': df_link}
+        map_config (dict): KeplerGl map config, tooltip fields and layer columns are kept when pruning
+        isPruneColumns (bool): if True, drop columns not used by the map. Defaults to True.
+        coord_precision (int): number of decimals of coordinates. Defaults to None.
+        simplify_tolerance (float): tolerance of geometry simplification. Defaults to None.
+
+    Returns:
+        dict: compacted dataframes of network layers
+    """
+    import shapely
+
+    vis_state = map_config.get('config', {}).get('visState', {})
+    tooltip_fields = vis_state.get('interactionConfig', {}).get('tooltip', {}).get('fieldsToShow', {})
+
+    compact_layer_data = {}
+    for key, df in map_layer_data.items():
+        if isPruneColumns:
+            # geometry columns are always needed to draw the layer
+            columns = {'geometry', 'x_coord', 'y_coord', f'{key}_id'}
+            columns.update(field['name'] for field in tooltip_fields.get(key, []))
+            for layer in vis_state.get('layers', []):
+                if layer.get('config', {}).get('dataId') != key:
+                    continue
+                columns.update(v for v in layer['config'].get('columns', {}).values() if v)
+                columns.update(v['name'] for k, v in layer.get('visualChannels', {}).items()
+                               if k.endswith('Field') and isinstance(v, dict))
+            df = df[[column for column in df.columns if column in columns]]
+
+        if coord_precision is not None:
+            for column in ['x_coord', 'y_coord']:
+                if column in df.columns and pd.api.types.is_numeric_dtype(df[column]):
+                    df = df.assign(**{column: df[column].round(coord_precision)})
+
+        if 'geometry' in df.columns and (coord_precision is not None or simplify_tolerance):
+            # rows with missing or invalid WKT are kept as they are
+            geometry = shapely.from_wkt(df['geometry'].to_numpy(dtype=object), on_invalid='ignore')
+            if simplify_tolerance:
+                geometry = shapely.simplify(geometry, simplify_tolerance, preserve_topology=True)
+            wkt = shapely.to_wkt(geometry, rounding_precision=-1 if coord_precision is None else coord_precision)
+            df = df.assign(geometry=np.where(pd.isna(wkt), df['geometry'].to_numpy(dtype=object), wkt))
+
+        compact_layer_data[key] = df
+    return compact_layer_data
+
+
 def extract_coordinates_by_network_mode(mnet: MultiNet, modes: list) -> None:
     # extract node,link, and poi coordinates of the specified network mode
     mnet.link.update_coords_by_link_modes(modes)
     mnet.node.update_coords(column='node_id', values=mnet.link.node_id_list)
-    mnet.POI.update_coords_by_poi_type()
+    mnet.POI.update_coords_by_poi_type(isCoords=not mnet.style.poi_style.aggregation)
     if len(mnet.link.link_coords) == 0:
         raise Exception("please try other modes")
 
@@ -364,22 +1078,14 @@ def extract_coordinates_by_network_mode(mnet: MultiNet, modes: list) -> None:
 def extract_coordinates_by_node_types(mnet: MultiNet, osm_highway: list) -> None:
     # extract node,link, and poi coordinates of the specified node type
 
-    x_coords = []
-    y_coords = []
-    isValid = False
+    mnet.node.update_coords_by_categories('osm_highway', osm_highway)
+    extracted_types = set(mnet.node.categories)
     for highway_type in osm_highway:
-        mnet.node.update_coords(column='osm_highway', values=[highway_type])
-        x_coords.append(mnet.node.x_coords)
-        y_coords.append(mnet.node.y_coords)
-        if len(mnet.node.x_coords) == 0:
+        if highway_type not in extracted_types:
             print(f"ValueError: '{highway_type}' osm_highway not found")
-        else:
-            isValid = True
-
-    mnet.node.x_coords = x_coords
-    mnet.node.y_coords = y_coords
+    isValid = len(mnet.node.categories) > 0
     mnet.link.update_coords_by_link_modes(modes=('all'))
-    mnet.POI.update_coords_by_poi_type()
+    mnet.POI.update_coords_by_poi_type(isCoords=not mnet.style.poi_style.aggregation)
     if not isValid:
         valid_values = mnet.node.value['osm_highway'].unique()
         raise Exception(f"No results found, please try the following keywords:\n{valid_values}")
@@ -390,7 +1096,7 @@ def extract_coordinates_by_link_types(mnet: MultiNet, link_types: list) -> None:
 
     mnet.link.update_coords_by_link_types(link_types)
     mnet.node.update_coords(column='node_id', values=mnet.link.node_id_list)
-    mnet.POI.update_coords_by_poi_type()
+    mnet.POI.update_coords_by_poi_type(isCoords=not mnet.style.poi_style.aggregation)
     if len(mnet.link.link_coords) == 0:
         valid_values = mnet.link.value['facility_type'].unique()
         raise Exception(f"no results found, please try the following keywords:\n{valid_values}")
@@ -401,18 +1107,69 @@ def extract_coordinates_by_link_lane(mnet: MultiNet, lanes: tuple) -> None:
 
     mnet.link.update_coords_by_float_attr(column='lanes', min_v=lanes[0], max_v=lanes[1])
     mnet.node.update_coords(column='node_id', values=mnet.link.node_id_list)
-    mnet.POI.update_coords_by_poi_type()
+    mnet.POI.update_coords_by_poi_type(isCoords=not mnet.style.poi_style.aggregation)
     if len(mnet.link.link_coords) == 0:
         valid_values = mnet.link.value['lanes'].unique()
         raise Exception(f"no results found, the number of lanes should be between {min(valid_values)} and {max(valid_values)}")
 
 
+def extract_coordinates_by_connected_components(mnet: MultiNet, mode: str = 'all', connection: str = 'weak') -> int:
+    """extract node, link, and poi coordinates of the network of a mode, with the component of each link
+
+    The component labels of the selected links are stored in mnet.link.attr_distribution, 0 for the
+    largest component, and -1 for links between strongly connected components.
+
+    Returns:
+        int: number of connected components
+    """
+
+    graph = get_network_graph(mnet)
+    number, labels = graph.connected_components(mode, connection)
+    edges = np.flatnonzero(graph.get_edge_mask(mode))
+    source_labels, target_labels = labels[graph.source[edges]], labels[graph.indices[edges]]
+    edge_labels = np.where(source_labels == target_labels, source_labels, -1)
+    # links in both directions have two edges with the same label
+    link_positions, first_edges = np.unique(graph.edge_link[edges], return_index=True)
+
+    mnet.link.update_coords_by_positions(link_positions)
+    mnet.link.attr_distribution = edge_labels[first_edges].tolist()
+    mnet.node.update_coords(column='node_id', values=mnet.link.node_id_list)
+    mnet.POI.update_coords_by_poi_type(isCoords=not mnet.style.poi_style.aggregation)
+    if len(mnet.link.link_coords) == 0:
+        raise Exception("please try other modes")
+    return number
+
+
+def extract_coordinates_by_travel_time(mnet: MultiNet, origins, mode: str = 'all', max_time: float = None) -> None:
+    """extract node, link, and poi coordinates of the network of a mode, with the travel time to each link
+
+    The free-flow travel time in minutes from the nearest origin to the start of each selected link is
+    stored in mnet.link.attr_distribution, inf for links not reached within max_time.
+    """
+
+    graph = get_network_graph(mnet)
+    node_times = graph.get_travel_times(origins, get_link_travel_time(mnet.link.value), mode, cutoff=max_time)
+    edges = np.flatnonzero(graph.get_edge_mask(mode))
+    link_times = np.full(mnet.link.value.shape[0], np.inf)
+    np.minimum.at(link_times, graph.edge_link[edges], node_times[graph.source[edges]])
+    link_positions = np.unique(graph.edge_link[edges])
+
+    mnet.link.update_coords_by_positions(link_positions)
+    mnet.link.attr_distribution = link_times[link_positions].tolist()
+    mnet.node.update_coords(column='node_id', values=mnet.link.node_id_list)
+    mnet.POI.update_coords_by_poi_type(isCoords=not mnet.style.poi_style.aggregation)
+    if len(mnet.link.link_coords) == 0:
+        raise Exception("please try other modes")
+    if not np.isfinite(link_times[link_positions]).any():
+        print(f"Warning: no link of the {mode} network is reached from the origin(s)")
+
+
 def extract_coordinates_by_link_free_speed(mnet: MultiNet, free_speed: tuple) -> None:
     # extract node,link, and poi coordinates of the specified network link free speed
 
     mnet.link.update_coords_by_float_attr(column='free_speed', min_v=free_speed[0], max_v=free_speed[1])
     mnet.node.update_coords(column='node_id', values=mnet.link.node_id_list)
-    mnet.POI.update_coords_by_poi_type()
+    mnet.POI.update_coords_by_poi_type(isCoords=not mnet.style.poi_style.aggregation)
     if len(mnet.link.link_coords) == 0:
         valid_values = mnet.link.value['free_speed'].unique()
         raise Exception(f"no results found, the link free speed should be between {min(valid_values)} and {max(valid_values)}")
@@ -423,7 +1180,7 @@ def extract_coordinates_by_link_length(mnet: MultiNet, length: tuple) -> None:
 
     mnet.link.update_coords_by_float_attr(column='length', min_v=length[0], max_v=length[1])
     mnet.node.update_coords(column='node_id', values=mnet.link.node_id_list)
-    mnet.POI.update_coords_by_poi_type()
+    mnet.POI.update_coords_by_poi_type(isCoords=not mnet.style.poi_style.aggregation)
     if len(mnet.link.link_coords) == 0:
         valid_values = mnet.link.value['length'].unique()
         raise Exception(f"no results found, the link length should be between {max(valid_values)} and {min(valid_values)}")
@@ -432,11 +1189,15 @@ def extract_coordinates_by_link_length(mnet: MultiNet, length: tuple) -> None:
 def extract_coordinates_by_link_attr_distribution(mnet: MultiNet, column: str) -> None:
     # extract node,link, and poi coordinates of the network link lane distribution
 
-    if mnet.link.value[column].isnull().any():
-        raise Exception(f"ValueError: nan found in {column}")
+    # links of missing values are kept and drawn in the thinnest width
+    number_of_missing = int(pd.to_numeric(mnet.link.value[column], errors='coerce').isna().sum())
+    if number_of_missing == mnet.link.value.shape[0]:
+        raise Exception(f"ValueError: no valid value found in {column}")
+    if number_of_missing:
+        print(f"Warning: {number_of_missing} link(s) without {column} are drawn in the thinnest width")
     mnet.link.update_coords_by_attr_distribution(column)
     mnet.node.update_coords(column='node_id')
-    mnet.POI.update_coords_by_poi_type()
+    mnet.POI.update_coords_by_poi_type(isCoords=not mnet.style.poi_style.aggregation)
 
 
 def extract_coordinates_by_poi_type(mnet: MultiNet, poi_type: list) -> None:
@@ -444,8 +1205,8 @@ def extract_coordinates_by_poi_type(mnet: MultiNet, poi_type: list) -> None:
 
     mnet.node.update_coords(column='node_id')
     mnet.link.update_coords_by_link_modes(modes=('all'))
-    mnet.POI.update_coords_by_poi_type(poi_type=poi_type)
-    if len(mnet.POI.poi_coords) == 0:
+    mnet.POI.update_coords_by_poi_type(poi_type=poi_type, isCoords=not mnet.style.poi_style.aggregation)
+    if len(mnet.POI.selected_index) == 0:
         valid_values_1 = mnet.POI.value['building'].unique().tolist()
         valid_values_2 = mnet.POI.value['amenity'].unique().tolist()
         valid_values_3 = mnet.POI.value['leisure'].unique().tolist()
@@ -460,7 +1221,7 @@ def extract_coordinates_by_poi_attr_distribution(mnet: MultiNet, column: str) ->
         raise Exception(f"ValueError: nan found in {column}")
     mnet.node.update_coords(column='node_id')
     mnet.link.update_coords_by_link_modes(modes=('all'))
-    mnet.POI.update_coords_by_attr_distribution(column=column)
+    mnet.POI.update_coords_by_attr_distribution(column=column, isCoords=not mnet.style.poi_style.aggregation)
 
 
 def count_demand_matrix(mnet: MultiNet) -> None:
@@ -468,13 +1229,119 @@ def count_demand_matrix(mnet: MultiNet) -> None:
     mnet.demand.update_demand_matrix(mnet.zone.value.shape[0])
 
 
-def extract_coordinates_by_demand_OD(mnet: MultiNet, load_zone: bool, load_network: bool) -> None:
-    # extract coordinates of the network demand OD
+def extract_demand_OD_by_periods(mnet: MultiNet, time_column: str, periods: list = None) -> tuple:
+    """endpoints of the OD line of every demand row at once, and the rows of each time period
+
+    OD lines go from the first to the last vertex of the demand geometry, or between zone centroids
+    if the demand has no geometry. Rows of zero volume or without endpoints are left out.
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        time_column (str): time period column of the demand table
+        periods (list): periods in the order of frames. Defaults to None, which means all periods sorted.
+
+    Returns:
+        tuple: (points (m, 2), start and end point of each row, volume of each row,
+            {period: positions of the rows of the period})
+    """
+
+    if not mnet.demand_loaded:
+        raise Exception("demand layer is not loaded!")
+    od = mnet.demand.value
+    if time_column not in od.columns:
+        raise Exception(f"ValueError: demand table does not contain column {time_column}")
+
+    if mnet.demand.geometry is not None:
+        buffer = mnet.demand.geometry
+        geometry_ids = od['geometry_id'].to_numpy()
+        first_parts = np.asarray(buffer.geom_offsets)[geometry_ids]
+        end_parts = np.asarray(buffer.geom_offsets)[geometry_ids + 1]
+        isValid = end_parts > first_parts
+        part_offsets = np.asarray(buffer.part_offsets)
+        start = np.where(isValid, part_offsets[first_parts], -1)
+        end = np.where(isValid, part_offsets[end_parts] - 1, -1)
+        points = buffer.coords
+    else:
+        if not mnet.zone_loaded:
+            raise Exception("zone layer is required to draw OD lines between zone centroids!")
+        centroids = mnet.zone.get_centroids()
+        start = centroids.index.get_indexer(od['o_zone_id'])
+        end = centroids.index.get_indexer(od['d_zone_id'])
+        isValid = (start >= 0) & (end >= 0)
+        if not isValid.all():
+            print(f"Warning: {(~isValid).sum()} OD pair(s) refer to zones without centroid and are not drawn")
+        points = centroids[['x', 'y']].to_numpy(dtype=float)
+
+    volume = pd.to_numeric(od['volume'], errors='coerce').to_numpy(dtype=float)
+    rows = np.flatnonzero(isValid & (volume > 0))
+    groups = pd.Series(rows).groupby(od[time_column].to_numpy()[rows], sort=True).indices
+    if periods is None:
+        # periods without any OD line are kept as empty frames
+        periods = sorted(od[time_column].dropna().unique())
+    period_rows = {period: rows[groups[period]] if period in groups else rows[:0] for period in periods}
+    return points, start, end, volume, period_rows
+
+
+def get_zone_groups(mnet: MultiNet, zone_groups) -> pd.Series:
+    # group of each zone indexed by zone_id, from a zone column name, a dict or a series
+    if zone_groups is None or isinstance(zone_groups, pd.Series):
+        return zone_groups
+    if isinstance(zone_groups, str):
+        if zone_groups not in mnet.zone.value.columns:
+            raise Exception(f"ValueError: zone table does not contain column {zone_groups}")
+        return pd.Series(mnet.zone.value[zone_groups].to_numpy(), index=mnet.zone.value['zone_id'].to_numpy())
+    if isinstance(zone_groups, dict):
+        return pd.Series(zone_groups)
+    raise Exception("TypeError: zone_groups should be a zone column name, a dict or a pd.Series")
+
+
+def get_zone_label_priority(mnet: MultiNet, label_priority=None) -> np.ndarray:
+    """priority of each zone label, in the order of the zone table
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        label_priority (str | dict | pd.Series): zone column name, or priority of each zone_id. Defaults to
+            None, which means the total volume from and to the zone, or the zone order without demand.
+
+    Returns:
+        np.ndarray: priority of each zone, larger values are labeled first
+    """
+
+    zone_id = mnet.zone.value['zone_id']
+    if label_priority is None:
+        if not mnet.demand_loaded:
+            return -np.arange(len(zone_id), dtype=float)
+        demand = mnet.demand.value
+        volume = (demand.groupby('o_zone_id')['volume'].sum()
+                  .add(demand.groupby('d_zone_id')['volume'].sum(), fill_value=0))
+        return volume.reindex(zone_id.to_numpy()).fillna(0).to_numpy(dtype=float)
+    if isinstance(label_priority, str):
+        if label_priority not in mnet.zone.value.columns:
+            raise Exception(f"ValueError: zone table does not contain column {label_priority}")
+        return pd.to_numeric(mnet.zone.value[label_priority], errors='coerce').fillna(-np.inf).to_numpy(dtype=float)
+    if isinstance(label_priority, dict):
+        label_priority = pd.Series(label_priority)
+    return label_priority.reindex(zone_id.to_numpy()).fillna(-np.inf).to_numpy(dtype=float)
+
+
+def extract_coordinates_by_demand_OD(mnet: MultiNet,
+                                     load_zone: bool,
+                                     load_network: bool,
+                                     min_volume: float = None,
+                                     top_k: int = None,
+                                     zone_groups=None) -> None:
+    # extract coordinates of the network demand OD, see Demand.update_coords for the selection
+    zone_groups = get_zone_groups(mnet, zone_groups)
+    centroids = None
+    if mnet.demand.geometry is None or zone_groups is not None:
+        if not mnet.zone_loaded:
+            raise Exception("zone layer is required to draw OD lines between zone centroids!")
+        centroids = mnet.zone.get_centroids()
 
-    mnet.demand.update_coords()
+    mnet.demand.update_coords(centroids, min_volume, top_k, zone_groups)
     if load_zone:
         mnet.zone.update_coords()
     if load_network:
         mnet.node.update_coords()
         mnet.link.update_coords_by_link_modes(modes=('all'))
-        mnet.POI.update_coords_by_poi_type()
+        mnet.POI.update_coords_by_poi_type(isCoords=not mnet.style.poi_style.aggregation)
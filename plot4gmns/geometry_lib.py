@@ -0,0 +1,507 @@
+# -*- coding:utf-8 -*-
+##############################################################
+# Created Date: Monday, October 19th 2026
+# Contact Info: luoxiangyong01@gmail.com
+# Author/Copyright: Mr. Xiangyong Luo
+##############################################################
+
+import os
+import numpy as np
+import pandas as pd
+from .utility_lib import path2linux
+
+# geometry type codes stored in GeometryBuffer.geom_types
+GEOM_EMPTY = 0
+GEOM_LINESTRING = 1
+GEOM_POLYGON = 2
+GEOM_MULTIPOLYGON = 3
+
+# mean earth radius in meters, for great-circle lengths of lon/lat coordinates
+EARTH_RADIUS = 6371008.8
+
+# translation table of WKT text keeping the characters of numbers only
+wkt_number_table = str.maketrans({chr(i): ' ' for i in range(128) if chr(i) not in '0123456789.-+eE'})
+
+# file suffix and dtype of each array of a memory-mapped GeometryBuffer
+buffer_arrays = {
+    'coords': ('coords.f8', np.float64),
+    'part_offsets': ('part_offsets.i8', np.int64),
+    'geom_offsets': ('geom_offsets.i8', np.int64),
+    'part_exterior': ('part_exterior.b1', np.bool_),
+    'geom_types': ('geom_types.u1', np.uint8)}
+
+
+def get_ragged_index(offsets: np.ndarray, positions: np.ndarray) -> tuple:
+    """gather index of the items of selected groups in a ragged array
+
+    Args:
+        offsets (np.ndarray): group i holds items offsets[i]:offsets[i + 1]
+        positions (np.ndarray): selected groups
+
+    Returns:
+        tuple: (item index, offsets of the selected groups)
+    """
+    starts = np.asarray(offsets[positions], dtype=np.int64)
+    counts = np.asarray(offsets[positions + 1], dtype=np.int64) - starts
+    new_offsets = np.zeros(len(positions) + 1, dtype=np.int64)
+    np.cumsum(counts, out=new_offsets[1:])
+    index = np.repeat(starts - new_offsets[:-1], counts) + np.arange(new_offsets[-1], dtype=np.int64)
+    return index, new_offsets
+
+
+class GeometryBuffer:
+    """flat vertex buffer of line and polygon geometries
+
+    Vertices of all geometries are stored in one (M, 2) coords array. Each geometry has one or
+    more parts: a LineString has a single part, a Polygon has its rings as parts (exterior ring
+    first) and a MultiPolygon has the rings of all its polygons, where part_exterior marks the
+    first ring of each polygon.
+
+    coords[part_offsets[p]:part_offsets[p + 1]] are the vertices of part p, and
+    part_offsets[geom_offsets[g]:geom_offsets[g + 1] + 1] are the parts of geometry g.
+    The arrays can be numpy arrays in memory or memory-mapped files.
+    """
+
+    def __init__(self, coords: np.ndarray, part_offsets: np.ndarray, geom_offsets: np.ndarray,
+                 part_exterior: np.ndarray, geom_types: np.ndarray):
+        self.coords = coords
+        self.part_offsets = part_offsets
+        self.geom_offsets = geom_offsets
+        self.part_exterior = part_exterior
+        self.geom_types = geom_types
+        self.path_prefix = None  # prefix of memory-mapped files, None if the buffer is in memory
+        self._capacity = {}  # {array name: (storage, view)} of in-memory arrays grown by append, see append
+
+    def __len__(self) -> int:
+        return len(self.geom_types)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, 2)), np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64),
+                   np.zeros(0, dtype=np.bool_), np.zeros(0, dtype=np.uint8))
+
+    @classmethod
+    def from_shapely(cls, geometries: np.ndarray):
+        """build a buffer from shapely LineString, Polygon and MultiPolygon geometries, None is kept as empty"""
+        import shapely
+
+        geometries = np.asarray(geometries, dtype=object)
+        type_ids = shapely.get_type_id(geometries)
+        geom_types = np.full(len(geometries), GEOM_EMPTY, dtype=np.uint8)
+        geom_types[type_ids == shapely.GeometryType.LINESTRING] = GEOM_LINESTRING
+        geom_types[type_ids == shapely.GeometryType.POLYGON] = GEOM_POLYGON
+        geom_types[type_ids == shapely.GeometryType.MULTIPOLYGON] = GEOM_MULTIPOLYGON
+        geom_types[shapely.is_empty(geometries) | shapely.is_missing(geometries)] = GEOM_EMPTY
+
+        # a part is a linestring or a ring of a polygon
+        isLine = geom_types == GEOM_LINESTRING
+        isPolygon = (geom_types == GEOM_POLYGON) | (geom_types == GEOM_MULTIPOLYGON)
+        line_parts, line_index = geometries[isLine], np.flatnonzero(isLine)
+        polygons, polygon_index = shapely.get_parts(geometries[isPolygon], return_index=True)
+        rings, ring_polygon = shapely.get_rings(polygons, return_index=True)
+        ring_exterior = np.ones(len(rings), dtype=np.bool_)
+        ring_exterior[1:] = ring_polygon[1:] != ring_polygon[:-1]
+
+        # order parts by geometry, parts of the same geometry keep their order
+        part_geometry = np.concatenate([line_index, np.flatnonzero(isPolygon)[polygon_index][ring_polygon]])
+        parts = np.concatenate([line_parts, rings])
+        part_exterior = np.concatenate([np.ones(len(line_parts), dtype=np.bool_), ring_exterior])
+        order = np.argsort(part_geometry, kind='stable')
+        parts, part_geometry, part_exterior = parts[order], part_geometry[order], part_exterior[order]
+
+        coords, coord_part = shapely.get_coordinates(parts, return_index=True)
+        part_offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(coord_part, minlength=len(parts)), out=part_offsets[1:])
+        geom_offsets = np.zeros(len(geometries) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(part_geometry, minlength=len(geometries)), out=geom_offsets[1:])
+        return cls(coords, part_offsets, geom_offsets, part_exterior, geom_types)
+
+    @classmethod
+    def from_wkt(cls, values):
+        """parse a column of 2D LINESTRING, POLYGON and MULTIPOLYGON WKT strings at once
+
+        The strings are joined into one byte array, the structure is found from the positions of
+        parentheses and commas, and all numbers are converted in a single call, so no geometry
+        object is created. Missing values and EMPTY geometries are kept as empty. Columns with
+        other geometry types, Z coordinates, WKB bytes or shapely objects are parsed by shapely instead.
+
+        Args:
+            values (pd.Series | np.ndarray | list): WKT strings
+
+        Returns:
+            GeometryBuffer: geometry of each value, in the same order
+        """
+
+        values = pd.Series(values, dtype=object).reset_index(drop=True)
+        isMissing = values.isna().to_numpy()
+        number_of_geometries = len(values)
+        if isMissing.all():
+            return cls(np.zeros((0, 2)), np.zeros(1, dtype=np.int64),
+                       np.zeros(number_of_geometries + 1, dtype=np.int64), np.zeros(0, dtype=np.bool_),
+                       np.full(number_of_geometries, GEOM_EMPTY, dtype=np.uint8))
+        if pd.api.types.infer_dtype(values, skipna=True) != 'string':
+            return cls._from_wkt_by_shapely(values)
+
+        # one byte array of all rows separated by ';', which is not used in WKT
+        text = ';'.join(values.where(~isMissing, '').tolist())
+        if text.count(';') != number_of_geometries - 1 or not text.isascii():
+            return cls._from_wkt_by_shapely(values)
+
+        # the structure is read from the characters without spaces, so neighbours are adjacent
+        c = np.append(np.frombuffer(text.replace(' ', '').encode('ascii'), dtype=np.uint8), np.zeros(8, dtype=np.uint8))
+        row_starts = np.concatenate([[0], np.flatnonzero(c == ord(';')) + 1])
+
+        # geometry type from the keyword: LINESTRING, POLYGON or MULTIPOLYGON
+        keyword = np.char.upper(np.stack([c[row_starts + k] for k in range(6)], axis=1).view('S6').ravel())
+        open_positions = np.flatnonzero(c == ord('('))
+        if len(open_positions) != np.count_nonzero(c == ord(')')):
+            return cls._from_wkt_by_shapely(values)
+
+        # a part starts at an opening parenthesis followed by a number, and is an exterior ring
+        # (or a linestring) unless it follows a comma
+        part_starts = open_positions[c[open_positions + 1] != ord('(')]
+        part_exterior = c[part_starts - 1] != ord(',')
+        part_geometry = np.searchsorted(row_starts, part_starts, side='right') - 1
+        part_counts = np.bincount(part_geometry, minlength=number_of_geometries)
+
+        geom_types = np.full(number_of_geometries, GEOM_EMPTY, dtype=np.uint8)
+        hasParts = part_counts > 0
+        geom_types[np.char.startswith(keyword, b'LINEST') & hasParts] = GEOM_LINESTRING
+        geom_types[np.char.startswith(keyword, b'POLYGO') & hasParts] = GEOM_POLYGON
+        geom_types[np.char.startswith(keyword, b'MULTIP') & hasParts] = GEOM_MULTIPOLYGON
+        if (hasParts & (geom_types == GEOM_EMPTY)).any():
+            return cls._from_wkt_by_shapely(values)
+
+        # commas between vertices, not between parts, counted for each part
+        comma_positions = np.flatnonzero(c == ord(','))
+        vertex_commas = comma_positions[c[comma_positions - 1] != ord(')')]
+        vertex_counts = np.bincount(np.searchsorted(part_starts, vertex_commas, side='right') - 1,
+                                    minlength=len(part_starts)) + 1
+
+        # keep characters of numbers only, keywords with an e are removed first as e is also an exponent
+        for word in ['LINESTRING', 'EMPTY', 'linestring', 'empty']:
+            text = text.replace(word, ' ')
+        try:
+            numbers = np.fromstring(text.translate(wkt_number_table), dtype=np.float64, sep=' ')
+        except ValueError:
+            return cls._from_wkt_by_shapely(values)
+        if len(numbers) != 2 * vertex_counts.sum():
+            return cls._from_wkt_by_shapely(values)
+
+        part_offsets = np.zeros(len(part_starts) + 1, dtype=np.int64)
+        np.cumsum(vertex_counts, out=part_offsets[1:])
+        geom_offsets = np.zeros(number_of_geometries + 1, dtype=np.int64)
+        np.cumsum(part_counts, out=geom_offsets[1:])
+        return cls(numbers.reshape(-1, 2), part_offsets, geom_offsets, part_exterior, geom_types)
+
+    @classmethod
+    def _from_wkt_by_shapely(cls, values: pd.Series):
+        # parse values which are not plain 2D WKT of supported types
+        return cls.from_shapely(cls.to_shapely_values(values))
+
+    @staticmethod
+    def to_shapely_values(values: pd.Series) -> np.ndarray:
+        """convert WKT strings, WKB bytes (e.g. GeoParquet) or shapely objects to shapely geometries"""
+        import shapely
+
+        values = pd.Series(values, dtype=object)
+        value_type = pd.api.types.infer_dtype(values, skipna=True)
+        if value_type == 'bytes':
+            geometries = shapely.from_wkb(values.where(values.notna(), None).to_numpy(), on_invalid='ignore')
+        elif value_type == 'string':
+            geometries = shapely.from_wkt(values.where(values.notna(), None).to_numpy(), on_invalid='ignore')
+        else:
+            geometries = values.map(lambda x: shapely.from_wkt(x, on_invalid='ignore') if isinstance(x, str) else
+                                    shapely.from_wkb(x, on_invalid='ignore') if isinstance(x, bytes) else x)
+            geometries = geometries.where(geometries.notna(), None).to_numpy()
+
+        # invalid values are kept as empty geometries, so that they can be reported by the validator
+        # blank strings are missing values, WKB bytes are not decoded as text
+        isBlank = values.map(lambda x: isinstance(x, str) and x.strip() == '').to_numpy(dtype=np.bool_)
+        isInvalid = values.notna().to_numpy() & ~isBlank & shapely.is_missing(geometries)
+        if isInvalid.any():
+            print(f"Warning: {isInvalid.sum()} invalid WKT or WKB value(s) are parsed as empty geometries")
+        return geometries
+
+    @classmethod
+    def from_segments(cls, start: np.ndarray, end: np.ndarray, isValid: np.ndarray = None):
+        """build a buffer of straight two-point linestrings, invalid rows are kept as empty"""
+        number_of_lines = len(start)
+        isValid = np.ones(number_of_lines, dtype=np.bool_) if isValid is None else np.asarray(isValid, dtype=np.bool_)
+        coords = np.stack([np.asarray(start, dtype=np.float64)[isValid],
+                           np.asarray(end, dtype=np.float64)[isValid]], axis=1).reshape(-1, 2)
+        number_of_parts = int(isValid.sum())
+        geom_offsets = np.zeros(number_of_lines + 1, dtype=np.int64)
+        np.cumsum(isValid, out=geom_offsets[1:])
+        geom_types = np.where(isValid, GEOM_LINESTRING, GEOM_EMPTY).astype(np.uint8)
+        return cls(coords, np.arange(0, 2 * number_of_parts + 1, 2, dtype=np.int64), geom_offsets,
+                   np.ones(number_of_parts, dtype=np.bool_), geom_types)
+
+    @classmethod
+    def concatenate(cls, buffers: list):
+        """join buffers into a new in-memory buffer, geometries keep the order of the buffers"""
+        buffer = cls.empty()
+        for other in buffers:
+            buffer.append(other)
+        return buffer
+
+    def take(self, positions: np.ndarray):
+        """compact copy of the selected geometries"""
+        positions = np.asarray(positions, dtype=np.int64)
+        part_index, geom_offsets = get_ragged_index(self.geom_offsets, positions)
+        coord_index, part_offsets = get_ragged_index(self.part_offsets, part_index)
+        return GeometryBuffer(np.asarray(self.coords[coord_index]), part_offsets, geom_offsets,
+                              np.asarray(self.part_exterior[part_index]), np.asarray(self.geom_types[positions]))
+
+    def take_line_coords(self, positions: np.ndarray) -> list:
+        """vertex arrays of the first part of the selected geometries, e.g. for LineCollection"""
+        positions = np.asarray(positions, dtype=np.int64)
+        first_parts = np.asarray(self.geom_offsets[positions])
+        starts = np.asarray(self.part_offsets[first_parts])
+        ends = np.where(np.asarray(self.geom_offsets[positions + 1]) > first_parts,
+                        np.asarray(self.part_offsets[first_parts + 1]), starts)
+        if len(positions) == 0:
+            return []
+        # read the touched vertices at once, then split them into views
+        coord_index, offsets = get_ragged_index(np.stack([starts, ends], axis=1).ravel(),
+                                                np.arange(0, 2 * len(positions), 2))
+        coords = np.asarray(self.coords[coord_index])
+        return [coords[offsets[i]:offsets[i + 1]] for i in range(len(positions))]
+
+    def take_exterior_coords(self, positions: np.ndarray) -> list:
+        """exterior ring vertices of the selected polygons, e.g. for PolyCollection
+
+        The exterior rings of a MultiPolygon are joined into one vertex list without
+        their closing vertices.
+        """
+        buffer = self.take(positions)
+        coords_list = []
+        for g in range(len(buffer)):
+            parts = range(buffer.geom_offsets[g], buffer.geom_offsets[g + 1])
+            exterior_parts = [p for p in parts if buffer.part_exterior[p]]
+            if buffer.geom_types[g] == GEOM_POLYGON and exterior_parts:
+                p = exterior_parts[0]
+                coords_list.append(buffer.coords[buffer.part_offsets[p]:buffer.part_offsets[p + 1]])
+            elif buffer.geom_types[g] == GEOM_MULTIPOLYGON:
+                coords_list.append(np.concatenate(
+                    [buffer.coords[buffer.part_offsets[p]:buffer.part_offsets[p + 1] - 1] for p in exterior_parts]))
+            else:
+                coords_list.append(np.zeros((0, 2)))
+        return coords_list
+
+    def take_lengths(self, positions: np.ndarray = None, isGeographic: bool = False) -> np.ndarray:
+        """length of lines and perimeter of polygons of the selected geometries, computed at once
+
+        Args:
+            positions (np.ndarray): selected geometries, all geometries if None. Defaults to None.
+            isGeographic (bool): if True, coordinates are lon/lat degrees and lengths are great-circle
+                (haversine) meters, otherwise lengths are in units of the coordinates. Defaults to False.
+
+        Returns:
+            np.ndarray: length of each geometry, NaN for geometries without a segment
+        """
+
+        buffer = self if positions is None else self.take(positions)
+        n_geom = len(buffer)
+        n_parts = len(buffer.part_exterior)
+        coords = np.asarray(buffer.coords)
+        coord_part = np.repeat(np.arange(n_parts), np.diff(buffer.part_offsets))
+        isSegment = coord_part[:-1] == coord_part[1:]
+        start, end = coords[:-1][isSegment], coords[1:][isSegment]
+
+        if isGeographic:
+            lon1, lat1 = np.radians(start[:, 0]), np.radians(start[:, 1])
+            lon2, lat2 = np.radians(end[:, 0]), np.radians(end[:, 1])
+            a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+            segment_lengths = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+        else:
+            segment_lengths = np.hypot(end[:, 0] - start[:, 0], end[:, 1] - start[:, 1])
+
+        segment_part = coord_part[:-1][isSegment]
+        part_geom = np.repeat(np.arange(n_geom), np.diff(buffer.geom_offsets))
+        lengths = np.bincount(part_geom[segment_part], segment_lengths, n_geom)
+        number_of_segments = np.bincount(part_geom[segment_part], minlength=n_geom)
+        return np.where(number_of_segments > 0, lengths, np.nan)
+
+    def is_geographic(self) -> bool:
+        # whether all coordinates are in the range of lon/lat degrees, checked in blocks for memory-mapped buffers
+        for start in range(0, len(self.coords), 1 << 22):
+            block = np.asarray(self.coords[start:start + (1 << 22)])
+            if (np.abs(block[:, 0]) > 180).any() or (np.abs(block[:, 1]) > 90).any():
+                return False
+        return True
+
+    def take_centroids(self, positions: np.ndarray) -> np.ndarray:
+        """area centroids of the exterior rings of the selected geometries, computed at once
+
+        Holes are ignored. Geometries without area get the mean of their exterior vertices,
+        empty geometries get NaN.
+
+        Returns:
+            np.ndarray: (n, 2) array of x, y
+        """
+        buffer = self.take(positions)
+        n_geom = len(buffer)
+        centroids = np.full((n_geom, 2), np.nan)
+        if len(buffer.coords) == 0:
+            return centroids
+
+        n_parts = len(buffer.part_exterior)
+        part_geom = np.repeat(np.arange(n_geom), np.diff(buffer.geom_offsets))
+        coord_part = np.repeat(np.arange(n_parts), np.diff(buffer.part_offsets))
+        isExterior = np.asarray(buffer.part_exterior, dtype=bool)[coord_part]
+
+        # vertices relative to the first vertex of their geometry, to keep precision of projected coordinates
+        origins = np.zeros((n_geom, 2))
+        hasCoords = np.diff(buffer.part_offsets[buffer.geom_offsets]) > 0
+        origins[hasCoords] = buffer.coords[buffer.part_offsets[buffer.geom_offsets[:-1][hasCoords]]]
+        coords = buffer.coords - origins[part_geom[coord_part]]
+
+        # shoelace formula on the edges of each exterior ring
+        isEdge = isExterior[:-1] & (coord_part[:-1] == coord_part[1:])
+        x0, y0 = coords[:-1, 0][isEdge], coords[:-1, 1][isEdge]
+        x1, y1 = coords[1:, 0][isEdge], coords[1:, 1][isEdge]
+        cross = x0 * y1 - x1 * y0
+        edge_part = coord_part[:-1][isEdge]
+        part_area = np.bincount(edge_part, cross, n_parts) / 2
+        part_mx = np.bincount(edge_part, (x0 + x1) * cross, n_parts) / 6
+        part_my = np.bincount(edge_part, (y0 + y1) * cross, n_parts) / 6
+
+        # rings of a MultiPolygon may have different orientations
+        sign = np.where(part_area < 0, -1.0, 1.0)
+        area = np.bincount(part_geom, part_area * sign, n_geom)
+        mx = np.bincount(part_geom, part_mx * sign, n_geom)
+        my = np.bincount(part_geom, part_my * sign, n_geom)
+
+        # vertex mean of geometries without area
+        coord_geom = part_geom[coord_part][isExterior]
+        n_vertex = np.bincount(coord_geom, minlength=n_geom)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            centroids[:, 0] = np.bincount(coord_geom, coords[isExterior, 0], n_geom) / n_vertex
+            centroids[:, 1] = np.bincount(coord_geom, coords[isExterior, 1], n_geom) / n_vertex
+            hasArea = area > 0
+            centroids[hasArea, 0] = mx[hasArea] / area[hasArea]
+            centroids[hasArea, 1] = my[hasArea] / area[hasArea]
+        return centroids + origins
+
+    def to_shapely(self, positions: np.ndarray = None) -> np.ndarray:
+        """create shapely geometries of the selected geometries, all geometries if positions is None"""
+        import shapely
+
+        buffer = self if positions is None else self.take(positions)
+        geometries = np.full(len(buffer), None, dtype=object)
+
+        isLine = buffer.geom_types == GEOM_LINESTRING
+        if isLine.any():
+            line_buffer = buffer.take(np.flatnonzero(isLine))
+            geometries[isLine] = shapely.from_ragged_array(
+                shapely.GeometryType.LINESTRING, line_buffer.coords, (line_buffer.part_offsets,))
+
+        isPolygon = (buffer.geom_types == GEOM_POLYGON) | (buffer.geom_types == GEOM_MULTIPOLYGON)
+        if isPolygon.any():
+            polygon_buffer = buffer.take(np.flatnonzero(isPolygon))
+            # rings are grouped into polygons by the exterior flags, polygons into geometries by geom_offsets
+            polygon_starts = np.flatnonzero(polygon_buffer.part_exterior)
+            polygon_offsets = np.append(polygon_starts, len(polygon_buffer.part_exterior))
+            polygon_geometry_offsets = np.searchsorted(polygon_starts, polygon_buffer.geom_offsets)
+            multipolygons = shapely.from_ragged_array(
+                shapely.GeometryType.MULTIPOLYGON, polygon_buffer.coords,
+                (polygon_buffer.part_offsets, polygon_offsets, polygon_geometry_offsets))
+            isSingle = polygon_buffer.geom_types == GEOM_POLYGON
+            multipolygons[isSingle] = shapely.get_geometry(multipolygons[isSingle], 0)
+            geometries[isPolygon] = multipolygons
+        return geometries
+
+    def append(self, other) -> np.ndarray:
+        """append the geometries of another buffer, memory-mapped files are extended on disk
+
+        In-memory arrays grow into storage of doubled capacity, so repeated appends copy the existing
+        geometries only O(log n) times and cost amortized time proportional to the appended geometries.
+
+        Returns:
+            np.ndarray: positions of the appended geometries
+        """
+        positions = np.arange(len(self), len(self) + len(other), dtype=np.int64)
+        arrays = {'coords': other.coords,
+                  'part_offsets': np.asarray(other.part_offsets[1:]) + self.part_offsets[-1],
+                  'geom_offsets': np.asarray(other.geom_offsets[1:]) + self.geom_offsets[-1],
+                  'part_exterior': other.part_exterior,
+                  'geom_types': other.geom_types}
+        if self.path_prefix is None:
+            for name, array in arrays.items():
+                setattr(self, name, self._append_array(name, np.asarray(array)))
+        else:
+            for name, array in arrays.items():
+                suffix, dtype = buffer_arrays[name]
+                with open(f"{self.path_prefix}{suffix}", 'ab') as f:
+                    f.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+            self._open_memmap()
+        return positions
+
+    def _append_array(self, name: str, array: np.ndarray) -> np.ndarray:
+        # view of the array with the appended values, the storage is reused while it has spare capacity
+        current = getattr(self, name)
+        size = len(current) + len(array)
+        storage, view = self._capacity.get(name, (None, None))
+        if view is not current or len(storage) < size:
+            # the array was replaced, e.g. by projection, or the storage is full
+            dtype = np.result_type(current, array)
+            storage = np.empty((max(size, 2 * len(current), 16),) + current.shape[1:], dtype=dtype)
+            storage[:len(current)] = current
+        storage[len(current):size] = array
+        view = storage[:size]
+        self._capacity[name] = (storage, view)
+        return view
+
+    def _open_memmap(self) -> None:
+        for name, (suffix, dtype) in buffer_arrays.items():
+            array = np.memmap(f"{self.path_prefix}{suffix}", dtype=dtype, mode='r')
+            setattr(self, name, array.reshape(-1, 2) if name == 'coords' else array)
+
+    @classmethod
+    def open_memmap(cls, memmap_dir: str, name: str):
+        """open a buffer saved by GeometryBufferWriter"""
+        buffer = cls.empty()
+        buffer.path_prefix = path2linux(os.path.join(memmap_dir, f"{name}_"))
+        buffer._open_memmap()
+        return buffer
+
+
+class GeometryBufferWriter:
+    """write a GeometryBuffer to memory-mapped files chunk by chunk
+
+    Files are named {name}_coords.f8, {name}_part_offsets.i8, ... in memmap_dir and
+    existing files of the same name are overwritten.
+    """
+
+    def __init__(self, memmap_dir: str, name: str):
+        if not os.path.isdir(memmap_dir):
+            os.makedirs(memmap_dir)
+        self.memmap_dir = memmap_dir
+        self.name = name
+        self.path_prefix = path2linux(os.path.join(memmap_dir, f"{name}_"))
+        self.number_of_geometries = 0
+        self.number_of_parts = 0
+        self.number_of_coords = 0
+        self.files = {key: open(f"{self.path_prefix}{suffix}", 'wb') for key, (suffix, _) in buffer_arrays.items()}
+        self.files['part_offsets'].write(np.zeros(1, dtype=np.int64).tobytes())
+        self.files['geom_offsets'].write(np.zeros(1, dtype=np.int64).tobytes())
+
+    def append(self, buffer: GeometryBuffer) -> np.ndarray:
+        """write a chunk of geometries, return their positions in the final buffer"""
+        positions = np.arange(self.number_of_geometries, self.number_of_geometries + len(buffer), dtype=np.int64)
+        self.files['coords'].write(np.ascontiguousarray(buffer.coords, dtype=np.float64).tobytes())
+        self.files['part_offsets'].write((buffer.part_offsets[1:] + self.number_of_coords).astype(np.int64).tobytes())
+        self.files['geom_offsets'].write((buffer.geom_offsets[1:] + self.number_of_parts).astype(np.int64).tobytes())
+        self.files['part_exterior'].write(buffer.part_exterior.astype(np.bool_).tobytes())
+        self.files['geom_types'].write(buffer.geom_types.astype(np.uint8).tobytes())
+        self.number_of_geometries += len(buffer)
+        self.number_of_parts += len(buffer.part_exterior)
+        self.number_of_coords += len(buffer.coords)
+        return positions
+
+    def close(self) -> GeometryBuffer:
+        """close the files and open them as a memory-mapped GeometryBuffer"""
+        for f in self.files.values():
+            f.close()
+        return GeometryBuffer.open_memmap(self.memmap_dir, self.name)
@@ -0,0 +1,427 @@
+# -*- coding:utf-8 -*-
+##############################################################
+# Created Date: Monday, October 19th 2026
+# Contact Info: luoxiangyong01@gmail.com
+# Author/Copyright: Mr. Xiangyong Luo
+##############################################################
+
+import numpy as np
+import pandas as pd
+from .utility_lib import network_modes
+from .geometry_lib import get_ragged_index
+
+
+def import_scipy_sparse():
+    # scipy is optional, graph algorithms fall back to numpy and pure python without it
+    try:
+        import scipy.sparse
+        import scipy.sparse.csgraph
+    except ImportError:
+        return None
+    return scipy.sparse
+
+
+class NetworkGraph:
+    """directed graph of GMNS links in compressed sparse row (CSR) form
+
+    Nodes are numbered by the position of their node_id in node_ids. The outgoing edges of
+    node i are indices[indptr[i]:indptr[i + 1]], and edge_link maps each edge to the row
+    position of its link in the link table, so link attributes can be gathered for edges at once.
+    Links with dir_flag 0 have an edge in each direction, links with dir_flag -1 go from
+    to_node_id to from_node_id.
+    """
+
+    def __init__(self, node_ids: np.ndarray, source: np.ndarray, target: np.ndarray, edge_link: np.ndarray,
+                 mode_masks: dict = None):
+        # edges are sorted by source node, the order of parallel edges is kept
+        order = np.argsort(source, kind='stable')
+        self.node_ids = np.asarray(node_ids)
+        self.node_index = pd.Index(self.node_ids)
+        self.source = source[order]
+        self.indices = target[order]
+        self.edge_link = edge_link[order]
+        self.indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.source, minlength=len(node_ids)), out=self.indptr[1:])
+        self.mode_masks = {mode: mask[self.edge_link] for mode, mask in (mode_masks or {}).items()}
+
+    @classmethod
+    def from_tables(cls, node: pd.DataFrame, link: pd.DataFrame):
+        """build the graph from the node and link tables
+
+        Args:
+            node (pd.DataFrame): node table with node_id, may be None
+            link (pd.DataFrame): link table with from_node_id and to_node_id, and optionally
+                dir_flag and the mode columns created by Link.extract_link_modes
+
+        Returns:
+            NetworkGraph: graph object
+        """
+
+        from_ids = link['from_node_id'].to_numpy()
+        to_ids = link['to_node_id'].to_numpy()
+        isValid = ~(pd.isna(from_ids) | pd.isna(to_ids))
+        # nodes are numbered in the order of the node table, then of the link ends not in it
+        id_values = [from_ids[isValid], to_ids[isValid]]
+        if node is not None and 'node_id' in node.columns:
+            id_values.insert(0, node['node_id'].dropna().to_numpy())
+        codes, node_ids = pd.factorize(np.concatenate(id_values))
+        number_of_links = int(isValid.sum())
+        source = codes[len(codes) - 2 * number_of_links:len(codes) - number_of_links].astype(np.int64)
+        target = codes[len(codes) - number_of_links:].astype(np.int64)
+
+        link_position = np.flatnonzero(isValid)
+        if 'dir_flag' in link.columns:
+            dir_flag = pd.to_numeric(link['dir_flag'], errors='coerce').fillna(1).to_numpy()[isValid]
+            isReversed = dir_flag == -1
+            source, target = np.where(isReversed, target, source), np.where(isReversed, source, target)
+            isBoth = dir_flag == 0
+            link_position = np.concatenate([link_position, link_position[isBoth]])
+            source, target = np.concatenate([source, target[isBoth]]), np.concatenate([target, source[isBoth]])
+
+        mode_masks = {mode: link[mode].fillna(False).to_numpy(dtype=bool)
+                      for mode in network_modes if mode in link.columns}
+        return cls(node_ids, source, target, link_position, mode_masks)
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def number_of_edges(self) -> int:
+        return len(self.indices)
+
+    def get_node_index(self, node_ids) -> np.ndarray:
+        # graph node numbers of the given node ids, -1 for ids not in the graph
+        return self.node_index.get_indexer(np.atleast_1d(np.asarray(node_ids)))
+
+    def get_edge_mask(self, mode: str = 'all') -> np.ndarray:
+        # edges open to a network mode
+        if mode == 'all':
+            return np.ones(self.number_of_edges, dtype=bool)
+        if mode not in self.mode_masks:
+            raise Exception(f"ValueError: mode should be one of {network_modes}")
+        return self.mode_masks[mode]
+
+    def get_csr(self, mode: str = 'all') -> tuple:
+        """CSR arrays of the edges open to a network mode
+
+        Returns:
+            tuple: (indptr, indices, edge positions in this graph)
+        """
+        if mode == 'all':
+            return self.indptr, self.indices, np.arange(self.number_of_edges)
+        edges = np.flatnonzero(self.get_edge_mask(mode))
+        indptr = np.zeros(self.number_of_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.source[edges], minlength=self.number_of_nodes), out=indptr[1:])
+        return indptr, self.indices[edges], edges
+
+    def remove_links(self, positions: np.ndarray) -> None:
+        """drop the edges of links at the given row positions, e.g. of links removed by a delta
+
+        Edge positions of later links are moved up, as in the link table without the removed rows.
+        Nodes are kept, nodes left without edges are labeled -1 like other nodes without links.
+
+        Args:
+            positions (np.ndarray): row positions of the removed links in ascending order
+        """
+        isKept = ~np.isin(self.edge_link, positions)
+        self.source = self.source[isKept]
+        self.indices = self.indices[isKept]
+        self.edge_link = self.edge_link[isKept] - np.searchsorted(positions, self.edge_link[isKept])
+        self.indptr = np.zeros(self.number_of_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.source, minlength=self.number_of_nodes), out=self.indptr[1:])
+        self.mode_masks = {mode: mask[isKept] for mode, mask in self.mode_masks.items()}
+
+    def update_mode_masks(self, link: pd.DataFrame, positions: np.ndarray) -> None:
+        """update the mode masks of the edges of links at the given row positions, e.g. of modified links
+
+        Args:
+            link (pd.DataFrame): link table with the mode columns created by Link.extract_link_modes
+            positions (np.ndarray): row positions of the modified links
+        """
+        edges = np.flatnonzero(np.isin(self.edge_link, positions))
+        for mode in network_modes:
+            if mode not in link.columns:
+                continue
+            if mode not in self.mode_masks:
+                self.mode_masks[mode] = link[mode].fillna(False).to_numpy(dtype=bool)[self.edge_link]
+                continue
+            self.mode_masks[mode][edges] = link[mode].fillna(False).to_numpy(dtype=bool)[self.edge_link[edges]]
+
+    def connected_components(self, mode: str = 'all', connection: str = 'weak') -> tuple:
+        """connected components of the network of a mode
+
+        Uses scipy.sparse.csgraph if scipy is installed. Otherwise weak components are found by
+        vectorized label propagation, and strong components by an iterative Tarjan's algorithm.
+
+        Args:
+            mode (str): network mode, one of ['all', 'bike', 'walk', 'auto', 'railway']. Defaults to 'all'.
+            connection (str): 'weak' ignores link directions, 'strong' requires paths in both directions.
+                Defaults to 'weak'.
+
+        Returns:
+            tuple: (number of components, component label of each node). Labels are ordered by
+                component size, 0 for the largest one, and -1 for nodes without links of the mode.
+        """
+
+        if connection not in ('weak', 'strong'):
+            raise Exception("ValueError: connection should be one of ['weak', 'strong']")
+        indptr, indices, edges = self.get_csr(mode)
+        n = self.number_of_nodes
+
+        sparse = import_scipy_sparse()
+        if sparse is not None:
+            matrix = sparse.csr_matrix((np.ones(len(indices), dtype=np.int8), indices, indptr), shape=(n, n))
+            _, labels = sparse.csgraph.connected_components(matrix, directed=True, connection=connection)
+        elif connection == 'weak':
+            labels = get_weak_components(n, self.source[edges], indices)
+        else:
+            labels = get_strong_components(n, indptr, indices)
+
+        # renumber the components by size, nodes without edges of the mode are not in any component
+        hasEdge = np.bincount(self.source[edges], minlength=n) + np.bincount(indices, minlength=n) > 0
+        sizes = np.bincount(labels[hasEdge], minlength=labels.max() + 1 if n else 0)
+        order = np.argsort(-sizes, kind='stable')
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        labels = np.where(hasEdge, rank[labels], -1)
+        return int((sizes > 0).sum()), labels
+
+    def get_travel_times(self, origins, link_weights: np.ndarray, mode: str = 'all', cutoff: float = None,
+                         isNearest: bool = True) -> np.ndarray:
+        """one-to-all shortest path lengths from one or more origins
+
+        Uses scipy.sparse.csgraph.dijkstra if scipy is installed, otherwise a vectorized
+        label-correcting search which relaxes the edges of all nodes in a distance bucket at once.
+
+        Args:
+            origins: node_id or list of node_id of the origins
+            link_weights (np.ndarray): non-negative weight of each row of the link table, e.g. travel time,
+                links of NaN or infinite weight are closed
+            mode (str): network mode, one of ['all', 'bike', 'walk', 'auto', 'railway']. Defaults to 'all'.
+            cutoff (float): nodes farther than cutoff are not searched. Defaults to None, no cutoff.
+            isNearest (bool): if True, all origins are searched at once and the length from the nearest
+                origin is returned, otherwise the lengths from each origin. Defaults to True.
+
+        Returns:
+            np.ndarray: lengths of each graph node, (number of nodes,) if isNearest else
+                (number of origins, number of nodes), inf for nodes not reached
+        """
+
+        origin_ids = np.atleast_1d(np.asarray(origins))
+        origin_index = self.get_node_index(origin_ids)
+        if (origin_index < 0).any():
+            raise Exception(f"ValueError: origin node_id {origin_ids[origin_index < 0].tolist()} not found")
+        cutoff = np.inf if cutoff is None else float(cutoff)
+
+        _, _, edges = self.get_csr(mode)
+        weights = np.asarray(link_weights, dtype=float)[self.edge_link[edges]]
+        if (weights < 0).any():
+            raise Exception("ValueError: link weights should be non-negative")
+        edges, weights = edges[np.isfinite(weights)], weights[np.isfinite(weights)]
+        n = self.number_of_nodes
+
+        sparse = import_scipy_sparse()
+        if sparse is not None:
+            # parallel edges would be summed by scipy, only the lightest one is kept
+            order = np.lexsort((weights, self.indices[edges], self.source[edges]))
+            edges, weights = edges[order], weights[order]
+            isFirst = np.ones(len(edges), dtype=bool)
+            isFirst[1:] = ((self.source[edges][1:] != self.source[edges][:-1])
+                           | (self.indices[edges][1:] != self.indices[edges][:-1]))
+            matrix = sparse.csr_matrix((weights[isFirst], (self.source[edges][isFirst], self.indices[edges][isFirst])),
+                                       shape=(n, n))
+            return sparse.csgraph.dijkstra(matrix, directed=True, indices=origin_index, limit=cutoff,
+                                           min_only=isNearest)
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.source[edges], minlength=n), out=indptr[1:])
+        if isNearest:
+            return get_shortest_path_lengths(indptr, self.indices[edges], weights, origin_index, cutoff)
+        return np.stack([get_shortest_path_lengths(indptr, self.indices[edges], weights, [origin], cutoff)
+                         for origin in origin_index])
+
+
+def get_shortest_path_lengths(indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, origins,
+                              cutoff: float = np.inf) -> np.ndarray:
+    """shortest path lengths from the nearest origin by a vectorized label-correcting search
+
+    Nodes are settled in buckets of distance (delta-stepping): all nodes closer than the bucket
+    threshold relax their outgoing edges at once, and nodes improved beyond the threshold wait
+    for a later bucket. Lengths are exact, as every improved node is relaxed again.
+
+    Args:
+        indptr (np.ndarray): CSR offsets of the outgoing edges of each node
+        indices (np.ndarray): target node of each edge
+        weights (np.ndarray): non-negative finite weight of each edge
+        origins: node numbers of the origins
+        cutoff (float): nodes farther than cutoff are not searched. Defaults to np.inf.
+
+    Returns:
+        np.ndarray: length of each node, inf for nodes not reached
+    """
+
+    lengths = np.full(len(indptr) - 1, np.inf)
+    pending = np.unique(np.asarray(origins, dtype=np.int64))
+    lengths[pending] = 0
+    degree = np.diff(indptr)
+    # a bucket of about ten edges, large enough for few rounds and small enough for few re-relaxations
+    delta = 10 * np.median(weights[weights > 0]) if (weights > 0).any() else np.inf
+
+    while len(pending):
+        threshold = lengths[pending].min() + delta
+        isNear = lengths[pending] < threshold if np.isfinite(threshold) else np.ones(len(pending), dtype=bool)
+        frontier, pending = pending[isNear], pending[~isNear]
+        while len(frontier):
+            edge_index, _ = get_ragged_index(indptr, frontier)
+            candidates = np.repeat(lengths[frontier], degree[frontier]) + weights[edge_index]
+            targets = indices[edge_index]
+            isImproved = (candidates < lengths[targets]) & (candidates <= cutoff)
+            targets, candidates = targets[isImproved], candidates[isImproved]
+            np.minimum.at(lengths, targets, candidates)
+            improved = pd.unique(targets)
+            isNear = lengths[improved] < threshold
+            frontier = improved[isNear]
+            pending = pd.unique(np.concatenate([pending, improved[~isNear]]))
+    return lengths
+
+
+def get_link_travel_time(link: pd.DataFrame) -> np.ndarray:
+    """free-flow travel time of each link in minutes, from length in meters and free_speed in km/h
+
+    Links without length or positive free_speed get inf, so they are closed for shortest paths.
+    """
+
+    if not {'length', 'free_speed'} <= set(link.columns):
+        raise Exception("ValueError: length and free_speed columns are required to compute travel time")
+    length = pd.to_numeric(link['length'], errors='coerce').to_numpy(dtype=float)
+    free_speed = pd.to_numeric(link['free_speed'], errors='coerce').to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        travel_time = length / 1000 / free_speed * 60
+    return np.where((free_speed > 0) & np.isfinite(travel_time), travel_time, np.inf)
+
+
+def get_weak_components(number_of_nodes: int, source: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """weakly connected components by label propagation with pointer jumping
+
+    Each round hooks the larger root of every edge whose ends are in different trees onto the
+    smaller one, then compresses the trees, so the number of rounds grows slowly with the network size.
+
+    Returns:
+        np.ndarray: the smallest node number of the component of each node
+    """
+
+    labels = np.arange(number_of_nodes)
+    while True:
+        label_source, label_target = labels[source], labels[target]
+        isCrossing = label_source != label_target
+        if not isCrossing.any():
+            return labels
+        # edges inside one tree stay inside it, only the crossing ones are kept
+        source, target = source[isCrossing], target[isCrossing]
+        label_source, label_target = label_source[isCrossing], label_target[isCrossing]
+        np.minimum.at(labels, np.maximum(label_source, label_target), np.minimum(label_source, label_target))
+        while True:
+            parents = labels[labels]
+            if np.array_equal(parents, labels):
+                break
+            labels = parents
+
+
+def get_strong_components(number_of_nodes: int, indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    # strongly connected components by Tarjan's algorithm with an explicit stack instead of recursion
+    indptr, indices = indptr.tolist(), indices.tolist()
+    index, low, labels = [-1] * number_of_nodes, [0] * number_of_nodes, [-1] * number_of_nodes
+    isOnStack = [False] * number_of_nodes
+    stack, counter, number = [], 0, 0
+
+    for root in range(number_of_nodes):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        isOnStack[root] = True
+        work = [(root, indptr[root])]
+        while work:
+            node, i = work[-1]
+            end = indptr[node + 1]
+            while i < end:
+                w = indices[i]
+                i += 1
+                if index[w] == -1:
+                    # visit w before the remaining edges of node
+                    work[-1] = (node, i)
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    isOnStack[w] = True
+                    work.append((w, indptr[w]))
+                    break
+                if isOnStack[w] and index[w] < low[node]:
+                    low[node] = index[w]
+            else:
+                work.pop()
+                if work and low[node] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[node]
+                if low[node] == index[node]:
+                    while True:
+                        w = stack.pop()
+                        isOnStack[w] = False
+                        labels[w] = number
+                        if w == node:
+                            break
+                    number += 1
+    return np.array(labels, dtype=np.int64)
+
+
+def get_network_graph(mnet) -> NetworkGraph:
+    """graph of the loaded links, built once and reused until the node or link table changes, see patch_network_graph
+
+    Args:
+        mnet (MultiNet): MultiNet object with a loaded link layer
+
+    Returns:
+        NetworkGraph: graph object
+    """
+
+    if not mnet.link_loaded:
+        raise Exception("link layer is required to build the network graph!")
+    node = mnet.node.value if mnet.node_loaded else None
+    if mnet.graph is None or mnet.graph[0] is not mnet.link.value or mnet.graph[1] is not node:
+        mnet.graph = (mnet.link.value, node, NetworkGraph.from_tables(node, mnet.link.value))
+    return mnet.graph[2]
+
+
+# link columns which change the edges of the graph, other changes only patch the mode masks
+graph_link_columns = ['from_node_id', 'to_node_id', 'dir_flag']
+
+
+def patch_network_graph(mnet, link: pd.DataFrame, removed_positions: np.ndarray, modified_positions: np.ndarray,
+                        modified_columns: list, isAdded: bool = False) -> None:
+    """patch the cached graph of a link table for a link delta, see apply_network_delta
+
+    Edges of removed links are dropped and the mode masks of modified links are updated. The graph
+    is rebuilt on its next use if links are added, or if the ends or directions of links change.
+
+    Args:
+        mnet (MultiNet): MultiNet object after the delta
+        link (pd.DataFrame): link table before the delta
+        removed_positions (np.ndarray): row positions of the removed links in the old link table
+        modified_positions (np.ndarray): row positions of the modified links in the new link table
+        modified_columns (list): columns of the modified links
+        isAdded (bool): whether links are added. Defaults to False.
+    """
+
+    node = mnet.node.value if mnet.node_loaded else None
+    if mnet.graph is None or mnet.graph[0] is not link or mnet.graph[1] is not node:
+        return
+    if isAdded or set(modified_columns) & set(graph_link_columns):
+        mnet.graph = None
+        return
+    graph = mnet.graph[2]
+    if len(removed_positions):
+        graph.remove_links(removed_positions)
+    if len(modified_positions) and ('allowed_uses' in modified_columns or set(modified_columns) & set(network_modes)):
+        graph.update_mode_masks(mnet.link.value, modified_positions)
+    mnet.graph = (mnet.link.value, node, graph)
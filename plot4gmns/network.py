@@ -5,10 +5,10 @@
 # Author/Copyright: Mr. Xiangyong Luo
 ##############################################################
 
-from .utility_lib import Style
-from shapely.wkt import loads
-from shapely.geometry import MultiPolygon, Polygon
+from .utility_lib import Style, layer_dependencies, link_attribute_columns, default_link_attributes, get_object_digest
+from .geometry_lib import GeometryBuffer
 import numpy as np
+import pandas as pd
 
 
 class Node:
@@ -16,6 +16,9 @@ class Node:
         self.value = None  # dataframe
         self.x_coords = None
         self.y_coords = None
+        self.categories = None  # category of each extracted node, set by update_coords_by_categories
+        self.selected_index = None  # row labels of the latest extraction
+        self.partitions = {}  # {column: (value, {category: row positions})}, see get_category_partition
 
     def update_coords(self, column: str = '', values: list = []) -> None:
         """extract node coordinates from node dataset
@@ -29,9 +32,176 @@ class Node:
             res = self.value[self.value[column].isin(values)]
             self.x_coords = res['x_coord'].tolist()
             self.y_coords = res['y_coord'].tolist()
+            self.selected_index = res.index
         else:
             self.x_coords = self.value['x_coord'].tolist()
             self.y_coords = self.value['y_coord'].tolist()
+            self.selected_index = self.value.index
+        self.categories = None
+
+    def update_coords_by_categories(self, column: str, categories: list) -> None:
+        """extract node coordinates of the given categories, grouped by category in the given order
+
+        Args:
+            column (str): categorical column, e.g. 'osm_highway'
+            categories (list): categories to be extracted
+        """
+
+        positions = get_category_positions(self, column, categories)
+        self.x_coords = self.value['x_coord'].to_numpy()[positions].tolist()
+        self.y_coords = self.value['y_coord'].to_numpy()[positions].tolist()
+        self.categories = self.value[column].to_numpy()[positions]
+        self.selected_index = self.value.index[positions]
+
+    def apply_delta(self, added: pd.DataFrame = None, removed: list = None, modified: pd.DataFrame = None) -> None:
+        """add, remove and modify nodes keyed by node_id
+
+        Args:
+            added (pd.DataFrame): new node rows. Defaults to None.
+            removed (list): node_id of nodes to be removed. Defaults to None.
+            modified (pd.DataFrame): node_id and the changed columns of existing nodes. Defaults to None.
+        """
+        self.value, _, _ = apply_table_delta(self.value, 'node_id', added, removed, modified, self.partitions)
+        self.x_coords, self.y_coords, self.selected_index = None, None, None
+
+
+def get_category_partition(layer, column: str) -> dict:
+    """row positions of each category of a column, grouped in one pass and patched by apply_table_delta
+
+    Args:
+        layer: Node or Link object
+        column (str): categorical column, e.g. 'osm_highway' or 'facility_type'
+
+    Returns:
+        dict: {category: np.ndarray of row positions in ascending order}, missing values are not grouped
+    """
+
+    cached = layer.partitions.get(column)
+    if cached is None or cached[0] is not layer.value:
+        groups = layer.value.groupby(column, sort=False, observed=True).indices
+        cached = (layer.value, groups)
+        layer.partitions[column] = cached
+    return cached[1]
+
+
+def get_category_positions(layer, column: str, categories: list) -> np.ndarray:
+    # row positions of the given categories, grouped by category in the given order
+    partition = get_category_partition(layer, column)
+    positions = [partition[category] for category in dict.fromkeys(categories) if category in partition]
+    return np.concatenate(positions) if positions else np.array([], dtype=np.int64)
+
+
+def patch_category_partition(groups: dict, positions: np.ndarray, old_categories: np.ndarray = None,
+                             new_categories: np.ndarray = None) -> dict:
+    """move row positions between the groups of a category partition, see get_category_partition
+
+    Only the groups of the given categories are copied, so the cost is proportional to the changed
+    rows and the size of their groups.
+
+    Args:
+        groups (dict): {category: row positions in ascending order}
+        positions (np.ndarray): row positions of the changed rows
+        old_categories (np.ndarray): categories of the rows before the change, None for added rows
+        new_categories (np.ndarray): categories of the rows after the change, None for removed rows
+
+    Returns:
+        dict: patched partition
+    """
+
+    groups = dict(groups)
+    positions = np.asarray(positions, dtype=np.int64)
+    if old_categories is not None:
+        for category, rows in pd.Series(positions).groupby(old_categories, sort=False).indices.items():
+            group = groups[category]
+            group = np.delete(group, np.searchsorted(group, positions[rows]))
+            if len(group):
+                groups[category] = group
+            else:
+                del groups[category]
+    if new_categories is not None:
+        for category, rows in pd.Series(positions).groupby(new_categories, sort=False).indices.items():
+            group = groups.get(category, np.array([], dtype=np.int64))
+            rows = np.sort(positions[rows])
+            groups[category] = np.insert(group, np.searchsorted(group, rows), rows)
+    return groups
+
+
+def apply_table_delta(df: pd.DataFrame,
+                      id_column: str,
+                      added: pd.DataFrame = None,
+                      removed: list = None,
+                      modified: pd.DataFrame = None,
+                      partitions: dict = None) -> tuple:
+    """apply added, removed and modified rows keyed by id_column to a table
+
+    Modified rows are set in place by row position, so a delta of modified rows only does not copy the
+    table. Removed and added rows rebuild the table, an O(N) copy in the number of rows N. The
+    cached category partitions of the table are patched for the changed rows instead of regrouped.
+
+    Args:
+        df (pd.DataFrame): node or link table
+        id_column (str): key column, e.g. 'node_id' or 'link_id'
+        added (pd.DataFrame): new rows, ids must not exist in df. Defaults to None.
+        removed (list): ids of rows to be removed. Defaults to None.
+        modified (pd.DataFrame): id_column and the changed columns of existing rows. Defaults to None.
+        partitions (dict): category partitions of the layer, see get_category_partition, patched in place.
+            Defaults to None.
+
+    Returns:
+        tuple: (updated table, row positions of the removed rows in df, row positions of the modified
+            rows in the updated table), row labels of unchanged rows are kept
+    """
+
+    # partitions of older tables are stale, the others are patched along with the table
+    partitions = {} if partitions is None else partitions
+    for column in [column for column, (value, _) in partitions.items() if value is not df]:
+        del partitions[column]
+
+    removed_positions = np.array([], dtype=np.int64)
+    if removed is not None and len(removed):
+        isRemoved = df[id_column].isin(removed).to_numpy()
+        if isRemoved.sum() < len(set(removed)):
+            print(f"Warning: {len(set(removed)) - isRemoved.sum()} {id_column}(s) to be removed not found")
+        removed_positions = np.flatnonzero(isRemoved)
+        for column, (_, groups) in partitions.items():
+            groups = patch_category_partition(groups, removed_positions, df[column].iloc[removed_positions].to_numpy())
+            # later rows move up by the number of removed rows before them
+            partitions[column] = (df, {category: rows - np.searchsorted(removed_positions, rows)
+                                       for category, rows in groups.items()})
+        df = df[~isRemoved]
+
+    modified_positions = np.array([], dtype=np.int64)
+    if modified is not None and len(modified):
+        labels = pd.Index(df[id_column])
+        modified_positions = labels.get_indexer(modified[id_column])
+        if (modified_positions < 0).any():
+            raise Exception(f"ValueError: {id_column} {modified[id_column][modified_positions < 0].tolist()} not found")
+        for column in modified.columns.drop(id_column):
+            if column not in df.columns:
+                df[column] = np.nan
+            old_categories = df[column].iloc[modified_positions].to_numpy() if column in partitions else None
+            df.iloc[modified_positions, df.columns.get_loc(column)] = modified[column].to_numpy()
+            if column in partitions:
+                partitions[column] = (df, patch_category_partition(partitions[column][1], modified_positions,
+                                                                   old_categories,
+                                                                   df[column].iloc[modified_positions].to_numpy()))
+
+    if added is not None and len(added):
+        duplicated = added[id_column][added[id_column].isin(df[id_column])]
+        if len(duplicated):
+            raise Exception(f"ValueError: {id_column} {duplicated.tolist()} already exist")
+        # new rows get labels after the existing ones, so existing row labels stay valid
+        start = df.index.max() + 1 if len(df) else 0
+        added = added.set_axis(pd.RangeIndex(start, start + len(added)))
+        added_positions = np.arange(len(df), len(df) + len(added))
+        df = pd.concat([df, added])
+        for column, (_, groups) in partitions.items():
+            partitions[column] = (df, patch_category_partition(groups, added_positions,
+                                                               new_categories=df[column].iloc[added_positions].to_numpy()))
+
+    for column, (_, groups) in partitions.items():
+        partitions[column] = (df, groups)
+    return df, removed_positions, modified_positions
 
 
 class Link:
@@ -40,99 +210,228 @@ class Link:
         self.link_coords = []
         self.node_id_list = []
         self.attr_distribution = []
+        self.selected_index = None  # row labels of the latest extraction
+        self.geometry = None  # GeometryBuffer, rows point to it by value['geometry_id']
+        self.source_geometry = None  # GeometryBuffer of the source coordinates if kept at projection
+        self.partitions = {}  # {column: (value, {category: row positions})}, see get_category_partition
 
     def convert_str_to_geometry(self) -> None:
-        # load a link geometry from a WKT string.
-        self.value['geometry'] = self.value['geometry'].map(lambda x: loads(x))
+        # parse the WKT strings of link geometries into a GeometryBuffer
+        self.geometry = GeometryBuffer.from_wkt(self.value['geometry'])
+        self.value['geometry_id'] = np.arange(self.value.shape[0])
+
+    def get_geometry(self, res: pd.DataFrame = None) -> np.ndarray:
+        # shapely geometries of the given link rows, all links if res is None, created on demand
+        res = self.value if res is None else res
+        return self.geometry.to_shapely(res['geometry_id'].to_numpy())
+
+    def get_link_coords(self, res: pd.DataFrame) -> list:
+        # vertex coordinates of the given link rows, only their geometry is read from the buffer
+        return self.geometry.take_line_coords(res['geometry_id'].to_numpy())
+
+    @staticmethod
+    def get_link_modes(allowed_uses: pd.Series) -> pd.DataFrame:
+        # create link modes information from allowed_uses
+        return pd.DataFrame({'auto': allowed_uses.map(lambda x: "auto" in x.split(';')),
+                             'bike': allowed_uses.map(lambda x: "bike" in x.split(';')),
+                             'walk': allowed_uses.map(lambda x: "walk" in x.split(';')),
+                             'railway': allowed_uses.map(lambda x: "railway" in x.split(';'))},
+                            index=allowed_uses.index)
 
     def extract_link_modes(self) -> None:
         # create link modes information from link dataset
-        self.value['auto'] = self.value['allowed_uses'].map(lambda x: "auto" in x.split(';'))
-        self.value['bike'] = self.value['allowed_uses'].map(lambda x: "bike" in x.split(';'))
-        self.value['walk'] = self.value['allowed_uses'].map(lambda x: "walk" in x.split(';'))
-        self.value['railway'] = self.value['allowed_uses'].map(lambda x: "railway" in x.split(';'))
-        self.value.drop(columns=['allowed_uses'], inplace=True)
+        link_modes = self.get_link_modes(self.value['allowed_uses'])
+        for mode in link_modes.columns:
+            self.value[mode] = link_modes[mode]
+
+    def derive_missing_attributes(self, chunk_size: int = 1000000) -> dict:
+        """fill missing length, lanes, free_speed and capacity of links, existing values are kept
+
+        Length is computed from the geometry buffer, in meters (haversine) for lon/lat coordinates and in
+        coordinate units otherwise. Lanes, free_speed and capacity are looked up in default_link_attributes
+        by facility_type, or link_type_name if there is no facility_type.
+
+        Args:
+            chunk_size (int): number of links whose lengths are computed at once. Defaults to 1000000.
+
+        Returns:
+            dict: {column: number of derived values}
+        """
+
+        derived = {}
+        missing = {column: (self.value[column].isna().to_numpy() if column in self.value.columns
+                            else np.ones(self.value.shape[0], dtype=bool))
+                   for column in link_attribute_columns}
+
+        if missing['length'].any() and self.geometry is not None and 'geometry_id' in self.value.columns:
+            rows = np.flatnonzero(missing['length'])
+            geometry_id = self.value['geometry_id'].to_numpy()[rows]
+            isGeographic = self.geometry.is_geographic()
+            lengths = np.concatenate([self.geometry.take_lengths(geometry_id[i:i + chunk_size], isGeographic)
+                                      for i in range(0, len(rows), chunk_size)])
+            self.set_column_values('length', rows, lengths)
+            derived['length'] = int(np.isfinite(lengths).sum())
+
+        facility_column = next((column for column in ['facility_type', 'link_type_name']
+                                if column in self.value.columns), None)
+        if any(missing[column].any() for column in link_attribute_columns[1:]):
+            if facility_column is None:
+                facility_types = pd.Series('other', index=self.value.index)
+            else:
+                facility_types = self.value[facility_column].astype(str).str.lower().str.removesuffix('_link')
+            codes, uniques = pd.factorize(facility_types)
+            for column in link_attribute_columns[1:]:
+                if not missing[column].any():
+                    continue
+                defaults = np.array([default_link_attributes.get(facility_type, default_link_attributes['other'])[column]
+                                     for facility_type in uniques], dtype=float)
+                rows = np.flatnonzero(missing[column])
+                self.set_column_values(column, rows, defaults[codes[rows]])
+                derived[column] = len(rows)
+        return derived
+
+    def set_column_values(self, column: str, rows: np.ndarray, values: np.ndarray) -> None:
+        # set values of a column at row positions, the column is created if it does not exist
+        if column not in self.value.columns:
+            self.value[column] = np.nan
+        column_values = pd.to_numeric(self.value[column], errors='coerce').to_numpy(dtype=float, copy=True)
+        column_values[rows] = values
+        self.value[column] = column_values
+
+    def apply_delta(self, added: pd.DataFrame = None, removed: list = None, modified: pd.DataFrame = None) -> tuple:
+        """add, remove and modify links keyed by link_id
+
+        Only the geometry and modes of added rows, and of modified rows whose geometry or
+        allowed_uses changed, are parsed again, and their geometries are appended to the buffer in
+        amortized time proportional to the delta. Modified rows are set in place and the category
+        partitions are patched, see apply_table_delta.
+
+        Args:
+            added (pd.DataFrame): new link rows in GMNS format. Defaults to None.
+            removed (list): link_id of links to be removed (closed). Defaults to None.
+            modified (pd.DataFrame): link_id and the changed columns of existing links,
+                e.g. lanes or free_speed. Defaults to None.
+
+        Returns:
+            tuple: (row positions of the removed links in the old table, row positions of the
+                modified links in the updated table)
+        """
+
+        def parse_link_rows(df: pd.DataFrame) -> pd.DataFrame:
+            df = df.copy()
+            if 'geometry' in df.columns:
+                # new geometries are appended to the buffer, replaced ones are left unreferenced
+                wkt = df['geometry'].map(lambda x: x if isinstance(x, str) or pd.isna(x) else x.wkt)
+                df['geometry_id'] = self.geometry.append(GeometryBuffer.from_wkt(wkt))
+                if 'geometry' in self.value.columns:
+                    df['geometry'] = wkt
+                else:
+                    df = df.drop(columns=['geometry'])
+            if 'allowed_uses' in df.columns:
+                link_modes = self.get_link_modes(df['allowed_uses'])
+                for mode in link_modes.columns:
+                    df[mode] = link_modes[mode]
+            return df
+
+        added = parse_link_rows(added) if added is not None and len(added) else None
+        modified = parse_link_rows(modified) if modified is not None and len(modified) else None
+        self.value, removed_positions, modified_positions = apply_table_delta(self.value, 'link_id', added, removed,
+                                                                              modified, self.partitions)
+        self.link_coords, self.node_id_list, self.attr_distribution = [], [], []
+        self.selected_index = None
+        return removed_positions, modified_positions
 
     def update_coords_by_link_modes(self, modes: list) -> None:
         # extract link coordinates of specified network mode from link dataset
         if 'all' in modes:
-            self.link_coords = self.value['geometry'].map(lambda x: np.array(list(x.coords))).tolist()
+            self.link_coords = self.get_link_coords(self.value)
             self.ID = []
+            self.selected_index = self.value.index
         else:
             self.link_coords = []
             self.node_id_list = []
+            selected_index = self.value.index[:0]
             for mode in modes:
                 res = self.value[self.value[mode] == True]
-                self.link_coords.extend(res['geometry'].map(lambda x: np.array(list(x.coords))).tolist())
+                self.link_coords.extend(self.get_link_coords(res))
                 self.node_id_list.extend(res['from_node_id'].tolist() + res['to_node_id'].tolist())
+                selected_index = selected_index.union(res.index, sort=False)
             self.node_id_list = list(set(self.node_id_list))
+            self.selected_index = selected_index
 
     def update_coords_by_link_types(self, link_types: list) -> None:
-        # extract link coordinates of specified link types from link dataset
-        node_id_list = []
-        res = self.value[self.value['facility_type'].isin(link_types)]
-        self.link_coords.extend(res['geometry'].map(lambda x: np.array(list(x.coords))).tolist())
-        node_id_list.extend(res['from_node_id'].tolist() + res['to_node_id'].tolist())
-        self.node_id_list = list(set(self.node_id_list))
+        # extract link coordinates of specified link types from link dataset, in the order of the table
+        self.update_coords_by_positions(np.sort(get_category_positions(self, 'facility_type', link_types)))
+
+    def update_coords_by_positions(self, positions: np.ndarray) -> None:
+        # extract link coordinates of the links at the given row positions
+        res = self.value.iloc[positions]
+        self.link_coords = self.get_link_coords(res)
+        self.node_id_list = list(set(res['from_node_id'].tolist() + res['to_node_id'].tolist()))
+        self.selected_index = res.index
 
     def update_coords_by_float_attr(self, column: str, min_v: int, max_v: int) -> None:
         # extract link coordinates of specified network link attributes range from link dataset
         res = self.value[(self.value[column] >= min_v) & (self.value[column] <= max_v)]
-        self.link_coords = res['geometry'].map(lambda x: np.array(list(x.coords))).tolist()
+        self.link_coords = self.get_link_coords(res)
         f_n = res['from_node_id'].tolist()
         t_n = res['to_node_id'].tolist()
         self.node_id_list = list(set(f_n + t_n))
+        self.selected_index = res.index
 
     def update_coords_by_attr_distribution(self, column: str) -> None:
-        self.link_coords = self.value['geometry'].map(lambda x: np.array(list(x.coords))).tolist()
-        self.attr_distribution = self.value[column].tolist()
+        self.link_coords = self.get_link_coords(self.value)
+        self.attr_distribution = pd.to_numeric(self.value[column], errors='coerce').tolist()
+        self.selected_index = self.value.index
 
 
 class POI:
     def __init__(self):
         self.value = None  # dataframe
         self.poi_coords = None
+        self.selected_index = None  # row labels of the latest extraction
+        self.geometry = None  # GeometryBuffer, rows point to it by value['geometry_id']
+        self.source_geometry = None  # GeometryBuffer of the source coordinates if kept at projection
 
     def convert_str_to_geometry(self) -> None:
-        # load a POI geometry from a WKT string.
+        # parse the WKT strings of POI geometries into a GeometryBuffer
+        self.geometry = GeometryBuffer.from_wkt(self.value['geometry'])
+        self.value['geometry_id'] = np.arange(self.value.shape[0])
+
+    def get_geometry(self, res: pd.DataFrame = None) -> np.ndarray:
+        # shapely geometries of the given POI rows, all POIs if res is None, created on demand
+        res = self.value if res is None else res
+        return self.geometry.to_shapely(res['geometry_id'].to_numpy())
+
+    def get_poi_coords(self, res: pd.DataFrame) -> list:
+        # boundary coordinates of the given POI rows, only their geometry is read from the buffer
+        return self.geometry.take_exterior_coords(res['geometry_id'].to_numpy())
 
-        self.value['geometry'] = self.value['geometry'].map(lambda x: loads(x))
+    def get_poi_centroids(self, res: pd.DataFrame = None) -> np.ndarray:
+        # (n, 2) centroids of the given POI rows, all POIs if res is None
+        res = self.value if res is None else res
+        return self.geometry.take_centroids(res['geometry_id'].to_numpy())
 
-    def update_coords_by_poi_type(self, poi_type: list = []) -> None:
-        # extract POI boundary coordinates from POI dataset
+    def update_coords_by_poi_type(self, poi_type: list = [], isCoords: bool = True) -> None:
+        # extract POI boundary coordinates from POI dataset, only select the POIs if isCoords is False
 
-        def convert_geometry_to_list(geometry):
-            coords = []
-            if isinstance(geometry, MultiPolygon):
-                for geom in geometry.geoms:
-                    coords.extend(geom.exterior.coords[:-1])
-            elif isinstance(geometry, Polygon):
-                coords = list(geometry.exterior.coords)
-            return coords
         if len(poi_type):
             res = self.value[(self.value['building'].isin(poi_type)) |
                              (self.value['amenity'].isin(poi_type)) |
                              (self.value['leisure'].isin(poi_type))]
-            self.poi_coords = res['geometry'].map(convert_geometry_to_list).tolist()
         else:
-            self.poi_coords = self.value['geometry'].map(convert_geometry_to_list).tolist()
-
-    def update_coords_by_attr_distribution(self, column: str, rate: float = 1.0) -> None:
-        def convert_geometry_to_list(geometry):
-            coords = []
-            if isinstance(geometry, MultiPolygon):
-                for geom in geometry.geoms:
-                    coords.extend(geom.exterior.coords[:-1])
-            elif isinstance(geometry, Polygon):
-                coords = list(geometry.exterior.coords)
-            return coords
-        poi_coords_ = self.value['geometry'].map(convert_geometry_to_list).tolist()
+            res = self.value
+        self.poi_coords = self.get_poi_coords(res) if isCoords else None
+        self.selected_index = res.index
+
+    def update_coords_by_attr_distribution(self, column: str, rate: float = 1.0, isCoords: bool = True) -> None:
         attr_distribution_ = self.value[column].tolist()
         sorted_index_ = sorted(range(self.value.shape[0]), key=lambda id: attr_distribution_[id], reverse=True)
         selected_number = int(round(rate * self.value.shape[0], 0))
         sorted_index = sorted_index_[:selected_number]
-        self.poi_coords = [poi_coords_[id] for id in sorted_index]
+        self.poi_coords = self.get_poi_coords(self.value.iloc[sorted_index]) if isCoords else None
         self.attr_distribution = [attr_distribution_[id] for id in sorted_index]
+        self.selected_index = self.value.index[sorted_index]
 
 
 class Demand:
@@ -141,25 +440,86 @@ class Demand:
         self.demand_matrix = None
         self.demand_OD_coords = None
         self.demand_OD_vol = None
+        self.selected_index = None  # row labels of the latest extraction
+        self.geometry = None  # GeometryBuffer, rows point to it by value['geometry_id']
+        self.source_geometry = None  # GeometryBuffer of the source coordinates if kept at projection
 
     def convert_str_to_geometry(self) -> None:
-        # load a POI geometry from a WKT string.
-        self.value['geometry'] = self.value['geometry'].map(lambda x: loads(x))
+        # parse the WKT strings of OD lines into a GeometryBuffer
+        self.geometry = GeometryBuffer.from_wkt(self.value['geometry'])
+        self.value['geometry_id'] = np.arange(self.value.shape[0])
 
-    def update_demand_matrix(self, number_of_zone):
+    def get_geometry(self, res: pd.DataFrame = None) -> np.ndarray:
+        # shapely geometries of the given demand rows, all rows if res is None, created on demand
+        res = self.value if res is None else res
+        return self.geometry.to_shapely(res['geometry_id'].to_numpy())
 
+    def update_demand_matrix(self, number_of_zone):
+        # zone ids start from 1, a later row of the same OD pair overwrites the earlier one
         demand_matrix = np.zeros((number_of_zone, number_of_zone))
-        for row in range(self.value.shape[0]):
-            o_zone_id = self.value['o_zone_id'][row]
-            d_zone_id = self.value['d_zone_id'][row]
-            vol = self.value['volume'][row]
-            demand_matrix[o_zone_id - 1, d_zone_id - 1] = vol
+        o_zone_index = self.value['o_zone_id'].to_numpy(dtype=np.int64) - 1
+        d_zone_index = self.value['d_zone_id'].to_numpy(dtype=np.int64) - 1
+        demand_matrix[o_zone_index, d_zone_index] = self.value['volume'].to_numpy(dtype=float)
         self.demand_matrix = demand_matrix
 
-    def update_coords(self):
+    @staticmethod
+    def get_centroid_lines(o_zone_id: np.ndarray, d_zone_id: np.ndarray, centroids: pd.DataFrame) -> tuple:
+        # OD lines between zone centroids by a vectorized join, rows of unknown zones are dropped
+        o_positions = centroids.index.get_indexer(o_zone_id)
+        d_positions = centroids.index.get_indexer(d_zone_id)
+        isValid = (o_positions >= 0) & (d_positions >= 0)
+        if not isValid.all():
+            print(f"Warning: {(~isValid).sum()} OD pair(s) refer to zones without centroid and are not drawn")
+        xy = centroids[['x', 'y']].to_numpy(dtype=float)
+        return np.stack([xy[o_positions[isValid]], xy[d_positions[isValid]]], axis=1), isValid
+
+    def update_coords(self, centroids: pd.DataFrame = None, min_volume: float = None, top_k: int = None,
+                      zone_groups: pd.Series = None):
+        """extract OD lines of positive volume, optionally thresholded, limited to the top k and aggregated
+
+        Args:
+            centroids (pd.DataFrame): x and y of zone centroids indexed by zone_id, see Zone.get_centroids.
+                Required if the demand has no geometry or zone_groups is given. Defaults to None.
+            min_volume (float): minimum volume of the drawn OD pairs. Defaults to None.
+            top_k (int): only keep the k OD pairs of the largest volume. Defaults to None.
+            zone_groups (pd.Series): group of each zone indexed by zone_id. If given, volumes are summed
+                by group pairs, and lines are drawn between the mean centroids of groups. Defaults to None.
+        """
+
         res = self.value[self.value['volume'] > 0]
-        self.demand_OD_coords = res['geometry'].map(lambda x: np.array(list(x.coords))).tolist()
-        self.demand_OD_vol = res['volume'].tolist()
+        if zone_groups is not None:
+            # sum volumes of group pairs, each group pair keeps the rows of its zone pairs
+            o_group = zone_groups.reindex(res['o_zone_id'].to_numpy()).to_numpy()
+            d_group = zone_groups.reindex(res['d_zone_id'].to_numpy()).to_numpy()
+            pairs = pd.DataFrame({'o_zone_id': o_group, 'd_zone_id': d_group, 'volume': res['volume'].to_numpy()},
+                                 index=res.index)
+            od = pairs.groupby(['o_zone_id', 'd_zone_id'], sort=False)['volume'].sum().reset_index()
+            centroids = centroids.groupby(zone_groups.reindex(centroids.index).to_numpy()).mean()
+        else:
+            od = res
+
+        volume = od['volume'].to_numpy(dtype=float)
+        isSelected = np.ones(len(od), dtype=bool) if min_volume is None else volume >= min_volume
+        if top_k is not None and isSelected.sum() > top_k:
+            candidates = np.flatnonzero(isSelected)
+            isSelected[:] = False
+            isSelected[candidates[np.argpartition(-volume[candidates], top_k - 1)[:top_k]]] = True
+        od = od[isSelected]
+
+        if zone_groups is None and self.geometry is not None:
+            self.demand_OD_coords = self.geometry.take_line_coords(od['geometry_id'].to_numpy())
+            self.selected_index = od.index
+        else:
+            self.demand_OD_coords, isValid = self.get_centroid_lines(
+                od['o_zone_id'].to_numpy(), od['d_zone_id'].to_numpy(), centroids)
+            od = od[isValid]
+            if zone_groups is None:
+                self.selected_index = od.index
+            else:
+                selected_pairs = pd.MultiIndex.from_frame(od[['o_zone_id', 'd_zone_id']])
+                isContributing = pd.MultiIndex.from_frame(pairs[['o_zone_id', 'd_zone_id']]).isin(selected_pairs)
+                self.selected_index = pairs.index[isContributing]
+        self.demand_OD_vol = od['volume'].to_numpy(dtype=float)
 
 
 class Zone:
@@ -167,14 +527,35 @@ class Zone:
         self.value = None  # dataframe
         self.zone_coords = None
         self.zone_names = None
+        self.selected_index = None  # row labels of the latest extraction
+        self.geometry = None  # GeometryBuffer, rows point to it by value['geometry_id']
+        self.source_geometry = None  # GeometryBuffer of the source coordinates if kept at projection
 
     def convert_str_to_geometry(self) -> None:
-        # load a POI geometry from a WKT string.
-        self.value['geometry'] = self.value['geometry'].map(lambda x: loads(x))
+        # parse the WKT strings of zone boundaries into a GeometryBuffer
+        self.geometry = GeometryBuffer.from_wkt(self.value['geometry'])
+        self.value['geometry_id'] = np.arange(self.value.shape[0])
+
+    def get_geometry(self, res: pd.DataFrame = None) -> np.ndarray:
+        # shapely geometries of the given zone rows, all zones if res is None, created on demand
+        res = self.value if res is None else res
+        return self.geometry.to_shapely(res['geometry_id'].to_numpy())
+
+    def get_centroids(self) -> pd.DataFrame:
+        # x and y of zone centroids indexed by zone_id, from centroid_x and centroid_y or the zone geometry
+        if {'centroid_x', 'centroid_y'} <= set(self.value.columns):
+            x = self.value['centroid_x'].to_numpy(dtype=float)
+            y = self.value['centroid_y'].to_numpy(dtype=float)
+        else:
+            import shapely
+            centroids = shapely.centroid(self.get_geometry())
+            x, y = shapely.get_x(centroids), shapely.get_y(centroids)
+        return pd.DataFrame({'x': x, 'y': y}, index=pd.Index(self.value['zone_id'].to_numpy(), name='zone_id'))
 
     def update_coords(self):
-        self.zone_coords = self.value['geometry'].map(lambda x: np.array(list(x.exterior.coords))).tolist()
+        self.zone_coords = self.geometry.take_exterior_coords(self.value['geometry_id'].to_numpy())
         self.zone_names = self.value[['name', 'centroid_x', 'centroid_y']].values.tolist()
+        self.selected_index = self.value.index
 
 
 class MultiNet:
@@ -190,3 +571,55 @@ class MultiNet:
         self.POI_loaded = False
         self.demand_loaded = False
         self.zone_loaded = False
+        self.input_dir = None
+        self.file_fingerprints = {}  # {element: fingerprint of the loaded file}
+        self.data_digest = None  # digest of the in-memory changes since loading, see update_data_digest
+        self.link_geometry = 'wkt'  # 'wkt', 'nodes' or 'auto', how link geometries were built
+        self.memmap_dir = None  # directory of memory-mapped link and poi geometries in out-of-core mode
+        self.file_format = 'csv'  # 'csv', 'parquet', 'feather' or 'auto', format of the GMNS tables
+        self.usecols = {}  # {element: columns to read}, elements not in it are read with all columns
+        self.demand_geometry = 'wkt'  # 'wkt' or 'zones', whether OD lines are parsed or joined from zone centroids
+        self.isDeriveAttributes = True  # whether missing link length, lanes, free_speed and capacity are derived
+        self.crs = None  # crs string of projected coordinates, None means the source lon/lat coordinates
+        self.isKeepSourceCoords = False  # whether the source coordinates are kept when projected
+        self.validation = None  # None, 'report' or 'drop', how the tables are validated after loading
+        self.validation_report = None  # pd.DataFrame of the failed checks of the latest validation
+        self.graph = None  # (link table, node table, NetworkGraph) cached by graph_lib.get_network_graph
+        self.isStats = None  # None means stats are switched by the environment variable P4G_STATS
+        self.figure_cache = None  # FigureCache of show_* figures, None means the environment variable P4G_FIGURE_CACHE is used
+        self.stats = []  # PipelineStats of loader and show_* calls
+
+    def clear_cache(self, elements: list) -> None:
+        """drop cached data of layers which depend on the given layers
+
+        Args:
+            elements (list): changed layers, e.g. ['link', 'zone']
+        """
+        for element, dependencies in layer_dependencies.items():
+            if not set(dependencies) & set(elements):
+                continue
+            if element == 'node':
+                # node coordinates are extracted by the node ids of selected links
+                self.node.x_coords, self.node.y_coords, self.node.selected_index = None, None, None
+            elif element == 'demand':
+                self.demand.demand_matrix = None
+
+    def update_data_digest(self, *changes) -> None:
+        """chain the digest of in-memory changes, e.g. a network delta, to the data digest
+
+        Together with the file fingerprints, the data digest identifies the data of the layers,
+        e.g. for the figure cache. Call it after editing layer tables in place.
+
+        Args:
+            changes: values describing the change, e.g. the delta tables
+        """
+        self.data_digest = get_object_digest(self.data_digest, *changes)
+
+    def refresh(self) -> list:
+        """re-read the GMNS files changed since they were loaded, other layers are left in place
+
+        Returns:
+            list: reloaded layers
+        """
+        from .func_lib import refresh_multi_network
+        return refresh_multi_network(self)
@@ -21,15 +21,254 @@ from .func_lib import (
     extract_coordinates_by_poi_type,
     extract_coordinates_by_poi_attr_distribution,
     count_demand_matrix,
-    extract_coordinates_by_demand_OD)
-import seaborn as sns
+    extract_coordinates_by_demand_OD,
+    extract_demand_OD_by_periods,
+    extract_coordinates_by_connected_components,
+    extract_coordinates_by_travel_time,
+    get_zone_label_priority)
+from .scenario_lib import ScenarioSet
 from matplotlib.lines import Line2D
 import matplotlib.pyplot as plt
 from matplotlib.collections import LineCollection
 from matplotlib.collections import PolyCollection
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize, to_rgba_array
+from matplotlib.markers import MarkerStyle
+import matplotlib.image as mpl_image
+import math
 import os
+from .stats_lib import start_stats, disabled_stats
+from .cache_lib import cache_figure, store_pending_figure, is_figure_cache_hit, show_cached_figure
 
 
+def get_selected_feature_count(mnet: MultiNet) -> int:
+    # number of features selected by the latest extraction
+    layers = [mnet.node, mnet.link, mnet.POI, mnet.demand, mnet.zone]
+    return sum(len(layer.selected_index) for layer in layers if layer.selected_index is not None)
+
+
+def save_figure(path_figure: str, stats=disabled_stats, dpi: float = None) -> None:
+    """save the current figure to a png file
+
+    Args:
+        path_figure (str): path of the png file
+        stats (PipelineStats): stats of the calling show_* function. Defaults to disabled stats.
+        dpi (float): resolution of the png file. Defaults to None, which means the figure dpi.
+    """
+
+    fig = plt.gcf()
+    savefig_dpi = plt.rcParams['savefig.dpi'] if dpi is None else dpi
+    isDefaultSaving = (savefig_dpi in ('figure', fig.dpi)
+                       and plt.rcParams['savefig.facecolor'] == 'auto'
+                       and plt.rcParams['savefig.edgecolor'] == 'auto'
+                       and not plt.rcParams['savefig.transparent']
+                       and plt.rcParams['savefig.bbox'] is None
+                       and hasattr(fig.canvas, 'buffer_rgba'))
+
+    if stats.isEnabled and isDefaultSaving:
+        # the same steps as savefig of Agg canvas, split to time rasterization and png encoding separately
+        fig.canvas.draw()
+        stats.lap('rasterization')
+        mpl_image.imsave(path_figure, np.asarray(fig.canvas.buffer_rgba()), format='png', origin='upper', dpi=fig.dpi)
+        stats.lap('png_encoding')
+    else:
+        plt.savefig(path_figure, dpi=dpi)
+        stats.lap('rasterization_and_png_encoding')
+    # the figure of a show_* call with a cache miss is stored in the figure cache
+    store_pending_figure(path_figure)
+
+
+def select_labels_by_screen_grid(ax, x: np.ndarray, y: np.ndarray, texts: list, priority: np.ndarray,
+                                 fontsize: float) -> np.ndarray:
+    """select labels which do not collide on the figure, in the order of priority
+
+    The axes area is divided into a grid of cells of the text height in pixels. Each label
+    occupies the cells of its estimated text box, and a label is dropped if any of them is
+    already occupied, so the number of labels is bounded by what fits on the figure.
+
+    Args:
+        ax: axes to draw the labels on, its data limits and position should be final
+        x (np.ndarray): x of the label anchors in data coordinates, text starts at the anchor
+        y (np.ndarray): y of the label anchors in data coordinates
+        texts (list): label texts
+        priority (np.ndarray): priority of each label, larger values are placed first
+        fontsize (float): font size in points
+
+    Returns:
+        np.ndarray: positions of the selected labels, in the order of priority
+    """
+
+    if len(texts) == 0:
+        return np.array([], dtype=np.int64)
+    pixel = ax.transData.transform(np.column_stack([x, y]).astype(float))
+    bbox = ax.bbox
+    # text box estimated from the font size, an average character is about 0.6 em wide
+    height = fontsize * ax.figure.dpi / 72
+    widths = np.array([len(str(text)) for text in texts]) * 0.6 * height
+    cell = max(height, 1.0)
+    number_of_rows = int(np.ceil(bbox.height / cell)) + 1
+    number_of_cols = int(np.ceil(bbox.width / cell)) + 1
+    grid = np.zeros((number_of_rows, number_of_cols), dtype=bool)
+
+    col_start = np.floor((pixel[:, 0] - bbox.x0) / cell).astype(np.int64)
+    col_end = np.floor((pixel[:, 0] + widths - bbox.x0) / cell).astype(np.int64) + 1
+    row_start = np.floor((pixel[:, 1] - bbox.y0) / cell).astype(np.int64)
+    row_end = np.floor((pixel[:, 1] + height - bbox.y0) / cell).astype(np.int64) + 1
+    isInside = ((col_start >= 0) & (col_end <= number_of_cols) & (row_start >= 0) & (row_end <= number_of_rows)
+                & np.isfinite(pixel).all(axis=1))
+
+    selected = []
+    for i in np.flatnonzero(isInside)[np.argsort(-priority[isInside], kind='stable')]:
+        cells = grid[row_start[i]:row_end[i], col_start[i]:col_end[i]]
+        if not cells.any():
+            cells[:] = True
+            selected.append(i)
+    return np.array(selected, dtype=np.int64)
+
+
+def draw_density(ax, x: np.ndarray, y: np.ndarray, weights: np.ndarray = None, aggregation: str = 'hex',
+                 gridsize: int = 100, cmap: str = 'jet', zorder: int = 0):
+    """draw points as one mesh of hexagonal or square cells colored by point count or weight sum
+
+    Points are binned at once, so the number of drawn cells does not depend on the number of points.
+
+    Args:
+        ax: axes to draw on
+        x (np.ndarray): x of the points
+        y (np.ndarray): y of the points
+        weights (np.ndarray): weight of each point summed in each cell, None to count points. Defaults to None.
+        aggregation (str): 'hex' or 'square'. Defaults to 'hex'.
+        gridsize (int): number of cells in x direction. Defaults to 100.
+        cmap (str): colormap of the cells. Defaults to 'jet'.
+        zorder (int): zorder of the mesh. Defaults to 0.
+
+    Returns:
+        the mesh artist, None if there is no point to draw
+    """
+
+    if aggregation not in ('hex', 'square'):
+        raise Exception("ValueError: aggregation should be one of ['hex', 'square'] or None")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    isValid = np.isfinite(x) & np.isfinite(y)
+    if weights is not None:
+        weights = np.nan_to_num(np.asarray(weights, dtype=float))[isValid]
+    x, y = x[isValid], y[isValid]
+    if len(x) == 0:
+        return None
+
+    if aggregation == 'hex':
+        if weights is None:
+            return ax.hexbin(x, y, gridsize=gridsize, mincnt=1, cmap=cmap, zorder=zorder)
+        return ax.hexbin(x, y, C=weights, reduce_C_function=np.sum, gridsize=gridsize, cmap=cmap, zorder=zorder)
+
+    # square cells of the same size in x and y
+    x_span, y_span = np.ptp(x), np.ptp(y)
+    cell = (x_span or y_span or 1.0) / gridsize
+    x_edges = x.min() + cell * np.arange(int(x_span // cell) + 2)
+    y_edges = y.min() + cell * np.arange(int(y_span // cell) + 2)
+    values, _, _ = np.histogram2d(x, y, bins=[x_edges, y_edges], weights=weights)
+    counts = values if weights is None else np.histogram2d(x, y, bins=[x_edges, y_edges])[0]
+    return ax.pcolormesh(x_edges, y_edges, np.ma.masked_where(counts.T == 0, values.T), cmap=cmap, zorder=zorder)
+
+
+def scatter_by_categories(ax, x: list, y: list, categories: np.ndarray, node_style, zorder: int = 2):
+    """draw points of several categories as one collection, with the marker and color of each point's category
+
+    Args:
+        ax: axes to draw on
+        x (list): x of the points
+        y (list): y of the points
+        categories (np.ndarray): category of each point, styles of unknown categories are those of 'other'
+        node_style (NodeStyle): markers and colors by category, size and edgecolors of all points
+        zorder (int): zorder of the collection. Defaults to 2.
+
+    Returns:
+        the PathCollection, None if there is no point to draw
+    """
+
+    if len(x) == 0:
+        return None
+    codes, uniques = pd.factorize(np.asarray(categories, dtype=object))
+    markers = [MarkerStyle(node_style.markers.get(category, node_style.markers['other'])) for category in uniques]
+    paths = [marker.get_path().transformed(marker.get_transform()) for marker in markers]
+    colors = to_rgba_array([node_style.colors.get(category, node_style.colors['other']) for category in uniques])
+    collection = ax.scatter(x, y, c=colors[codes], s=node_style.size, edgecolors=node_style.edgecolors, zorder=zorder)
+    collection.set_paths([paths[code] for code in codes] if len(paths) > 1 else paths)
+    return collection
+
+
+def draw_node_layer(fig, ax, mnet: MultiNet) -> None:
+    # draw the extracted nodes as markers, or as a density mesh if node_style.aggregation is set
+    node_style = mnet.style.node_style
+    if node_style.aggregation is None:
+        ax.scatter(mnet.node.x_coords,
+                   mnet.node.y_coords,
+                   marker=node_style.markers['other'],
+                   c=node_style.colors['other'],
+                   s=node_style.size,
+                   edgecolors=node_style.edgecolors,
+                   zorder=2)
+        return
+
+    mesh = draw_density(ax, mnet.node.x_coords, mnet.node.y_coords, aggregation=node_style.aggregation,
+                        gridsize=node_style.gridsize, cmap=mnet.style.cmap, zorder=0)
+    if mesh is not None:
+        fig.colorbar(mesh, ax=ax, label='nodes')
+
+
+def draw_poi_layer(fig, ax, mnet: MultiNet, weight: str = None) -> None:
+    """draw the extracted POIs as polygons, or their centroids as a density mesh if poi_style.aggregation is set
+
+    Args:
+        fig: figure of ax
+        ax: axes to draw on
+        mnet (MultiNet): MultiNet object
+        weight (str): POI column summed in each cell, e.g. 'production'. Defaults to None, which means
+            poi_style.weight.
+    """
+
+    poi_style = mnet.style.poi_style
+    if poi_style.aggregation is None:
+        ax.add_collection(
+            PolyCollection(mnet.POI.poi_coords,
+                           alpha=0.7,
+                           facecolors=poi_style.facecolor,
+                           edgecolors=poi_style.edgecolor,
+                           zorder=0))
+        return
+
+    weight = weight or poi_style.weight
+    res = mnet.POI.value.loc[mnet.POI.selected_index]
+    centroids = mnet.POI.get_poi_centroids(res)
+    weights = pd.to_numeric(res[weight], errors='coerce').to_numpy() if weight else None
+    mesh = draw_density(ax, centroids[:, 0], centroids[:, 1], weights, aggregation=poi_style.aggregation,
+                        gridsize=poi_style.gridsize, cmap=mnet.style.cmap, zorder=0)
+    if mesh is not None:
+        fig.colorbar(mesh, ax=ax, label=weight or 'POIs')
+
+
+def draw_zone_labels(ax, mnet: MultiNet, label_priority=None, isCullLabels: bool = True) -> None:
+    # zone names at the centroids, call it after the axis limits and layout are final
+    names = [label[0] for label in mnet.zone.zone_names]
+    x = np.array([label[1] for label in mnet.zone.zone_names], dtype=float)
+    y = np.array([label[2] for label in mnet.zone.zone_names], dtype=float)
+    if isCullLabels:
+        positions = select_labels_by_screen_grid(ax, x, y, names, get_zone_label_priority(mnet, label_priority),
+                                                 mnet.style.zone_style.fontsize)
+    else:
+        positions = np.arange(len(names))
+    for i in positions:
+        ax.annotate(
+            str(names[i]),
+            xy=(x[i], y[i]),
+            xytext=(x[i], y[i]),
+            weight='bold',
+            color=mnet.style.zone_style.fontcolor,
+            fontsize=mnet.style.zone_style.fontsize)
+
+
+@cache_figure
 def show_network_by_modes(mnet: MultiNet,
                           modes: list = None,
                           fig_obj: plt = None,
@@ -48,6 +287,8 @@ def show_network_by_modes(mnet: MultiNet,
         plt: figure object with the drawn network
     """
 
+    stats = start_stats('show_network_by_modes', mnet.isStats)
+
     if modes is None:
         modes = ['all']
 
@@ -58,6 +299,10 @@ def show_network_by_modes(mnet: MultiNet,
         output_dir = Path.cwd()
 
     extract_coordinates_by_network_mode(mnet, modes)
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
 
     if fig_obj:
         # get ax from fog_obj and add more data later
@@ -69,13 +314,7 @@ def show_network_by_modes(mnet: MultiNet,
 
     # draw network nodes
     if mnet.node_loaded:
-        ax.scatter(mnet.node.x_coords,
-                   mnet.node.y_coords,
-                   marker=mnet.style.node_style.markers['other'],
-                   c=mnet.style.node_style.colors['other'],
-                   s=mnet.style.node_style.size,
-                   edgecolors=mnet.style.node_style.edgecolors,
-                   zorder=2)
+        draw_node_layer(fig, ax, mnet)
 
     # draw network links
     if mnet.link_loaded:
@@ -87,27 +326,26 @@ def show_network_by_modes(mnet: MultiNet,
 
     # draw network pois
     if mnet.POI_loaded:
-        ax.add_collection(
-            PolyCollection(mnet.POI.poi_coords,
-                           alpha=0.7,
-                           facecolors=mnet.style.poi_style.facecolor,
-                           edgecolors=mnet.style.poi_style.edgecolor,
-                           zorder=0))
+        draw_poi_layer(fig, ax, mnet)
 
     ax.autoscale_view()
     plt.xlabel('x_coord')
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(file_name="network_by_mode.png",
                                              folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_by_node_types(mnet: MultiNet,
                                osm_highway: list,
                                fig_obj: plt = None,
@@ -115,6 +353,9 @@ def show_network_by_node_types(mnet: MultiNet,
                                output_dir: str = None) -> plt:
     """draw network nodes according to specified node types
 
+    Nodes are drawn with the marker and color of their type in node_style, or binned into one
+    density mesh of all selected types if node_style.aggregation is set.
+
     Args:
         mnet (MultiNet): MultiNet object
         osm_highway (list): list of network node types to display.
@@ -126,6 +367,8 @@ def show_network_by_node_types(mnet: MultiNet,
         plt: figure object with the drawn network
     """
 
+    stats = start_stats('show_network_by_node_types', mnet.isStats)
+
     if output_dir is None:
         output_dir = Path.cwd()
 
@@ -139,6 +382,13 @@ def show_network_by_node_types(mnet: MultiNet,
     else:
         raise Exception("TypeError: str or list is expected ")
 
+    if mnet.node_loaded:
+        extract_coordinates_by_node_types(mnet, osm_highway_)
+        stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
+
     if fig_obj:
         # get ax from fog_obj and add more data later
         ax = fig_obj.gca()
@@ -147,21 +397,11 @@ def show_network_by_node_types(mnet: MultiNet,
         # create an empty fig and ax and add data later
         fig, ax = plt.subplots(figsize=mnet.style.figure_size, dpi=mnet.style.dpi)
 
-    # draw network nodes
-    if mnet.node_loaded:
-        extract_coordinates_by_node_types(mnet, osm_highway_)
-        for id in range(len(mnet.node.x_coords)):
-            x_coords = mnet.node.x_coords[id]
-            y_coords = mnet.node.y_coords[id]
-            highway_type = osm_highway_[id]
-            if len(x_coords) > 0:
-                ax.scatter(x_coords,
-                           y_coords,
-                           marker=mnet.style.node_style.markers[highway_type],
-                           c=mnet.style.node_style.colors[highway_type],
-                           s=mnet.style.node_style.size,
-                           edgecolors=mnet.style.node_style.edgecolors,
-                           zorder=2)
+    # draw network nodes, with the marker and color of their node type, or as a density mesh
+    if mnet.node_loaded and mnet.style.node_style.aggregation is None:
+        scatter_by_categories(ax, mnet.node.x_coords, mnet.node.y_coords, mnet.node.categories, mnet.style.node_style)
+    elif mnet.node_loaded:
+        draw_node_layer(fig, ax, mnet)
 
     # draw network links
     if mnet.link_loaded:
@@ -173,27 +413,26 @@ def show_network_by_node_types(mnet: MultiNet,
 
     # draw network pois
     if mnet.POI_loaded:
-        ax.add_collection(
-            PolyCollection(mnet.POI.poi_coords,
-                           alpha=0.7,
-                           facecolors=mnet.style.poi_style.facecolor,
-                           edgecolors=mnet.style.poi_style.edgecolor,
-                           zorder=0))
+        draw_poi_layer(fig, ax, mnet)
 
     ax.autoscale_view()
     plt.xlabel('x_coord')
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(file_name="network_by_node_type.png",
                                              folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure, dpi=mnet.style.dpi)
+        save_figure(path_figure, stats, dpi=mnet.style.dpi)
         print(f"Successfully save figure to {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_by_link_types(mnet: MultiNet,
                                link_types: list,
                                fig_obj: plt = None,
@@ -211,6 +450,8 @@ def show_network_by_link_types(mnet: MultiNet,
         plt: figure object with the drawn network
     """
 
+    stats = start_stats('show_network_by_link_types', mnet.isStats)
+
     if output_dir is None:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
@@ -233,15 +474,13 @@ def show_network_by_link_types(mnet: MultiNet,
 
     # draw network nodes
     extract_coordinates_by_link_types(mnet, link_types_)
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
 
     if mnet.node_loaded:
-        ax.scatter(mnet.node.x_coords,
-                   mnet.node.y_coords,
-                   marker=mnet.style.node_style.markers['other'],
-                   c=mnet.style.node_style.colors['other'],
-                   s=mnet.style.node_style.size,
-                   edgecolors=mnet.style.node_style.edgecolors,
-                   zorder=2)
+        draw_node_layer(fig, ax, mnet)
 
     # draw network links
     if mnet.link_loaded:
@@ -253,28 +492,27 @@ def show_network_by_link_types(mnet: MultiNet,
 
     # draw network pois
     if mnet.POI_loaded:
-        ax.add_collection(
-            PolyCollection(mnet.POI.poi_coords,
-                           alpha=0.7,
-                           facecolors=mnet.style.poi_style.facecolor,
-                           edgecolors=mnet.style.poi_style.edgecolor,
-                           zorder=0))
+        draw_poi_layer(fig, ax, mnet)
 
     ax.autoscale_view()
     plt.xlabel('x_coord')
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(
             file_name="network_by_link_type.png",
             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_by_link_lanes(mnet: MultiNet,
                                min_lanes: int,
                                max_lanes: int,
@@ -294,6 +532,8 @@ def show_network_by_link_lanes(mnet: MultiNet,
         plt: Figure object with the drawn network
     """
 
+    stats = start_stats('show_network_by_link_lanes', mnet.isStats)
+
     if output_dir is None:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
@@ -302,6 +542,10 @@ def show_network_by_link_lanes(mnet: MultiNet,
     if min_lanes > max_lanes:
         print("ValueError: 'min_lanes' should not less than 'max_lanes' ")
     extract_coordinates_by_link_lane(mnet, (min_lanes, max_lanes))
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
 
     if fig_obj:
         # get ax from fog_obj and add more data later
@@ -313,13 +557,7 @@ def show_network_by_link_lanes(mnet: MultiNet,
 
     # draw network nodes
     if mnet.node_loaded:
-        ax.scatter(mnet.node.x_coords,
-                   mnet.node.y_coords,
-                   marker=mnet.style.node_style.markers['other'],
-                   c=mnet.style.node_style.colors['other'],
-                   s=mnet.style.node_style.size,
-                   edgecolors=mnet.style.node_style.edgecolors,
-                   zorder=2)
+        draw_node_layer(fig, ax, mnet)
 
     # draw network links
     if mnet.link_loaded:
@@ -331,28 +569,27 @@ def show_network_by_link_lanes(mnet: MultiNet,
 
     # draw network pois
     if mnet.POI_loaded:
-        ax.add_collection(
-            PolyCollection(mnet.POI.poi_coords,
-                           alpha=0.7,
-                           facecolors=mnet.style.poi_style.facecolor,
-                           edgecolors=mnet.style.poi_style.edgecolor,
-                           zorder=0))
+        draw_poi_layer(fig, ax, mnet)
 
     ax.autoscale_view()
     plt.xlabel('x_coord')
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(
             file_name="network_by_link_lane.png",
             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_by_link_free_speed(mnet: MultiNet,
                                     min_free_speed: int,
                                     max_free_speed: int,
@@ -373,6 +610,8 @@ def show_network_by_link_free_speed(mnet: MultiNet,
         plt: Figure object with the drawn network
     """
 
+    stats = start_stats('show_network_by_link_free_speed', mnet.isStats)
+
     if output_dir is None:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
@@ -382,6 +621,10 @@ def show_network_by_link_free_speed(mnet: MultiNet,
         print("ValueError: 'min_lanes' should not less than 'max_lanes' ")
     extract_coordinates_by_link_free_speed(
         mnet, (min_free_speed, max_free_speed))
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
 
     if fig_obj:
         # get ax from fog_obj and add more data later
@@ -393,13 +636,7 @@ def show_network_by_link_free_speed(mnet: MultiNet,
 
     # draw network nodes
     if mnet.node_loaded:
-        ax.scatter(mnet.node.x_coords,
-                   mnet.node.y_coords,
-                   marker=mnet.style.node_style.markers['other'],
-                   c=mnet.style.node_style.colors['other'],
-                   s=mnet.style.node_style.size,
-                   edgecolors=mnet.style.node_style.edgecolors,
-                   zorder=2)
+        draw_node_layer(fig, ax, mnet)
 
     # draw network links
     if mnet.link_loaded:
@@ -411,28 +648,27 @@ def show_network_by_link_free_speed(mnet: MultiNet,
 
     # draw network pois
     if mnet.POI_loaded:
-        ax.add_collection(
-            PolyCollection(mnet.POI.poi_coords,
-                           alpha=0.7,
-                           facecolors=mnet.style.poi_style.facecolor,
-                           edgecolors=mnet.style.poi_style.edgecolor,
-                           zorder=0))
+        draw_poi_layer(fig, ax, mnet)
 
     ax.autoscale_view()
     plt.xlabel('x_coord')
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(
             file_name="network_by_link_free_speed.png",
             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_by_link_length(mnet: MultiNet,
                                 min_length: int,
                                 max_length: int,
@@ -452,6 +688,8 @@ def show_network_by_link_length(mnet: MultiNet,
         plt: Figure object with the drawn network
     """
 
+    stats = start_stats('show_network_by_link_length', mnet.isStats)
+
     if output_dir is None:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
@@ -460,6 +698,10 @@ def show_network_by_link_length(mnet: MultiNet,
     if min_length > max_length:
         print("ValueError: 'min_lanes' should not less than 'max_lanes' ")
     extract_coordinates_by_link_length(mnet, (min_length, max_length))
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
 
     if fig_obj:
         # get ax from fog_obj and add more data later
@@ -471,13 +713,7 @@ def show_network_by_link_length(mnet: MultiNet,
 
     # draw network nodes
     if mnet.node_loaded:
-        ax.scatter(mnet.node.x_coords,
-                   mnet.node.y_coords,
-                   marker=mnet.style.node_style.markers['other'],
-                   c=mnet.style.node_style.colors['other'],
-                   s=mnet.style.node_style.size,
-                   edgecolors=mnet.style.node_style.edgecolors,
-                   zorder=2)
+        draw_node_layer(fig, ax, mnet)
 
     # draw network links
     if mnet.link_loaded:
@@ -489,27 +725,26 @@ def show_network_by_link_length(mnet: MultiNet,
 
     # draw network pois
     if mnet.POI_loaded:
-        ax.add_collection(
-            PolyCollection(mnet.POI.poi_coords,
-                           alpha=0.7,
-                           facecolors=mnet.style.poi_style.facecolor,
-                           edgecolors=mnet.style.poi_style.edgecolor,
-                           zorder=0))
+        draw_poi_layer(fig, ax, mnet)
     ax.autoscale_view()
     plt.xlabel('x_coord')
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(
             file_name="network_by_link_length.png",
             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_by_link_lane_distribution(mnet: MultiNet,
                                            fig_obj: plt = None,
                                            isSave2png: bool = True,
@@ -526,12 +761,18 @@ def show_network_by_link_lane_distribution(mnet: MultiNet,
         plt: figure object with the drawn network
     """
 
+    stats = start_stats('show_network_by_link_lane_distribution', mnet.isStats)
+
     if output_dir is None:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
         output_dir = Path.cwd()
 
     extract_coordinates_by_link_attr_distribution(mnet, 'lanes')
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
 
     if fig_obj:
         # get ax from fog_obj and add more data later
@@ -543,18 +784,14 @@ def show_network_by_link_lane_distribution(mnet: MultiNet,
 
     # draw network nodes
     if mnet.node_loaded:
-        ax.scatter(mnet.node.x_coords,
-                   mnet.node.y_coords,
-                   marker=mnet.style.node_style.markers['other'],
-                   c=mnet.style.node_style.colors['other'],
-                   s=mnet.style.node_style.size,
-                   edgecolors=mnet.style.node_style.edgecolors,
-                   zorder=2)
+        draw_node_layer(fig, ax, mnet)
 
     # draw network links
     if mnet.link_loaded:
-        max_v, min_v = max(mnet.link.attr_distribution), min(mnet.link.attr_distribution)
-        w = np.array(mnet.link.attr_distribution) / max_v * 4.5 + 0.5
+        values = np.array(mnet.link.attr_distribution, dtype=float)
+        max_v, min_v = np.nanmax(values), np.nanmin(values)
+        # links of missing values are drawn in the thinnest width
+        w = np.nan_to_num(values / max_v * 4.5 + 0.5, nan=0.5)
         ax.add_collection(
             LineCollection(mnet.link.link_coords,
                            colors=mnet.style.link_style.linecolor,
@@ -563,12 +800,7 @@ def show_network_by_link_lane_distribution(mnet: MultiNet,
 
     # draw network pois
     if mnet.POI_loaded:
-        ax.add_collection(
-            PolyCollection(mnet.POI.poi_coords,
-                           alpha=0.7,
-                           facecolors=mnet.style.poi_style.facecolor,
-                           edgecolors=mnet.style.poi_style.edgecolor,
-                           zorder=0))
+        draw_poi_layer(fig, ax, mnet)
 
     # add legend
     proxies = [Line2D([0, 1], [0, 1], color=mnet.style.link_style.linecolor, linewidth=0.5),
@@ -579,16 +811,20 @@ def show_network_by_link_lane_distribution(mnet: MultiNet,
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(
             file_name="network_by_link_lane_distribution.png",
             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_by_link_free_speed_distribution(mnet: MultiNet,
                                                  fig_obj: plt = None,
                                                  isSave2png: bool = True,
@@ -604,12 +840,18 @@ def show_network_by_link_free_speed_distribution(mnet: MultiNet,
     Returns:
         plt: figure object with the drawn network
     """
+
+    stats = start_stats('show_network_by_link_free_speed_distribution', mnet.isStats)
     if output_dir is None:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
         output_dir = Path.cwd()
 
     extract_coordinates_by_link_attr_distribution(mnet, 'free_speed')
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
 
     if fig_obj:
         # get ax from fog_obj and add more data later
@@ -621,18 +863,14 @@ def show_network_by_link_free_speed_distribution(mnet: MultiNet,
 
     # draw network nodes
     if mnet.node_loaded:
-        ax.scatter(mnet.node.x_coords,
-                   mnet.node.y_coords,
-                   marker=mnet.style.node_style.markers['other'],
-                   c=mnet.style.node_style.colors['other'],
-                   s=mnet.style.node_style.size,
-                   edgecolors=mnet.style.node_style.edgecolors,
-                   zorder=2)
+        draw_node_layer(fig, ax, mnet)
 
     # draw network links
     if mnet.link_loaded:
-        max_v, min_v = max(mnet.link.attr_distribution), min(mnet.link.attr_distribution)
-        w = np.array(mnet.link.attr_distribution) / max_v * 4.5 + 0.5
+        values = np.array(mnet.link.attr_distribution, dtype=float)
+        max_v, min_v = np.nanmax(values), np.nanmin(values)
+        # links of missing values are drawn in the thinnest width
+        w = np.nan_to_num(values / max_v * 4.5 + 0.5, nan=0.5)
         ax.add_collection(
             LineCollection(mnet.link.link_coords,
                            colors=mnet.style.link_style.linecolor,
@@ -641,12 +879,7 @@ def show_network_by_link_free_speed_distribution(mnet: MultiNet,
 
     # draw network pois
     if mnet.POI_loaded:
-        ax.add_collection(
-            PolyCollection(mnet.POI.poi_coords,
-                           alpha=0.7,
-                           facecolors=mnet.style.poi_style.facecolor,
-                           edgecolors=mnet.style.poi_style.edgecolor,
-                           zorder=0))
+        draw_poi_layer(fig, ax, mnet)
 
     # add legend
     proxies = [Line2D([0, 1], [0, 1], color=mnet.style.link_style.linecolor, linewidth=0.5),
@@ -657,16 +890,20 @@ def show_network_by_link_free_speed_distribution(mnet: MultiNet,
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(
             file_name="network_by_link_free_speed_distribution.png",
             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_by_link_capacity_distribution(mnet: MultiNet,
                                                fig_obj: plt = None,
                                                isSave2png: bool = True,
@@ -682,12 +919,18 @@ def show_network_by_link_capacity_distribution(mnet: MultiNet,
     Returns:
         plt: figure object with the drawn network
     """
+
+    stats = start_stats('show_network_by_link_capacity_distribution', mnet.isStats)
     if output_dir is None:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
         output_dir = Path.cwd()
 
     extract_coordinates_by_link_attr_distribution(mnet, 'capacity')
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
 
     if fig_obj:
         # get ax from fog_obj and add more data later
@@ -699,18 +942,14 @@ def show_network_by_link_capacity_distribution(mnet: MultiNet,
 
     # draw network nodes
     if mnet.node_loaded:
-        ax.scatter(mnet.node.x_coords,
-                   mnet.node.y_coords,
-                   marker=mnet.style.node_style.markers['other'],
-                   c=mnet.style.node_style.colors['other'],
-                   s=mnet.style.node_style.size,
-                   edgecolors=mnet.style.node_style.edgecolors,
-                   zorder=2)
+        draw_node_layer(fig, ax, mnet)
 
     # draw network links
     if mnet.link_loaded:
-        max_v, min_v = max(mnet.link.attr_distribution), min(mnet.link.attr_distribution)
-        w = np.array(mnet.link.attr_distribution) / max_v * 4.5 + 0.5
+        values = np.array(mnet.link.attr_distribution, dtype=float)
+        max_v, min_v = np.nanmax(values), np.nanmin(values)
+        # links of missing values are drawn in the thinnest width
+        w = np.nan_to_num(values / max_v * 4.5 + 0.5, nan=0.5)
         ax.add_collection(
             LineCollection(mnet.link.link_coords,
                            colors=mnet.style.link_style.linecolor,
@@ -719,12 +958,7 @@ def show_network_by_link_capacity_distribution(mnet: MultiNet,
 
     # draw network pois
     if mnet.POI_loaded:
-        ax.add_collection(
-            PolyCollection(mnet.POI.poi_coords,
-                           alpha=0.7,
-                           facecolors=mnet.style.poi_style.facecolor,
-                           edgecolors=mnet.style.poi_style.edgecolor,
-                           zorder=0))
+        draw_poi_layer(fig, ax, mnet)
 
     # add legend
     proxies = [Line2D([0, 1], [0, 1], color=mnet.style.link_style.linecolor, linewidth=0.5),
@@ -735,16 +969,20 @@ def show_network_by_link_capacity_distribution(mnet: MultiNet,
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(
             file_name="network_by_link_capacity_distribution.png",
             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_by_poi_types(mnet: MultiNet,
                               poi_type: Union[str, list],
                               fig_obj: plt = None,
@@ -763,6 +1001,8 @@ def show_network_by_poi_types(mnet: MultiNet,
         plt: figure object with the drawn network
     """
 
+    stats = start_stats('show_network_by_poi_types', mnet.isStats)
+
     if output_dir is None:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
@@ -775,6 +1015,10 @@ def show_network_by_poi_types(mnet: MultiNet,
     else:
         raise Exception("TypeError: str or list is expected ")
     extract_coordinates_by_poi_type(mnet=mnet, poi_type=poi_type_)
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
 
     if fig_obj:
         # get ax from fog_obj and add more data later
@@ -786,13 +1030,7 @@ def show_network_by_poi_types(mnet: MultiNet,
 
     # draw network nodes
     if mnet.node_loaded:
-        ax.scatter(mnet.node.x_coords,
-                   mnet.node.y_coords,
-                   marker=mnet.style.node_style.markers['other'],
-                   c=mnet.style.node_style.colors['other'],
-                   s=mnet.style.node_style.size,
-                   edgecolors=mnet.style.node_style.edgecolors,
-                   zorder=2)
+        draw_node_layer(fig, ax, mnet)
 
     # draw network links
     if mnet.link_loaded:
@@ -804,28 +1042,27 @@ def show_network_by_poi_types(mnet: MultiNet,
 
     # draw network pois
     if mnet.POI_loaded:
-        ax.add_collection(
-            PolyCollection(mnet.POI.poi_coords,
-                           alpha=0.7,
-                           facecolors=mnet.style.poi_style.facecolor,
-                           edgecolors=mnet.style.poi_style.edgecolor,
-                           zorder=0))
+        draw_poi_layer(fig, ax, mnet)
 
     ax.autoscale_view()
     plt.xlabel('x_coord')
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(
             file_name="network_by_poi_type.png",
             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_by_poi_production_distribution(mnet: MultiNet,
                                                 fig_obj: plt = None,
                                                 isSave2png: bool = True,
@@ -840,12 +1077,18 @@ def show_network_by_poi_production_distribution(mnet: MultiNet,
         output_dir (str): directory to save the figure. Defaults to None, which means the current working directory.
     """
 
+    stats = start_stats('show_network_by_poi_production_distribution', mnet.isStats)
+
     if output_dir is None:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
         output_dir = Path.cwd()
 
     extract_coordinates_by_poi_attr_distribution(mnet=mnet, column='production')
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
 
     if fig_obj:
         # get ax from fog_obj and add more data later
@@ -857,13 +1100,7 @@ def show_network_by_poi_production_distribution(mnet: MultiNet,
 
     # draw network nodes
     if mnet.node_loaded:
-        ax.scatter(mnet.node.x_coords,
-                   mnet.node.y_coords,
-                   marker=mnet.style.node_style.markers['other'],
-                   c=mnet.style.node_style.colors['other'],
-                   s=mnet.style.node_style.size,
-                   edgecolors=mnet.style.node_style.edgecolors,
-                   zorder=2)
+        draw_node_layer(fig, ax, mnet)
 
     # draw network links
     if mnet.link_loaded:
@@ -874,7 +1111,9 @@ def show_network_by_poi_production_distribution(mnet: MultiNet,
                            zorder=1))
 
     # draw network pois
-    if mnet.POI_loaded:
+    if mnet.POI_loaded and mnet.style.poi_style.aggregation:
+        draw_poi_layer(fig, ax, mnet, weight='production')
+    elif mnet.POI_loaded:
         poly_coll = PolyCollection(mnet.POI.poi_coords,
                                    alpha=0.7,
                                    array=np.array(mnet.POI.attr_distribution),
@@ -889,16 +1128,20 @@ def show_network_by_poi_production_distribution(mnet: MultiNet,
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(
             file_name="network_by_poi_production_distribution.png",
             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_by_poi_attraction_distribution(mnet: MultiNet,
                                                 fig_obj: plt = None,
                                                 isSave2png: bool = True,
@@ -916,12 +1159,18 @@ def show_network_by_poi_attraction_distribution(mnet: MultiNet,
         plt: figure object with the drawn network
     """
 
+    stats = start_stats('show_network_by_poi_attraction_distribution', mnet.isStats)
+
     if output_dir is None:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
         output_dir = Path.cwd()
 
     extract_coordinates_by_poi_attr_distribution(mnet=mnet, column='attraction')
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
 
     if fig_obj:
         # get ax from fog_obj and add more data later
@@ -933,13 +1182,7 @@ def show_network_by_poi_attraction_distribution(mnet: MultiNet,
 
     # draw network nodes
     if mnet.node_loaded:
-        ax.scatter(mnet.node.x_coords,
-                   mnet.node.y_coords,
-                   marker=mnet.style.node_style.markers['other'],
-                   c=mnet.style.node_style.colors['other'],
-                   s=mnet.style.node_style.size,
-                   edgecolors=mnet.style.node_style.edgecolors,
-                   zorder=2)
+        draw_node_layer(fig, ax, mnet)
 
     # draw network links
     if mnet.link_loaded:
@@ -950,7 +1193,9 @@ def show_network_by_poi_attraction_distribution(mnet: MultiNet,
                            zorder=1))
 
     # draw network pois
-    if mnet.POI_loaded:
+    if mnet.POI_loaded and mnet.style.poi_style.aggregation:
+        draw_poi_layer(fig, ax, mnet, weight='attraction')
+    elif mnet.POI_loaded:
         poly_coll = PolyCollection(mnet.POI.poi_coords,
                                    alpha=0.7,
                                    array=np.array(mnet.POI.attr_distribution),
@@ -965,16 +1210,20 @@ def show_network_by_poi_attraction_distribution(mnet: MultiNet,
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(
             file_name="network_by_poi_attraction_distribution.png",
             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_demand_matrix_heatmap(mnet: MultiNet,
                                        annot: bool = False,
                                        isSave2png: bool = True,
@@ -991,12 +1240,21 @@ def show_network_demand_matrix_heatmap(mnet: MultiNet,
         plt: figure object with the drawn network
     """
 
+    # seaborn is only needed by the heatmap, so it is not imported with the module
+    import seaborn as sns
+
+    stats = start_stats('show_network_demand_matrix_heatmap', mnet.isStats)
+
     if output_dir is None:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
         output_dir = Path.cwd()
 
     count_demand_matrix(mnet)
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
     max_vol = np.max(mnet.demand.demand_matrix.reshape(1, -1))
     min_vol = np.min(mnet.demand.demand_matrix.reshape(1, -1))
     labels = [str(i + 1) for i in range(mnet.zone.value.shape[0])]
@@ -1011,23 +1269,32 @@ def show_network_demand_matrix_heatmap(mnet: MultiNet,
     plt.ylabel('from_zone_id')
     plt.tight_layout()
 
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(
             file_name="network_by_demand_matrix_heatmap.png",
             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
 
 
+@cache_figure
 def show_network_by_demand_OD(mnet: MultiNet,
                               load_zone: bool = True,
                               load_network: bool = False,
                               fig_obj: plt = None,
                               isSave2png: bool = True,
-                              output_dir: str = None) -> plt:
-    """draw network according to the distribution of poi attraction
+                              output_dir: str = None,
+                              min_volume: float = None,
+                              top_k: int = None,
+                              zone_groups=None,
+                              label_priority=None,
+                              isCullLabels: bool = True) -> plt:
+    """draw OD desire lines of the demand, line widths are proportional to the volume
 
     Args:
         mnet (MultiNet): MultiNet object
@@ -1036,17 +1303,32 @@ def show_network_by_demand_OD(mnet: MultiNet,
         fig_obj (plt): figure object (plt). If not None, will continue to draw elements on the existing figure object.
         isSave2png (bool): if True, save the figure to a png file. Defaults to True.
         output_dir (str): directory to save the figure. Defaults to None, which means the current working directory.
+        min_volume (float): only draw OD pairs with at least this volume. Defaults to None.
+        top_k (int): only draw the k OD pairs of the largest volume. Defaults to None.
+        zone_groups (str | dict | pd.Series): zone column name, or group of each zone_id, e.g. {1: 'A', 2: 'A'}.
+            If given, volumes are summed by group pairs before thresholds, and lines are drawn between
+            the mean centroids of the groups. Defaults to None.
+        label_priority (str | dict | pd.Series): zone column name, or priority of each zone_id, to choose which
+            zone labels are kept when they collide. Defaults to None, which means the demand volume of zones.
+        isCullLabels (bool): if True, zone labels that would overlap higher priority labels are not drawn.
+            Defaults to True.
 
     Returns:
         plt: figure object with the drawn network
     """
 
+    stats = start_stats('show_network_by_demand_OD', mnet.isStats)
+
     if output_dir is None:
         output_dir = Path.cwd()
     if not Path(output_dir).exists():
         output_dir = Path.cwd()
 
-    extract_coordinates_by_demand_OD(mnet, load_zone, load_network)
+    extract_coordinates_by_demand_OD(mnet, load_zone, load_network, min_volume, top_k, zone_groups)
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
 
     if fig_obj:
         # get ax from fog_obj and add more data later
@@ -1059,13 +1341,7 @@ def show_network_by_demand_OD(mnet: MultiNet,
     if load_network:
         # draw network nodes
         if mnet.node_loaded:
-            ax.scatter(mnet.node.x_coords,
-                       mnet.node.y_coords,
-                       marker=mnet.style.node_style.markers['other'],
-                       c=mnet.style.node_style.colors['other'],
-                       s=mnet.style.node_style.size,
-                       edgecolors=mnet.style.node_style.edgecolors,
-                       zorder=2)
+            draw_node_layer(fig, ax, mnet)
         # draw network links
         if mnet.link_loaded:
             ax.add_collection(
@@ -1075,12 +1351,7 @@ def show_network_by_demand_OD(mnet: MultiNet,
                                zorder=1))
         # draw network pois
         if mnet.POI_loaded:
-            ax.add_collection(
-                PolyCollection(mnet.POI.poi_coords,
-                               alpha=0.7,
-                               facecolors=mnet.style.poi_style.facecolor,
-                               edgecolors=mnet.style.poi_style.edgecolor,
-                               zorder=0))
+            draw_poi_layer(fig, ax, mnet)
     if load_zone:
         ax.add_collection(
             PolyCollection(mnet.zone.zone_coords,
@@ -1090,35 +1361,610 @@ def show_network_by_demand_OD(mnet: MultiNet,
                            facecolor='none',
                            zorder=3)
         )
-        for label in mnet.zone.zone_names:
-            plt.annotate(
-                str(label[0]),
-                xy=(label[1], label[2]),
-                xytext=(label[1], label[2]),
-                weight='bold',
-                color=mnet.style.zone_style.fontcolor,
-                fontsize=mnet.style.zone_style.fontsize)
 
     # plot network demand flow
-    w = np.array(mnet.demand.demand_OD_vol) / max(mnet.demand.demand_OD_vol) * 4.5 + 0.5
-    ax.add_collection(LineCollection(mnet.demand.demand_OD_coords, colors='orange', linewidths=w, zorder=2))
-
-    # add legend
-    proxies = [Line2D([0, 1], [0, 1], color='orange', linewidth=0.5),
-               Line2D([0, 1], [0, 1], color='orange', linewidth=5)]
-    ax.legend(proxies, ['%s:%.4f' % ('volume', min(mnet.demand.demand_OD_vol)),
-                        '%s:%.4f' % ('volume', max(mnet.demand.demand_OD_vol))])
+    volume = mnet.demand.demand_OD_vol
+    if len(volume):
+        w = volume / volume.max() * 4.5 + 0.5
+        ax.add_collection(LineCollection(mnet.demand.demand_OD_coords, colors='orange', linewidths=w, zorder=2))
+
+        # add legend
+        proxies = [Line2D([0, 1], [0, 1], color='orange', linewidth=0.5),
+                   Line2D([0, 1], [0, 1], color='orange', linewidth=5)]
+        ax.legend(proxies, ['%s:%.4f' % ('volume', volume.min()), '%s:%.4f' % ('volume', volume.max())])
+    else:
+        print("Warning: no OD pair is selected to draw!")
     # set axis
     ax.autoscale_view()
     plt.xlabel('x_coord')
     plt.ylabel('y_coord')
     plt.tight_layout()
 
+    # zone labels are placed in screen space, so after the axis limits and layout are final
+    if load_zone:
+        draw_zone_labels(ax, mnet, label_priority, isCullLabels)
+
+    stats.lap('artist_construction')
+
     if isSave2png:
         path_figure = generate_absolute_path(
             file_name="network_by_demand_od.png",
             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
-        plt.savefig(path_figure)
+        save_figure(path_figure, stats)
+        print(f"The image has been saved to the designated location: {path_figure}")
+
+    stats.finish(mnet)
+    return plt
+
+
+def animate_network_by_demand_OD(mnet: MultiNet,
+                                 time_column: str = 'time_period',
+                                 periods: list = None,
+                                 file_format: str = 'gif',
+                                 fps: float = 2,
+                                 load_zone: bool = True,
+                                 load_network: bool = False,
+                                 output_dir: str = None,
+                                 min_volume: float = None,
+                                 top_k: int = None,
+                                 label_priority=None,
+                                 isCullLabels: bool = True,
+                                 dpi: float = None) -> Union[str, list]:
+    """animate OD desire lines of each time period of the demand
+
+    The background (zones, labels and network) is built and rasterized once, and each frame only
+    updates the segments, widths and colors of the OD line collection and draws it on a copy of the
+    background, so a frame costs about one image encode. Widths and colors use the largest volume of
+    all periods, so frames are comparable.
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        time_column (str): time period column of the demand table. Defaults to 'time_period'.
+        periods (list): periods of the frames in order. Defaults to None, which means all periods sorted.
+        file_format (str): 'gif', 'mp4' (requires ffmpeg installed) or 'png' (one image per frame).
+            Defaults to 'gif'.
+        fps (float): frames per second of gif and mp4 files. Defaults to 2.
+        load_zone (bool): if True, draw the zone grid. Defaults to True.
+        load_network (bool): if True, draw the network as the background. Defaults to False
+        output_dir (str): directory to save the animation. Defaults to None, which means the current working directory.
+        min_volume (float): only draw OD pairs with at least this volume. Defaults to None.
+        top_k (int): only draw the k OD pairs of the largest volume of each period. Defaults to None.
+        label_priority (str | dict | pd.Series): zone column name, or priority of each zone_id, to choose which
+            zone labels are kept when they collide. Defaults to None, which means the demand volume of zones.
+        isCullLabels (bool): if True, zone labels that would overlap higher priority labels are not drawn.
+            Defaults to True.
+        dpi (float): resolution of the frames. Defaults to None, which means the figure dpi.
+
+    Returns:
+        str | list: path of the gif or mp4 file, or paths of the png files
+    """
+
+    from matplotlib import animation
+
+    stats = start_stats('animate_network_by_demand_OD', mnet.isStats)
+
+    if file_format not in ['gif', 'mp4', 'png']:
+        raise Exception("ValueError: file_format should be one of ['gif', 'mp4', 'png']")
+    if file_format == 'mp4' and not animation.writers.is_available('ffmpeg'):
+        raise Exception("ImportError: ffmpeg is required to write mp4 files, "
+                        "please install it by: conda install ffmpeg")
+
+    if output_dir is None:
+        output_dir = Path.cwd()
+    if not Path(output_dir).exists():
+        output_dir = Path.cwd()
+
+    points, start, end, volume, period_rows = extract_demand_OD_by_periods(mnet, time_column, periods)
+    if load_zone:
+        mnet.zone.update_coords()
+    if load_network:
+        mnet.node.update_coords()
+        mnet.link.update_coords_by_link_modes(modes=('all'))
+        mnet.POI.update_coords_by_poi_type(isCoords=not mnet.style.poi_style.aggregation)
+
+    def get_frame_rows(rows: np.ndarray) -> np.ndarray:
+        # rows of a period drawn in a frame, by the thresholds of show_network_by_demand_OD
+        if min_volume is not None:
+            rows = rows[volume[rows] >= min_volume]
+        if top_k is not None and len(rows) > top_k:
+            rows = rows[np.argpartition(-volume[rows], top_k - 1)[:top_k]]
+        return rows
+
+    frames = [(period, get_frame_rows(rows)) for period, rows in period_rows.items()]
+    if not frames:
+        raise Exception(f"ValueError: no time period is found in column {time_column}")
+    all_rows = np.concatenate([rows for _, rows in frames]) if frames else np.array([], dtype=np.int64)
+    if not len(all_rows):
+        print("Warning: no OD pair is selected to draw!")
+    max_volume = volume[all_rows].max() if len(all_rows) else 1.0
+    stats.lap('coordinate_extraction', len(all_rows))
+
+    fig, ax = plt.subplots(figsize=mnet.style.figure_size, dpi=dpi or mnet.style.dpi)
+    if load_network:
+        if mnet.node_loaded:
+            draw_node_layer(fig, ax, mnet)
+        if mnet.link_loaded:
+            ax.add_collection(
+                LineCollection(mnet.link.link_coords,
+                               colors=mnet.style.link_style.linecolor,
+                               linewidths=mnet.style.link_style.linewidth,
+                               zorder=1))
+        if mnet.POI_loaded:
+            draw_poi_layer(fig, ax, mnet)
+    if load_zone:
+        ax.add_collection(
+            PolyCollection(mnet.zone.zone_coords,
+                           facecolors='none',
+                           linewidths=mnet.style.zone_style.linewidth,
+                           edgecolors=mnet.style.zone_style.edgecolors,
+                           facecolor='none',
+                           zorder=3))
+
+    # endpoints of the OD lines of all frames set the axis limits once
+    norm = Normalize(vmin=0, vmax=max_volume)
+    cmap = plt.get_cmap(mnet.style.cmap)
+
+    def get_segments(rows: np.ndarray) -> np.ndarray:
+        return np.stack([np.asarray(points[start[rows]]), np.asarray(points[end[rows]])], axis=1)
+
+    isUsed = np.zeros(len(points), dtype=np.bool_)
+    isUsed[start[all_rows]] = True
+    isUsed[end[all_rows]] = True
+    ax.update_datalim(np.asarray(points[isUsed]))
+    od_lines = LineCollection([], zorder=2)
+    ax.add_collection(od_lines)
+    fig.colorbar(ScalarMappable(norm=norm, cmap=cmap), ax=ax, label='volume')
+    ax.autoscale_view()
+    plt.xlabel('x_coord')
+    plt.ylabel('y_coord')
+    # the layout leaves room for the title of the frames
+    title = ax.set_title(f"{time_column}: {frames[0][0]}")
+    plt.tight_layout()
+    if load_zone:
+        draw_zone_labels(ax, mnet, label_priority, isCullLabels)
+    stats.lap('artist_construction')
+
+    # the background and the artists above the OD lines (zone boundaries and labels) are rendered once,
+    # each frame restores the background, draws the OD lines and the title, and blends the overlay pixels
+    overlays = sorted([artist for artist in ax.collections + ax.texts if artist.get_zorder() > od_lines.get_zorder()],
+                      key=lambda artist: artist.get_zorder())
+    for artist in [od_lines, title] + overlays:
+        artist.set_animated(True)
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+    fig.canvas.get_renderer().clear()
+    for artist in overlays:
+        ax.draw_artist(artist)
+    overlay = np.asarray(fig.canvas.buffer_rgba()).reshape(-1, 4)
+    overlay_pixels = np.flatnonzero(overlay[:, 3])
+    overlay_alpha = overlay[overlay_pixels, 3:].astype(np.float32) / 255
+    overlay_rgb = overlay[overlay_pixels, :3].astype(np.float32) * overlay_alpha
+    stats.lap('rasterization')
+
+    def render_frame(frame: int) -> np.ndarray:
+        period, rows = frames[frame]
+        od_lines.set_segments(get_segments(rows))
+        od_lines.set_linewidths(volume[rows] / max_volume * 4.5 + 0.5)
+        od_lines.set_color(cmap(norm(volume[rows])))
+        title.set_text(f"{time_column}: {period}")
+        fig.canvas.restore_region(background)
+        ax.draw_artist(od_lines)
+        ax.draw_artist(title)
+        image = np.array(fig.canvas.buffer_rgba())
+        pixels = image.reshape(-1, 4)
+        pixels[overlay_pixels, :3] = overlay_rgb + pixels[overlay_pixels, :3] * (1 - overlay_alpha) + 0.5
+        return image
+
+    folder_name = path2linux(os.path.join(output_dir, "p4g_fig_results"))
+    if file_format == 'png':
+        path_animation = []
+        for frame in range(len(frames)):
+            path_figure = generate_absolute_path(file_name=f"network_by_demand_od_{frame:03d}.png",
+                                                 folder_name=folder_name)
+            mpl_image.imsave(path_figure, render_frame(frame), format='png', origin='upper', dpi=fig.dpi)
+            path_animation.append(path_figure)
+    elif file_format == 'gif':
+        from PIL import Image
+        path_animation = generate_absolute_path(file_name="network_by_demand_od.gif", folder_name=folder_name)
+        images = [Image.fromarray(render_frame(frame)).convert('RGB').quantize(
+            256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE) for frame in range(len(frames))]
+        images[0].save(path_animation, save_all=True, append_images=images[1:], duration=1000 / fps, loop=0)
+    else:
+        import subprocess
+        path_animation = generate_absolute_path(file_name="network_by_demand_od.mp4", folder_name=folder_name)
+        width, height = fig.canvas.get_width_height()
+        command = [animation.FFMpegWriter.bin_path(), '-y', '-loglevel', 'error', '-f', 'rawvideo',
+                   '-pix_fmt', 'rgba', '-s', f'{width}x{height}', '-r', str(fps), '-i', 'pipe:',
+                   '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-vcodec', 'libx264', '-pix_fmt', 'yuv420p', path_animation]
+        with subprocess.Popen(command, stdin=subprocess.PIPE) as process:
+            for frame in range(len(frames)):
+                process.stdin.write(render_frame(frame).tobytes())
+            process.stdin.close()
+        if process.returncode:
+            raise Exception(f"ffmpeg failed to write {path_animation}")
+    stats.lap('frame_encoding', len(frames))
+    plt.close(fig)
+    print(f"The animation of {len(frames)} frames has been saved to the designated location: "
+          f"{path_animation if file_format != 'png' else folder_name}")
+
+    stats.finish(mnet)
+    return path_animation
+
+
+@cache_figure
+def show_network_by_connected_components(mnet: MultiNet,
+                                         mode: str = 'all',
+                                         connection: str = 'weak',
+                                         number_of_components: int = 10,
+                                         fig_obj: plt = None,
+                                         isSave2png: bool = True,
+                                         output_dir: str = None) -> plt:
+    """draw network links of a mode colored by their connected component, to spot disconnected islands
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        mode (str): network mode, one of ['all', 'bike', 'walk', 'auto', 'railway']. Defaults to 'all'.
+        connection (str): 'weak' ignores link directions, 'strong' requires paths in both directions.
+            Defaults to 'weak'.
+        number_of_components (int): number of the largest components drawn in their own colors,
+            links of other components are drawn in gray. Defaults to 10.
+        fig_obj (plt): figure object (plt). If not None, will continue to draw elements on the existing figure object.
+        isSave2png (bool): if True, save the figure to a png file. Defaults to True.
+        output_dir (str): directory to save the figure. Defaults to None, which means the current working directory.
+
+    Returns:
+        plt: figure object with the drawn network
+    """
+
+    stats = start_stats('show_network_by_connected_components', mnet.isStats)
+
+    if output_dir is None:
+        output_dir = Path.cwd()
+    if not Path(output_dir).exists():
+        output_dir = Path.cwd()
+
+    number = extract_coordinates_by_connected_components(mnet, mode, connection)
+    print(f"{number} {connection}ly connected component(s) found in the {mode} network")
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
+
+    if fig_obj:
+        # get ax from fog_obj and add more data later
+        ax = fig_obj.gca()
+        fig = fig_obj
+    else:
+        # create an empty fig and ax and add data later
+        fig, ax = plt.subplots(figsize=mnet.style.figure_size, dpi=mnet.style.dpi)
+
+    # draw network nodes
+    if mnet.node_loaded:
+        draw_node_layer(fig, ax, mnet)
+
+    # draw network links, the largest components in colors of the colormap and others in gray
+    if mnet.link_loaded:
+        labels = np.array(mnet.link.attr_distribution)
+        number_of_colors = min(number_of_components, number)
+        component_colors = plt.get_cmap(mnet.style.cmap)(np.linspace(0, 1, max(number_of_colors, 1)))
+        colors = np.tile(to_rgba_array('lightgray'), (len(labels), 1))
+        isColored = (labels >= 0) & (labels < number_of_colors)
+        colors[isColored] = component_colors[labels[isColored]]
+        ax.add_collection(
+            LineCollection(mnet.link.link_coords,
+                           colors=colors,
+                           linewidths=mnet.style.link_style.linewidth,
+                           zorder=1))
+
+        # add legend
+        link_counts = np.bincount(labels[isColored], minlength=number_of_colors)
+        proxies = [Line2D([0, 1], [0, 1], color=component_colors[i]) for i in range(number_of_colors)]
+        names = [f'component {i + 1}: {link_counts[i]} links' for i in range(number_of_colors)]
+        if (~isColored).any():
+            proxies.append(Line2D([0, 1], [0, 1], color='lightgray'))
+            names.append(f'other components: {(~isColored).sum()} links')
+        ax.legend(proxies, names, loc='upper right')
+
+    # draw network pois
+    if mnet.POI_loaded:
+        draw_poi_layer(fig, ax, mnet)
+
+    ax.autoscale_view()
+    plt.xlabel('x_coord')
+    plt.ylabel('y_coord')
+    plt.tight_layout()
+
+    stats.lap('artist_construction')
+
+    if isSave2png:
+        path_figure = generate_absolute_path(file_name="network_by_connected_components.png",
+                                             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
+        save_figure(path_figure, stats)
+        print(f"The image has been saved to the designated location: {path_figure}")
+
+    stats.finish(mnet)
+    return plt
+
+
+@cache_figure
+def show_network_by_travel_time(mnet: MultiNet,
+                                origins,
+                                mode: str = 'all',
+                                max_time: float = None,
+                                fig_obj: plt = None,
+                                isSave2png: bool = True,
+                                output_dir: str = None) -> plt:
+    """draw network links colored by free-flow travel time from the origin(s), e.g. an isochrone map
+
+    Travel time in minutes is computed from link length in meters and free_speed in km/h, and is
+    the time from the nearest origin to the start of each link.
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        origins: node_id or list of node_id of the origins
+        mode (str): network mode, one of ['all', 'bike', 'walk', 'auto', 'railway']. Defaults to 'all'.
+        max_time (float): links reached later than max_time minutes are drawn in gray.
+            Defaults to None, which means all reachable links are colored.
+        fig_obj (plt): figure object (plt). If not None, will continue to draw elements on the existing figure object.
+        isSave2png (bool): if True, save the figure to a png file. Defaults to True.
+        output_dir (str): directory to save the figure. Defaults to None, which means the current working directory.
+
+    Returns:
+        plt: figure object with the drawn network
+    """
+
+    stats = start_stats('show_network_by_travel_time', mnet.isStats)
+
+    if output_dir is None:
+        output_dir = Path.cwd()
+    if not Path(output_dir).exists():
+        output_dir = Path.cwd()
+
+    extract_coordinates_by_travel_time(mnet, origins, mode, max_time)
+    stats.lap('coordinate_extraction', get_selected_feature_count(mnet))
+
+    if is_figure_cache_hit():
+        return show_cached_figure(mnet, output_dir, stats)
+
+    if fig_obj:
+        # get ax from fog_obj and add more data later
+        ax = fig_obj.gca()
+        fig = fig_obj
+    else:
+        # create an empty fig and ax and add data later
+        fig, ax = plt.subplots(figsize=mnet.style.figure_size, dpi=mnet.style.dpi)
+
+    # draw network nodes
+    if mnet.node_loaded:
+        draw_node_layer(fig, ax, mnet)
+
+    # draw network links, reached links by travel time and others in gray
+    if mnet.link_loaded:
+        times = np.array(mnet.link.attr_distribution)
+        isReached = np.isfinite(times)
+        link_coords = mnet.link.link_coords
+        ax.add_collection(
+            LineCollection([link_coords[i] for i in np.flatnonzero(~isReached)],
+                           colors='lightgray',
+                           linewidths=mnet.style.link_style.linewidth,
+                           zorder=1))
+        max_v = max_time if max_time is not None else (times[isReached].max() if isReached.any() else 1)
+        line_coll = LineCollection([link_coords[i] for i in np.flatnonzero(isReached)],
+                                   array=times[isReached],
+                                   cmap=mnet.style.cmap,
+                                   norm=Normalize(0, max_v),
+                                   linewidths=mnet.style.link_style.linewidth,
+                                   zorder=1)
+        ax.add_collection(line_coll)
+        fig.colorbar(line_coll, ax=ax, label='travel time (min)')
+
+    # draw the origins
+    if mnet.node_loaded:
+        origin_nodes = mnet.node.value[mnet.node.value['node_id'].isin(np.atleast_1d(origins))]
+        ax.scatter(origin_nodes['x_coord'], origin_nodes['y_coord'], marker='*', c='red',
+                   s=mnet.style.node_style.size * 10, zorder=3)
+
+    # draw network pois
+    if mnet.POI_loaded:
+        draw_poi_layer(fig, ax, mnet)
+
+    ax.autoscale_view()
+    plt.xlabel('x_coord')
+    plt.ylabel('y_coord')
+    plt.tight_layout()
+
+    stats.lap('artist_construction')
+
+    if isSave2png:
+        path_figure = generate_absolute_path(file_name="network_by_travel_time.png",
+                                             folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
+        save_figure(path_figure, stats)
+        print(f"The image has been saved to the designated location: {path_figure}")
+
+    stats.finish(mnet)
+    return plt
+
+
+def create_scenario_panels(sset: ScenarioSet, number_of_panels: int, ncols: int) -> tuple:
+    # a grid of panels with shared axes, unused panels are hidden
+    style = sset.base.style
+    ncols = max(1, min(ncols, number_of_panels))
+    nrows = math.ceil(number_of_panels / ncols)
+    fig, axes = plt.subplots(nrows, ncols, squeeze=False, sharex=True, sharey=True, dpi=style.dpi,
+                             figsize=(style.figure_size[0] * ncols / 2, style.figure_size[1] * nrows / 2))
+    for ax in axes.ravel()[number_of_panels:]:
+        ax.set_visible(False)
+    return fig, axes.ravel()[:number_of_panels]
+
+
+def show_scenarios_side_by_side(sset: ScenarioSet,
+                                scenarios: list = None,
+                                column: str = None,
+                                ncols: int = 3,
+                                isSave2png: bool = True,
+                                output_dir: str = None) -> plt:
+    """draw the base network and its scenarios side by side, in panels with shared axes
+
+    Coordinates of the base links are extracted once and shared by all panels, only the
+    geometries of added links are read from the scenarios.
+
+    Args:
+        sset (ScenarioSet): base network and scenarios
+        scenarios (list): names of the scenarios to display. Defaults to None, which means all scenarios.
+        column (str): numeric link column to color the links by, e.g. 'lanes', with the same color scale
+            in all panels. Defaults to None, which means the link color of the style.
+        ncols (int): number of panels in a row. Defaults to 3.
+        isSave2png (bool): if True, save the figure to a png file. Defaults to True.
+        output_dir (str): directory to save the figure. Defaults to None, which means the current working directory.
+
+    Returns:
+        plt: figure object with the drawn networks
+    """
+
+    mnet = sset.base
+    stats = start_stats('show_scenarios_side_by_side', mnet.isStats)
+
+    if output_dir is None:
+        output_dir = Path.cwd()
+    if not Path(output_dir).exists():
+        output_dir = Path.cwd()
+
+    names = sset.names if scenarios is None else list(scenarios)
+    base_coords = mnet.link.get_link_coords(mnet.link.value)
+    panels = [('base', base_coords,
+               None if column is None else pd.to_numeric(mnet.link.value[column], errors='coerce').to_numpy(float))]
+    for name in names:
+        diff = sset.get_link_diff(name, column)
+        diff = diff[diff['status'] != 'removed']
+        panels.append((name, sset.get_link_coords(name, diff, base_coords),
+                       None if column is None else diff['value'].to_numpy()))
+    stats.lap('coordinate_extraction', sum(len(panel[1]) for panel in panels))
+
+    fig, axes = create_scenario_panels(sset, len(panels), ncols)
+    norm = None
+    if column is not None:
+        values = np.concatenate([panel[2] for panel in panels])
+        norm = plt.Normalize(np.nanmin(values), np.nanmax(values))
+
+    for ax, (name, coords, values) in zip(axes, panels):
+        if column is None:
+            ax.add_collection(LineCollection(coords, colors=mnet.style.link_style.linecolor,
+                                             linewidths=mnet.style.link_style.linewidth, zorder=1))
+        else:
+            ax.add_collection(LineCollection(coords, array=values, cmap=mnet.style.cmap, norm=norm,
+                                             linewidths=mnet.style.link_style.linewidth, zorder=1))
+        if name == 'base':
+            ax.set_title('base')
+        else:
+            scenario = sset[name]
+            ax.set_title(f"{name}: +{scenario.number_of_added} -{len(scenario.removed_links)} "
+                         f"~{scenario.number_of_changed}")
+        ax.autoscale_view()
+        ax.set_xlabel('x_coord')
+        ax.set_ylabel('y_coord')
+    plt.tight_layout()
+    if column is not None:
+        fig.colorbar(ScalarMappable(norm=norm, cmap=mnet.style.cmap), ax=list(axes), label=column)
+
+    stats.lap('artist_construction')
+
+    if isSave2png:
+        path_figure = generate_absolute_path(
+            file_name="scenarios_side_by_side.png",
+            folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
+        save_figure(path_figure, stats)
+        print(f"The image has been saved to the designated location: {path_figure}")
+
+    stats.finish(mnet)
+    return plt
+
+
+def show_scenario_differences(sset: ScenarioSet,
+                              scenarios: list = None,
+                              column: str = 'lanes',
+                              ncols: int = 3,
+                              isSave2png: bool = True,
+                              output_dir: str = None) -> plt:
+    """draw the difference of each scenario against the base network, one panel per scenario
+
+    Unchanged links are drawn in grey, removed links in dashed red and added links in green.
+    Changed links are colored by the delta of the column, with the same color scale in all
+    panels, and links changed in other columns only are drawn in orange.
+
+    Args:
+        sset (ScenarioSet): base network and scenarios
+        scenarios (list): names of the scenarios to display. Defaults to None, which means all scenarios.
+        column (str): numeric link column of the delta, e.g. 'lanes' or 'free_speed'. Defaults to 'lanes'.
+        ncols (int): number of panels in a row. Defaults to 3.
+        isSave2png (bool): if True, save the figure to a png file. Defaults to True.
+        output_dir (str): directory to save the figure. Defaults to None, which means the current working directory.
+
+    Returns:
+        plt: figure object with the drawn differences
+    """
+
+    mnet = sset.base
+    stats = start_stats('show_scenario_differences', mnet.isStats)
+
+    if output_dir is None:
+        output_dir = Path.cwd()
+    if not Path(output_dir).exists():
+        output_dir = Path.cwd()
+
+    names = sset.names if scenarios is None else list(scenarios)
+    if not names:
+        raise Exception("ValueError: no scenario to display!")
+    base_coords = mnet.link.get_link_coords(mnet.link.value)
+    diffs = {name: sset.get_link_diff(name, column) for name in names}
+    stats.lap('coordinate_extraction', sum(len(diff) for diff in diffs.values()))
+
+    fig, axes = create_scenario_panels(sset, len(names), ncols)
+    deltas = np.concatenate([diff['delta'].to_numpy()[diff['status'].to_numpy() == 'changed'] for diff in diffs.values()])
+    deltas = deltas[np.isfinite(deltas) & (deltas != 0)]
+    delta_max = np.abs(deltas).max() if len(deltas) else 1
+    norm = plt.Normalize(-delta_max, delta_max)
+    linewidth = mnet.style.link_style.linewidth
+
+    for ax, name in zip(axes, names):
+        diff = diffs[name]
+        coords = sset.get_link_coords(name, diff, base_coords)
+        status = diff['status'].to_numpy()
+        delta = diff['delta'].to_numpy()
+        isDelta = (status == 'changed') & np.isfinite(delta) & (delta != 0)
+        groups = [(status == 'unchanged', {'colors': 'lightgrey', 'linewidths': linewidth * 0.6, 'zorder': 1}),
+                  (status == 'removed', {'colors': 'red', 'linestyles': '--', 'linewidths': linewidth * 1.5,
+                                         'zorder': 2}),
+                  (status == 'added', {'colors': 'green', 'linewidths': linewidth * 1.5, 'zorder': 3}),
+                  ((status == 'changed') & ~isDelta, {'colors': 'orange', 'linewidths': linewidth * 1.5,
+                                                      'zorder': 3}),
+                  (isDelta, {'array': delta[isDelta], 'cmap': 'coolwarm', 'norm': norm,
+                             'linewidths': linewidth * 2, 'zorder': 4})]
+        for isSelected, kwargs in groups:
+            if isSelected.any():
+                ax.add_collection(LineCollection([coords[i] for i in np.flatnonzero(isSelected)], **kwargs))
+        scenario = sset[name]
+        ax.set_title(f"{name}: +{scenario.number_of_added} -{len(scenario.removed_links)} "
+                     f"~{scenario.number_of_changed}")
+        ax.autoscale_view()
+        ax.set_xlabel('x_coord')
+        ax.set_ylabel('y_coord')
+
+    # add legend
+    proxies = [Line2D([0, 1], [0, 1], color='red', linestyle='--', linewidth=1.5),
+               Line2D([0, 1], [0, 1], color='green', linewidth=1.5),
+               Line2D([0, 1], [0, 1], color='orange', linewidth=1.5)]
+    axes[0].legend(proxies, ['removed', 'added', f'changed, same {column}'], loc='upper right')
+    plt.tight_layout()
+    fig.colorbar(ScalarMappable(norm=norm, cmap='coolwarm'), ax=list(axes), label=f'{column} delta')
+
+    stats.lap('artist_construction')
+
+    if isSave2png:
+        path_figure = generate_absolute_path(
+            file_name="scenario_differences.png",
+            folder_name=path2linux(os.path.join(output_dir, "p4g_fig_results")))
+        save_figure(path_figure, stats)
         print(f"The image has been saved to the designated location: {path_figure}")
 
+    stats.finish(mnet)
     return plt
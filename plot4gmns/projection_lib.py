@@ -0,0 +1,229 @@
+# -*- coding:utf-8 -*-
+##############################################################
+# Created Date: Monday, October 19th 2026
+# Contact Info: luoxiangyong01@gmail.com
+# Author/Copyright: Mr. Xiangyong Luo
+##############################################################
+
+import os
+import re
+import numpy as np
+from .geometry_lib import GeometryBuffer, buffer_arrays
+
+# projections computed with numpy, other coordinate reference systems require pyproj
+projections = ['web_mercator', 'utm', 'equirectangular']
+
+# WGS84 ellipsoid
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+
+# latitude limit of Web Mercator
+WEB_MERCATOR_MAX_LAT = 85.0511287798066
+
+# coefficients of the Krueger series of transverse Mercator, accurate to 1 mm within a UTM zone
+_n = WGS84_F / (2 - WGS84_F)
+_utm_a = WGS84_A / (1 + _n) * (1 + _n ** 2 / 4 + _n ** 4 / 64)
+_utm_alpha = (_n / 2 - 2 * _n ** 2 / 3 + 5 * _n ** 3 / 16, 13 * _n ** 2 / 48 - 3 * _n ** 3 / 5, 61 * _n ** 3 / 240)
+_utm_beta = (_n / 2 - 2 * _n ** 2 / 3 + 37 * _n ** 3 / 96, _n ** 2 / 48 + _n ** 3 / 15, 17 * _n ** 3 / 480)
+_utm_delta = (2 * _n - 2 * _n ** 2 / 3 - 2 * _n ** 3, 7 * _n ** 2 / 3 - 8 * _n ** 3 / 5, 56 * _n ** 3 / 15)
+_utm_e = 2 * np.sqrt(_n) / (1 + _n)
+UTM_K0 = 0.9996
+
+
+def resolve_crs(crs: str, coords: np.ndarray) -> str:
+    """coordinate reference system of a projection name for the extent of lon/lat coordinates
+
+    Args:
+        crs (str): 'web_mercator', 'utm' (zone of the mean coordinate), 'equirectangular' (centered at
+            the mean coordinate) or a crs string, e.g. 'EPSG:3857'. Resolved crs strings are returned as is.
+        coords (np.ndarray): (n, 2) longitude and latitude
+
+    Returns:
+        str: crs string, e.g. 'EPSG:32633'
+    """
+    if crs not in projections:
+        return crs
+    coords = np.asarray(coords, dtype=float)
+    isValid = np.isfinite(coords).all(axis=1)
+    if not isValid.any():
+        raise Exception("ValueError: no valid coordinates to resolve the projection")
+    if (np.abs(coords[isValid, 0]) > 180).any() or (np.abs(coords[isValid, 1]) > 90).any():
+        raise Exception("ValueError: coordinates should be longitude and latitude to be projected")
+    lon, lat = coords[isValid].mean(axis=0)
+    if crs == 'web_mercator':
+        return 'EPSG:3857'
+    if crs == 'utm':
+        zone = int(np.clip(np.floor((lon + 180) / 6) + 1, 1, 60))
+        return f"EPSG:{32600 + zone if lat >= 0 else 32700 + zone}"
+    return f"+proj=eqc +lat_ts={lat:.4f} +lon_0={lon:.4f} +datum=WGS84 +units=m +no_defs"
+
+
+def get_projection(crs: str) -> tuple:
+    """forward and inverse transform functions of a crs, both map (n, 2) arrays to (n, 2) arrays
+
+    Web Mercator, UTM zones of WGS84 and equirectangular projections are computed with numpy,
+    other crs strings are transformed by pyproj.
+
+    Args:
+        crs (str): crs string, see resolve_crs
+
+    Returns:
+        tuple: (forward, inverse)
+    """
+    if crs == 'EPSG:3857':
+        return web_mercator_forward, web_mercator_inverse
+
+    utm = re.fullmatch(r'EPSG:32([67])(\d{2})', crs)
+    if utm and 1 <= int(utm.group(2)) <= 60:
+        lon_0 = int(utm.group(2)) * 6 - 183
+        y_0 = 0 if utm.group(1) == '6' else 10000000
+        return (lambda coords: utm_forward(coords, lon_0, y_0),
+                lambda coords: utm_inverse(coords, lon_0, y_0))
+
+    eqc = re.fullmatch(r'\+proj=eqc \+lat_ts=(\S+) \+lon_0=(\S+) \+datum=WGS84 \+units=m \+no_defs', crs)
+    if eqc:
+        lat_ts, lon_0 = float(eqc.group(1)), float(eqc.group(2))
+        return (lambda coords: equirectangular_forward(coords, lat_ts, lon_0),
+                lambda coords: equirectangular_inverse(coords, lat_ts, lon_0))
+
+    try:
+        from pyproj import Transformer
+    except ImportError:
+        raise Exception(f"ImportError: pyproj is required to project coordinates to {crs}, "
+                        f"please install it by: pip install pyproj") from None
+    forward = Transformer.from_crs('EPSG:4326', crs, always_xy=True)
+    inverse = Transformer.from_crs(crs, 'EPSG:4326', always_xy=True)
+    return (lambda coords: np.column_stack(forward.transform(coords[:, 0], coords[:, 1])),
+            lambda coords: np.column_stack(inverse.transform(coords[:, 0], coords[:, 1])))
+
+
+def web_mercator_forward(coords: np.ndarray) -> np.ndarray:
+    lon = np.radians(coords[:, 0])
+    lat = np.radians(np.clip(coords[:, 1], -WEB_MERCATOR_MAX_LAT, WEB_MERCATOR_MAX_LAT))
+    return np.column_stack([WGS84_A * lon, WGS84_A * np.log(np.tan(np.pi / 4 + lat / 2))])
+
+
+def web_mercator_inverse(coords: np.ndarray) -> np.ndarray:
+    lon = coords[:, 0] / WGS84_A
+    lat = 2 * np.arctan(np.exp(coords[:, 1] / WGS84_A)) - np.pi / 2
+    return np.degrees(np.column_stack([lon, lat]))
+
+
+def equirectangular_forward(coords: np.ndarray, lat_ts: float, lon_0: float) -> np.ndarray:
+    return np.column_stack([WGS84_A * np.radians(coords[:, 0] - lon_0) * np.cos(np.radians(lat_ts)),
+                            WGS84_A * np.radians(coords[:, 1])])
+
+
+def equirectangular_inverse(coords: np.ndarray, lat_ts: float, lon_0: float) -> np.ndarray:
+    return np.column_stack([np.degrees(coords[:, 0] / (WGS84_A * np.cos(np.radians(lat_ts)))) + lon_0,
+                            np.degrees(coords[:, 1] / WGS84_A)])
+
+
+def utm_forward(coords: np.ndarray, lon_0: float, y_0: float) -> np.ndarray:
+    # transverse Mercator by the Krueger series, see Karney (2011)
+    lon = np.radians(coords[:, 0] - lon_0)
+    sin_lat = np.sin(np.radians(coords[:, 1]))
+    t = np.sinh(np.arctanh(sin_lat) - _utm_e * np.arctanh(_utm_e * sin_lat))
+    xi = np.arctan2(t, np.cos(lon))
+    eta = np.arctanh(np.sin(lon) / np.sqrt(1 + t * t))
+    x, y = eta.copy(), xi.copy()
+    for j, alpha in enumerate(_utm_alpha, start=1):
+        x += alpha * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+        y += alpha * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+    return np.column_stack([500000 + UTM_K0 * _utm_a * x, y_0 + UTM_K0 * _utm_a * y])
+
+
+def utm_inverse(coords: np.ndarray, lon_0: float, y_0: float) -> np.ndarray:
+    xi = (coords[:, 1] - y_0) / (UTM_K0 * _utm_a)
+    eta = (coords[:, 0] - 500000) / (UTM_K0 * _utm_a)
+    xi_, eta_ = xi.copy(), eta.copy()
+    for j, beta in enumerate(_utm_beta, start=1):
+        xi_ -= beta * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+        eta_ -= beta * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+    chi = np.arcsin(np.sin(xi_) / np.cosh(eta_))
+    lat = chi.copy()
+    for j, delta in enumerate(_utm_delta, start=1):
+        lat += delta * np.sin(2 * j * chi)
+    lon = np.arctan2(np.sinh(eta_), np.cos(xi_))
+    return np.column_stack([np.degrees(lon) + lon_0, np.degrees(lat)])
+
+
+def project_coords(coords: np.ndarray, crs: str, isInverse: bool = False,
+                   out: np.ndarray = None, chunk_size: int = 1000000) -> np.ndarray:
+    """project (n, 2) lon/lat coordinates to a crs, or back to lon/lat if isInverse is True
+
+    Args:
+        coords (np.ndarray): (n, 2) coordinates, can be memory-mapped
+        crs (str): crs string, see resolve_crs
+        isInverse (bool): if True, coordinates of the crs are transformed to lon/lat. Defaults to False.
+        out (np.ndarray): (n, 2) output array, can be coords itself. Defaults to None, which means a new array.
+        chunk_size (int): number of coordinates transformed at a time. Defaults to 1000000.
+
+    Returns:
+        np.ndarray: projected coordinates
+    """
+    transform = get_projection(crs)[1 if isInverse else 0]
+    if out is None:
+        out = np.empty((len(coords), 2), dtype=np.float64)
+    for start in range(0, len(coords), chunk_size):
+        out[start:start + chunk_size] = transform(np.asarray(coords[start:start + chunk_size], dtype=np.float64))
+    return out
+
+
+def project_geometry_buffer(buffer: GeometryBuffer, crs: str, isKeepSource: bool = False) -> GeometryBuffer:
+    """project the vertices of a GeometryBuffer in place, other arrays of the buffer are not touched
+
+    Memory-mapped coordinates are projected chunk by chunk into their file, or into a new file if the
+    source coordinates are kept.
+
+    Args:
+        buffer (GeometryBuffer): geometries of lon/lat coordinates
+        crs (str): crs string, see resolve_crs
+        isKeepSource (bool): if True, return a buffer of the source coordinates. Defaults to False.
+
+    Returns:
+        GeometryBuffer: buffer of the source coordinates sharing the other arrays, None if not kept
+    """
+    source = None
+    if buffer.path_prefix is None:
+        if isKeepSource:
+            source = GeometryBuffer(buffer.coords, buffer.part_offsets, buffer.geom_offsets,
+                                    buffer.part_exterior, buffer.geom_types)
+        buffer.coords = project_coords(buffer.coords, crs)
+        return source
+
+    path_filename = f"{buffer.path_prefix}{buffer_arrays['coords'][0]}"
+    if not len(buffer.coords):
+        return GeometryBuffer(buffer.coords, buffer.part_offsets, buffer.geom_offsets,
+                              buffer.part_exterior, buffer.geom_types) if isKeepSource else None
+    buffer.coords = np.zeros((0, 2))  # release the read-only memory map before writing the file
+    if isKeepSource:
+        path_source = f"{buffer.path_prefix}source_{buffer_arrays['coords'][0]}"
+        os.replace(path_filename, path_source)
+        source_coords = np.memmap(path_source, dtype=np.float64, mode='r').reshape(-1, 2)
+        coords = np.memmap(path_filename, dtype=np.float64, mode='w+', shape=source_coords.shape)
+        project_coords(source_coords, crs, out=coords)
+        source = GeometryBuffer(source_coords, buffer.part_offsets, buffer.geom_offsets,
+                                buffer.part_exterior, buffer.geom_types)
+    else:
+        coords = np.memmap(path_filename, dtype=np.float64, mode='r+').reshape(-1, 2)
+        project_coords(coords, crs, out=coords)
+    coords.flush()
+    del coords
+    buffer._open_memmap()
+    return source
+
+
+def project_shapely(geometries: np.ndarray, crs: str, isInverse: bool = False) -> np.ndarray:
+    """project shapely geometries, e.g. of a network delta, None values are kept
+
+    Args:
+        geometries (np.ndarray): shapely geometries
+        crs (str): crs string, see resolve_crs
+        isInverse (bool): if True, geometries of the crs are transformed to lon/lat. Defaults to False.
+
+    Returns:
+        np.ndarray: projected shapely geometries
+    """
+    import shapely
+    return shapely.transform(geometries, lambda coords: project_coords(coords, crs, isInverse))
@@ -0,0 +1,311 @@
+# -*- coding:utf-8 -*-
+##############################################################
+# Created Date: Monday, October 19th 2026
+# Contact Info: luoxiangyong01@gmail.com
+# Author/Copyright: Mr. Xiangyong Luo
+##############################################################
+
+import numpy as np
+import pandas as pd
+from .network import MultiNet, Link
+from .geometry_lib import GeometryBuffer
+from .projection_lib import project_geometry_buffer
+from .utility_lib import network_modes, find_network_tables
+from .func_lib import read_network_table, build_link_geometry_buffer, get_node_coords
+
+# status of a link in a scenario compared with the base network
+link_status = ['unchanged', 'changed', 'added', 'removed']
+
+
+def _get_compared_columns(base_links: pd.DataFrame, links: pd.DataFrame) -> list:
+    # attribute columns of both tables, geometry and derived mode columns are compared separately
+    derived_columns = ['geometry', 'geometry_id', 'link_id'] + [mode for mode in network_modes if mode != 'all']
+    return [column for column in links.columns if column in base_links.columns and column not in derived_columns]
+
+
+def diff_link_tables(base_links: pd.DataFrame, links: pd.DataFrame, isComplete: bool = True) -> tuple:
+    """compare links with the base links by link_id, vectorized over all links and columns
+
+    Links whose geometry differs from the base are returned as removed and added, geometries
+    are only compared if both tables have a geometry column.
+
+    Args:
+        base_links (pd.DataFrame): link table of the base network
+        links (pd.DataFrame): link table of a scenario, or only the rows to be modified
+        isComplete (bool): if True, base links not in links are removed. Defaults to True.
+
+    Returns:
+        tuple: (added links, removed link_id, modified links with link_id and the changed columns)
+    """
+
+    base_ids = pd.Index(base_links['link_id'])
+    isCommon = links['link_id'].isin(base_ids).to_numpy()
+    added = links[~isCommon]
+    removed = base_ids.difference(pd.Index(links['link_id'])).to_numpy() if isComplete else np.array([], dtype=int)
+
+    common = links[isCommon]
+    positions = base_ids.get_indexer(common['link_id'])
+    if 'geometry' in common.columns and 'geometry' in base_links.columns:
+        base_geometry = base_links['geometry'].to_numpy()[positions]
+        isMoved = ~_is_equal(base_geometry, common['geometry'].to_numpy())
+        if isMoved.any():
+            added = pd.concat([added, common[isMoved]])
+            removed = np.concatenate([removed, common['link_id'].to_numpy()[isMoved]])
+            common, positions = common[~isMoved], positions[~isMoved]
+
+    isChanged = np.zeros(len(common), dtype=bool)
+    changed_columns = []
+    for column in _get_compared_columns(base_links, common):
+        isColumnChanged = ~_is_equal(base_links[column].to_numpy()[positions], common[column].to_numpy())
+        if isColumnChanged.any():
+            changed_columns.append(column)
+            isChanged |= isColumnChanged
+    modified = common.loc[isChanged, ['link_id'] + changed_columns]
+    return added, removed, modified
+
+
+def _is_equal(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # elementwise equality of two columns, missing values are equal to each other
+    return (pd.Series(a, dtype=object) == pd.Series(b, dtype=object)).to_numpy() | (pd.isna(a) & pd.isna(b))
+
+
+class Scenario:
+    def __init__(self, name: str):
+        self.name = name
+        self.added_links = None  # dataframe, geometry_id points to self.geometry
+        self.removed_links = np.array([], dtype=int)  # link_id of removed links
+        self.modified_links = None  # dataframe of link_id and the changed columns
+        self.geometry = GeometryBuffer.empty()  # geometries of added links only
+
+    def __repr__(self) -> str:
+        return (f"Scenario({self.name!r}, added={self.number_of_added}, removed={len(self.removed_links)}, "
+                f"changed={self.number_of_changed})")
+
+    @property
+    def number_of_added(self) -> int:
+        return 0 if self.added_links is None else len(self.added_links)
+
+    @property
+    def number_of_changed(self) -> int:
+        return 0 if self.modified_links is None else len(self.modified_links)
+
+
+class ScenarioSet:
+    """a base network and scenario variants stored as link diffs against it
+
+    The base network is loaded once, and each scenario keeps only its added links with their
+    geometries, the link_id of removed links and the changed columns of modified links, so
+    scenarios share the geometry and attributes of unchanged links.
+    """
+
+    def __init__(self, base: MultiNet):
+        if not base.link_loaded:
+            raise Exception("link layer of the base network is not loaded!")
+        self.base = base
+        self.scenarios = {}  # {name: Scenario}, in the order of adding
+
+    def __len__(self) -> int:
+        return len(self.scenarios)
+
+    def __getitem__(self, name: str) -> Scenario:
+        return self.scenarios[name]
+
+    @property
+    def names(self) -> list:
+        return list(self.scenarios)
+
+    def add_scenario(self,
+                     name: str,
+                     added_links: pd.DataFrame = None,
+                     removed_links: list = None,
+                     modified_links: pd.DataFrame = None) -> Scenario:
+        """add a scenario from a link delta, in the same form as apply_network_delta
+
+        Args:
+            name (str): name of the scenario
+            added_links (pd.DataFrame): new link rows in GMNS format, links without geometry
+                are drawn as straight lines between their nodes. Defaults to None.
+            removed_links (list): link_id of links removed in the scenario. Defaults to None.
+            modified_links (pd.DataFrame): link_id and the changed columns. Defaults to None.
+
+        Returns:
+            Scenario: the added scenario
+        """
+
+        base_links = self.base.link.value
+        scenario = Scenario(name)
+        if removed_links is not None and len(removed_links):
+            scenario.removed_links = np.asarray(removed_links)
+            isFound = np.isin(scenario.removed_links, base_links['link_id'].to_numpy())
+            if not isFound.all():
+                print(f"Warning: {(~isFound).sum()} link_id(s) to be removed not found in the base network")
+        if modified_links is not None and len(modified_links):
+            isFound = modified_links['link_id'].isin(base_links['link_id']).to_numpy()
+            if not isFound.all():
+                raise Exception(f"ValueError: link_id {modified_links['link_id'][~isFound].tolist()} not found")
+            # values equal to the base are not changes
+            _, _, scenario.modified_links = diff_link_tables(base_links, modified_links, isComplete=False)
+        if added_links is not None and len(added_links):
+            duplicated = added_links['link_id'][added_links['link_id'].isin(base_links['link_id'])]
+            if len(duplicated):
+                raise Exception(f"ValueError: link_id {duplicated.tolist()} already exist")
+            scenario.added_links, scenario.geometry = self._parse_added_links(added_links)
+        self.scenarios[name] = scenario
+        return scenario
+
+    def add_scenario_from_dir(self, name: str, input_dir: str, file_format: str = 'auto') -> Scenario:
+        """add a scenario by comparing its link table with the base network
+
+        Only the columns of the base link table are read. Geometries are parsed only for the
+        links added or moved in the scenario.
+
+        Args:
+            name (str): name of the scenario
+            input_dir (str): folder or archive of the scenario tables, only the link table is read
+            file_format (str): 'csv', 'parquet', 'feather' or 'auto'. Defaults to 'auto'.
+
+        Returns:
+            Scenario: the added scenario
+        """
+
+        table_files = find_network_tables(input_dir, file_format)
+        if 'link' not in table_files:
+            raise Exception(f"Input directory {input_dir} does not contain a link table!")
+        base_links = self.base.link.value
+        links = read_network_table(table_files['link'], list(base_links.columns) + ['geometry'])
+
+        scenario = Scenario(name)
+        added, scenario.removed_links, modified = diff_link_tables(base_links, links)
+        scenario.modified_links = modified if len(modified) else None
+        if len(added):
+            scenario.added_links, scenario.geometry = self._parse_added_links(added)
+        self.scenarios[name] = scenario
+        return scenario
+
+    def _parse_added_links(self, added_links: pd.DataFrame) -> tuple:
+        # geometry buffer of added links, links without WKT are built from the base nodes
+        added_links = added_links.reset_index(drop=True)
+        if 'geometry' not in added_links.columns:
+            added_links['geometry'] = None
+        wkt = added_links['geometry'].map(lambda x: x if isinstance(x, str) or pd.isna(x) else x.wkt)
+        isMissing = wkt.isna().to_numpy()
+        if isMissing.any() and self.base.node_loaded:
+            buffers = [GeometryBuffer.from_wkt(wkt[~isMissing]),
+                       build_link_geometry_buffer(added_links[isMissing], get_node_coords(self.base), 'nodes')]
+            positions = np.empty(len(added_links), dtype=np.int64)
+            positions[~isMissing] = np.arange((~isMissing).sum())
+            positions[isMissing] = (~isMissing).sum() + np.arange(isMissing.sum())
+            geometry = GeometryBuffer.concatenate(buffers).take(positions)
+        else:
+            geometry = GeometryBuffer.from_wkt(wkt)
+        if self.base.crs is not None:
+            # scenario tables are in source coordinates, as the base network was before projection
+            project_geometry_buffer(geometry, self.base.crs)
+        added_links = added_links.drop(columns=['geometry'])
+        added_links['geometry_id'] = np.arange(len(added_links))
+        if 'allowed_uses' in added_links.columns:
+            link_modes = Link.get_link_modes(added_links['allowed_uses'])
+            for mode in link_modes.columns:
+                added_links[mode] = link_modes[mode]
+        return added_links, geometry
+
+    def get_link_diff(self, name: str, column: str = None) -> pd.DataFrame:
+        """status of every link of the base and the scenario, and the delta of a column
+
+        Args:
+            name (str): name of the scenario
+            column (str): numeric link column to compare, e.g. 'lanes' or 'free_speed'. Defaults to None.
+
+        Returns:
+            pd.DataFrame: link_id, status ('unchanged', 'changed', 'added' or 'removed'), base_position
+                (row position in the base link table, -1 for added links) and geometry_id (in the
+                scenario geometry buffer, -1 for base links). With a column, also base_value, value and
+                delta, which are NaN for removed and added links respectively.
+        """
+
+        scenario = self.scenarios[name]
+        base_links = self.base.link.value
+        number_of_links = len(base_links)
+        status = np.full(number_of_links, 'unchanged', dtype=object)
+        isRemoved = base_links['link_id'].isin(scenario.removed_links).to_numpy()
+        status[isRemoved] = 'removed'
+        positions = np.array([], dtype=np.int64)
+        if scenario.modified_links is not None:
+            positions = pd.Index(base_links['link_id']).get_indexer(scenario.modified_links['link_id'])
+            status[positions] = 'changed'
+
+        diff = pd.DataFrame({'link_id': base_links['link_id'].to_numpy(),
+                             'status': status,
+                             'base_position': np.arange(number_of_links),
+                             'geometry_id': -1})
+        if column is not None:
+            base_values = pd.to_numeric(base_links[column], errors='coerce').to_numpy(dtype=float)
+            values = base_values.copy()
+            if scenario.modified_links is not None and column in scenario.modified_links.columns:
+                values[positions] = pd.to_numeric(scenario.modified_links[column], errors='coerce').to_numpy(float)
+            values[isRemoved] = np.nan
+            diff['base_value'], diff['value'] = base_values, values
+
+        if scenario.number_of_added:
+            added = pd.DataFrame({'link_id': scenario.added_links['link_id'].to_numpy(),
+                                  'status': 'added',
+                                  'base_position': -1,
+                                  'geometry_id': scenario.added_links['geometry_id'].to_numpy()})
+            if column is not None:
+                added['base_value'] = np.nan
+                added['value'] = (pd.to_numeric(scenario.added_links[column], errors='coerce').to_numpy(float)
+                                  if column in scenario.added_links.columns else np.nan)
+            diff = pd.concat([diff, added], ignore_index=True)
+        if column is not None:
+            diff['delta'] = diff['value'] - diff['base_value']
+        return diff
+
+    def get_link_coords(self, name: str, diff: pd.DataFrame, base_coords: list = None) -> list:
+        """vertex coordinates of the rows of a link diff
+
+        Args:
+            name (str): name of the scenario
+            diff (pd.DataFrame): rows of get_link_diff of the scenario
+            base_coords (list): coordinates of all base links, shared by scenarios. Defaults to None,
+                which means only the geometries of the given base links are read.
+
+        Returns:
+            list: coordinates of each row, in the order of diff
+        """
+
+        isBase = diff['base_position'].to_numpy() >= 0
+        base_positions = diff['base_position'].to_numpy()[isBase]
+        if base_coords is None:
+            geometry_ids = self.base.link.value['geometry_id'].to_numpy()[base_positions]
+            base_part = self.base.link.geometry.take_line_coords(geometry_ids)
+        else:
+            base_part = [base_coords[i] for i in base_positions]
+        added_part = self.scenarios[name].geometry.take_line_coords(diff['geometry_id'].to_numpy()[~isBase])
+        if isBase.all():
+            return base_part
+        coords = [None] * len(diff)
+        for i, c in zip(np.flatnonzero(isBase), base_part):
+            coords[i] = c
+        for i, c in zip(np.flatnonzero(~isBase), added_part):
+            coords[i] = c
+        return coords
+
+    def summary(self, columns: list = None) -> pd.DataFrame:
+        """number of added, removed and changed links of each scenario, and the total delta of columns
+
+        Args:
+            columns (list): numeric link columns to sum the deltas of, e.g. ['lanes']. Defaults to None.
+
+        Returns:
+            pd.DataFrame: one row per scenario
+        """
+
+        rows = []
+        for name, scenario in self.scenarios.items():
+            row = {'scenario': name, 'added': scenario.number_of_added, 'removed': len(scenario.removed_links),
+                   'changed': scenario.number_of_changed}
+            for column in columns or []:
+                diff = self.get_link_diff(name, column)
+                row[f'{column}_delta'] = diff['value'].sum() - diff['base_value'].sum()
+            rows.append(row)
+        return pd.DataFrame(rows)
@@ -0,0 +1,133 @@
+# -*- coding:utf-8 -*-
+##############################################################
+# Created Date: Monday, October 19th 2026
+# Contact Info: luoxiangyong01@gmail.com
+# Author/Copyright: Mr. Xiangyong Luo
+##############################################################
+
+import os
+import time
+import tracemalloc
+
+# environment variable to enable stats for all loader and show_* calls, e.g. P4G_STATS=1
+stats_env_var = 'P4G_STATS'
+
+# user callbacks, called with the PipelineStats object when a loader or show_* call finishes
+stats_callbacks = []
+
+
+def add_stats_callback(callback) -> None:
+    """register a function called with the PipelineStats of every finished loader or show_* call"""
+    if callback not in stats_callbacks:
+        stats_callbacks.append(callback)
+
+
+def remove_stats_callback(callback) -> None:
+    """unregister a function added by add_stats_callback"""
+    if callback in stats_callbacks:
+        stats_callbacks.remove(callback)
+
+
+def is_stats_enabled(isStats: bool = None) -> bool:
+    # the parameter has priority over the environment variable
+    if isStats is not None:
+        return isStats
+    return os.environ.get(stats_env_var, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class StageStats:
+    def __init__(self, name: str, wall_time: float, count: int = None, peak_memory: int = None):
+        self.name = name  # e.g. 'link.wkt_parsing'
+        self.wall_time = wall_time  # seconds
+        self.count = count  # number of features processed, None if not applicable
+        self.peak_memory = peak_memory  # peak traced memory during the stage, in bytes
+
+    def to_dict(self) -> dict:
+        return {'name': self.name, 'wall_time': self.wall_time, 'count': self.count, 'peak_memory': self.peak_memory}
+
+
+class PipelineStats:
+    """wall time, feature counts and peak memory of each stage of a loader or show_* call
+
+    Stages are recorded as laps: each lap covers the time since the previous lap.
+    Peak memory is measured with tracemalloc, which slows down the call while enabled.
+    """
+
+    isEnabled = True
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages = []
+        self.total_time = 0.0
+        self.peak_memory = 0
+        self._isTracing = not tracemalloc.is_tracing()
+        if self._isTracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._start_time = time.perf_counter()
+        self._lap_time = self._start_time
+
+    def lap(self, stage: str, count: int = None) -> None:
+        """record the stage finished since the previous lap"""
+        now = time.perf_counter()
+        peak_memory = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+        self.stages.append(StageStats(stage, now - self._lap_time, count, peak_memory))
+        self.peak_memory = max(self.peak_memory, peak_memory or 0)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._lap_time = time.perf_counter()
+
+    def finish(self, mnet=None):
+        """stop recording, attach the stats to the MultiNet and call the user callbacks"""
+        self.total_time = time.perf_counter() - self._start_time
+        if self._isTracing:
+            tracemalloc.stop()
+            self._isTracing = False
+        if mnet is not None:
+            mnet.stats.append(self)
+        for callback in stats_callbacks:
+            callback(self)
+        return self
+
+    def to_dict(self) -> dict:
+        return {'name': self.name,
+                'total_time': self.total_time,
+                'peak_memory': self.peak_memory,
+                'stages': [stage.to_dict() for stage in self.stages]}
+
+    def __repr__(self) -> str:
+        lines = [f"{self.name}: {self.total_time:.4f} s, peak memory {self.peak_memory / 1e6:.2f} MB"]
+        for stage in self.stages:
+            count = '' if stage.count is None else f", {stage.count} features"
+            lines.append(f"  {stage.name}: {stage.wall_time:.4f} s{count}")
+        return "\n".join(lines)
+
+
+class DisabledStats:
+    # do-nothing stats used when instrumentation is off
+    isEnabled = False
+
+    def lap(self, stage: str, count: int = None) -> None:
+        pass
+
+    def finish(self, mnet=None) -> None:
+        return None
+
+
+disabled_stats = DisabledStats()
+
+
+def start_stats(name: str, isStats: bool = None):
+    """start recording stats of a loader or show_* call
+
+    Args:
+        name (str): name of the call, e.g. 'show_network_by_modes'
+        isStats (bool): enable or disable stats. Defaults to None, which means the
+            environment variable P4G_STATS is used.
+
+    Returns:
+        PipelineStats or DisabledStats: stats object, laps cost nothing if disabled
+    """
+    if not is_stats_enabled(isStats):
+        return disabled_stats
+    return PipelineStats(name)
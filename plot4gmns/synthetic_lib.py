@@ -0,0 +1,255 @@
+# -*- coding:utf-8 -*-
+##############################################################
+# Created Date: Monday, October 19th 2026
+# Contact Info: luoxiangyong01@gmail.com
+# Author/Copyright: Mr. Xiangyong Luo
+##############################################################
+
+import os
+import numpy as np
+import pandas as pd
+from .utility_lib import path2linux
+
+# facility types of synthetic links: (facility_type, link_type, lanes, free_speed, capacity per lane, allowed_uses)
+synthetic_link_types = [
+    ('motorway', 1, 3, 100, 2000, 'auto'),
+    ('primary', 3, 2, 60, 1600, 'auto;bike'),
+    ('secondary', 4, 2, 50, 1400, 'auto;walk;bike'),
+    ('residential', 6, 1, 30, 800, 'auto;walk;bike'),
+    ('cycleway', 8, 1, 20, 600, 'bike'),
+    ('footway', 9, 1, 5, 400, 'walk')]
+synthetic_link_type_weights = [0.05, 0.15, 0.2, 0.4, 0.1, 0.1]
+
+synthetic_node_types = ['', 'traffic_signals', 'crossing', 'bus_stop', 'give_way']
+synthetic_node_type_weights = [0.8, 0.08, 0.07, 0.03, 0.02]
+
+synthetic_poi_types = [('building', 'apartments'), ('building', 'industrial'), ('building', 'public'),
+                       ('amenity', 'school'), ('amenity', 'hospital'), ('leisure', 'park')]
+
+
+def _format_coords(values: np.ndarray) -> np.ndarray:
+    # format coordinates with 7 decimals, the precision of OSM coordinates
+    return np.round(values, 7).astype(str)
+
+
+def _coords_wkt(x_coords: list, y_coords: list) -> np.ndarray:
+    # build 'x y, x y, ...' text from a list of vertex coordinate arrays
+    wkt = np.char.add(np.char.add(_format_coords(x_coords[0]), ' '), _format_coords(y_coords[0]))
+    for x, y in zip(x_coords[1:], y_coords[1:]):
+        wkt = np.char.add(np.char.add(np.char.add(wkt, ', '), _format_coords(x)), np.char.add(' ', _format_coords(y)))
+    return wkt
+
+
+def _linestring_wkt(x_coords: list, y_coords: list) -> np.ndarray:
+    return np.char.add(np.char.add('LINESTRING (', _coords_wkt(x_coords, y_coords)), ')')
+
+
+def _point_wkt(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return np.char.add(np.char.add('POINT (', _coords_wkt([x], [y])), ')')
+
+
+def _polygon_wkt(x_min: np.ndarray, y_min: np.ndarray, x_max: np.ndarray, y_max: np.ndarray) -> np.ndarray:
+    # build rectangular POLYGON WKT
+    ring = _coords_wkt([x_min, x_max, x_max, x_min, x_min], [y_min, y_min, y_max, y_max, y_min])
+    return np.char.add(np.char.add('POLYGON ((', ring), '))')
+
+
+def _haversine(x1: np.ndarray, y1: np.ndarray, x2: np.ndarray, y2: np.ndarray) -> np.ndarray:
+    # distance in meters between lon/lat coordinates
+    x1, y1, x2, y2 = map(np.radians, (x1, y1, x2, y2))
+    a = np.sin((y2 - y1) / 2) ** 2 + np.cos(y1) * np.cos(y2) * np.sin((x2 - x1) / 2) ** 2
+    return 2 * 6371008.8 * np.arcsin(np.sqrt(a))
+
+
+def generate_synthetic_network(output_dir: str,
+                               number_of_links: int = 10000,
+                               number_of_zones: int = 100,
+                               number_of_pois: int = None,
+                               number_of_od_pairs: int = None,
+                               seed: int = 0,
+                               origin: tuple = (13.2, 52.5),
+                               spacing: float = 0.001,
+                               chunk_size: int = 1000000) -> str:
+    """generate a grid network in GMNS format, including node, link, poi, zone and demand files
+
+    Nodes are placed on a square grid and connected by links in both directions. About a fifth
+    of the links have an intermediate vertex. Files are written chunk by chunk, so networks of
+    tens of millions of links can be generated with bounded memory.
+
+    Args:
+        output_dir (str): directory to save the csv files, created if not exist
+        number_of_links (int): number of links. Defaults to 10000.
+        number_of_zones (int): number of zones, zone ids are 1..N. Defaults to 100.
+        number_of_pois (int): number of POIs. Defaults to None, which means number_of_links // 10.
+        number_of_od_pairs (int): number of nonzero demand rows. Defaults to None,
+            which means min(number_of_zones ** 2, 100 * number_of_zones).
+        seed (int): random seed. Defaults to 0.
+        origin (tuple): (x_coord, y_coord) of the south west corner. Defaults to (13.2, 52.5).
+        spacing (float): distance between neighbouring nodes in degrees. Defaults to 0.001.
+        chunk_size (int): number of rows generated and written at a time. Defaults to 1000000.
+
+    Returns:
+        str: output directory
+    """
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    rng = np.random.default_rng(seed)
+
+    # each grid node has up to four outgoing links: east, west, north and south
+    grid_size = max(int(np.ceil(np.sqrt(number_of_links / 4))) + 1, 2)
+    number_of_links = min(number_of_links, 4 * grid_size * (grid_size - 1))
+    number_of_nodes = grid_size * grid_size
+    x_origin, y_origin = origin
+    x_max, y_max = x_origin + (grid_size - 1) * spacing, y_origin + (grid_size - 1) * spacing
+
+    # zones form a grid covering the network
+    zone_cols = int(np.ceil(np.sqrt(number_of_zones)))
+    zone_rows = int(np.ceil(number_of_zones / zone_cols))
+    zone_width = (x_max - x_origin) / zone_cols or spacing
+    zone_height = (y_max - y_origin) / zone_rows or spacing
+
+    def node_zone_id(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        col = np.clip(((x - x_origin) / zone_width).astype(np.int64), 0, zone_cols - 1)
+        row = np.clip(((y - y_origin) / zone_height).astype(np.int64), 0, zone_rows - 1)
+        return np.minimum(row * zone_cols + col + 1, number_of_zones)
+
+    # node.csv
+    path_node = path2linux(os.path.join(output_dir, 'node.csv'))
+    for start in range(0, number_of_nodes, chunk_size):
+        node_id = np.arange(start, min(start + chunk_size, number_of_nodes))
+        x_coord = x_origin + (node_id % grid_size) * spacing
+        y_coord = y_origin + (node_id // grid_size) * spacing
+        osm_highway = rng.choice(synthetic_node_types, size=len(node_id), p=synthetic_node_type_weights)
+        pd.DataFrame({'name': '',
+                      'node_id': node_id,
+                      'osm_node_id': node_id + 100000000,
+                      'osm_highway': osm_highway,
+                      'zone_id': node_zone_id(x_coord, y_coord),
+                      'ctrl_type': np.where(osm_highway == 'traffic_signals', 'signal', ''),
+                      'node_type': '',
+                      'activity_type': '',
+                      'is_boundary': 0,
+                      'x_coord': np.round(x_coord, 7),
+                      'y_coord': np.round(y_coord, 7)}).to_csv(path_node, mode='w' if start == 0 else 'a',
+                                                              header=start == 0, index=False)
+
+    # link.csv, links are enumerated by (grid segment, direction) and truncated to number_of_links
+    path_link = path2linux(os.path.join(output_dir, 'link.csv'))
+    horizontal_links = 2 * (grid_size - 1) * grid_size
+    for start in range(0, number_of_links, chunk_size):
+        link_id = np.arange(start, min(start + chunk_size, number_of_links))
+        isHorizontal = link_id < horizontal_links
+        segment = np.where(isHorizontal, link_id, link_id - horizontal_links) // 2
+        isForward = link_id % 2 == 0
+        # a horizontal segment joins (row, col) and (row, col + 1), a vertical one (row, col) and (row + 1, col)
+        seg_row = np.where(isHorizontal, segment // (grid_size - 1), segment // grid_size)
+        seg_col = np.where(isHorizontal, segment % (grid_size - 1), segment % grid_size)
+        node_a = seg_row * grid_size + seg_col
+        node_b = np.where(isHorizontal, node_a + 1, node_a + grid_size)
+        from_node_id = np.where(isForward, node_a, node_b)
+        to_node_id = np.where(isForward, node_b, node_a)
+
+        x1, y1 = x_origin + (from_node_id % grid_size) * spacing, y_origin + (from_node_id // grid_size) * spacing
+        x2, y2 = x_origin + (to_node_id % grid_size) * spacing, y_origin + (to_node_id // grid_size) * spacing
+        # a fifth of the links bend through an intermediate vertex
+        hasVertex = rng.random(len(link_id)) < 0.2
+        offset = rng.uniform(-0.2, 0.2, len(link_id)) * spacing
+        xm = (x1 + x2) / 2 + np.where(hasVertex & ~isHorizontal, offset, 0)
+        ym = (y1 + y2) / 2 + np.where(hasVertex & isHorizontal, offset, 0)
+        geometry = np.where(hasVertex,
+                            _linestring_wkt([x1, xm, x2], [y1, ym, y2]),
+                            _linestring_wkt([x1, x2], [y1, y2]))
+        length = np.where(hasVertex,
+                          _haversine(x1, y1, xm, ym) + _haversine(xm, ym, x2, y2),
+                          _haversine(x1, y1, x2, y2))
+
+        type_index = rng.choice(len(synthetic_link_types), size=len(link_id), p=synthetic_link_type_weights)
+        facility_type, link_type, lanes, free_speed, lane_capacity, allowed_uses = \
+            (np.array(column)[type_index] for column in zip(*synthetic_link_types))
+        pd.DataFrame({'name': '',
+                      'link_id': link_id,
+                      'osm_way_id': link_id // 2 + 200000000,
+                      'from_node_id': from_node_id,
+                      'to_node_id': to_node_id,
+                      'dir_flag': 1,
+                      'length': np.round(length, 2),
+                      'lanes': lanes,
+                      'free_speed': free_speed,
+                      'capacity': lanes * lane_capacity,
+                      'facility_type': facility_type,
+                      'link_type_name': facility_type,
+                      'link_type': link_type,
+                      'geometry': geometry,
+                      'allowed_uses': allowed_uses,
+                      'from_biway': 1,
+                      'is_link': 0}).to_csv(path_link, mode='w' if start == 0 else 'a',
+                                            header=start == 0, index=False)
+
+    # poi.csv, rectangular footprints at random locations
+    number_of_pois = number_of_links // 10 if number_of_pois is None else number_of_pois
+    path_poi = path2linux(os.path.join(output_dir, 'poi.csv'))
+    for start in range(0, max(number_of_pois, 1), chunk_size):
+        poi_id = np.arange(start, min(start + chunk_size, number_of_pois))
+        x_min = rng.uniform(x_origin, x_max, len(poi_id))
+        y_min = rng.uniform(y_origin, y_max, len(poi_id))
+        width = rng.uniform(0.05, 0.4, len(poi_id)) * spacing
+        height = rng.uniform(0.05, 0.4, len(poi_id)) * spacing
+        type_index = rng.integers(0, len(synthetic_poi_types), len(poi_id))
+        poi_column = np.array([t[0] for t in synthetic_poi_types])[type_index]
+        poi_value = np.array([t[1] for t in synthetic_poi_types])[type_index]
+        area = width * height * (111320 ** 2) * np.cos(np.radians(y_min))
+        pd.DataFrame({'name': '',
+                      'poi_id': poi_id,
+                      'osm_way_id': poi_id + 300000000,
+                      'osm_relation_id': '',
+                      'building': np.where(poi_column == 'building', poi_value, ''),
+                      'amenity': np.where(poi_column == 'amenity', poi_value, ''),
+                      'leisure': np.where(poi_column == 'leisure', poi_value, ''),
+                      'way': '',
+                      'geometry': _polygon_wkt(x_min, y_min, x_min + width, y_min + height),
+                      'centroid': _point_wkt(x_min + width / 2, y_min + height / 2),
+                      'area': np.round(area, 1),
+                      'area_ft2': np.round(area * 10.7639, 1),
+                      'activity_zone_id': node_zone_id(x_min, y_min),
+                      'production': np.round(rng.gamma(2.0, 50.0, len(poi_id)), 2),
+                      'attraction': np.round(rng.gamma(2.0, 50.0, len(poi_id)), 2)}).to_csv(
+            path_poi, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+    # zone.csv
+    zone_id = np.arange(1, number_of_zones + 1)
+    zone_x_min = x_origin + ((zone_id - 1) % zone_cols) * zone_width
+    zone_y_min = y_origin + ((zone_id - 1) // zone_cols) * zone_height
+    centroid_x, centroid_y = zone_x_min + zone_width / 2, zone_y_min + zone_height / 2
+    pd.DataFrame({'name': zone_id,
+                  'zone_id': zone_id,
+                  'centroid_x': np.round(centroid_x, 7),
+                  'centroid_y': np.round(centroid_y, 7),
+                  'geometry': _polygon_wkt(zone_x_min, zone_y_min, zone_x_min + zone_width, zone_y_min + zone_height),
+                  'centroid': _point_wkt(centroid_x, centroid_y)}
+                 ).to_csv(path2linux(os.path.join(output_dir, 'zone.csv')), index=False)
+
+    # demand.csv, unique OD pairs sampled at random
+    if number_of_od_pairs is None:
+        number_of_od_pairs = min(number_of_zones ** 2, 100 * number_of_zones)
+    number_of_od_pairs = min(number_of_od_pairs, number_of_zones ** 2)
+    if number_of_od_pairs == number_of_zones ** 2:
+        od_index = np.arange(number_of_od_pairs)
+    else:
+        od_index = np.unique(rng.integers(0, number_of_zones ** 2, int(number_of_od_pairs * 1.1)))
+        od_index = rng.permutation(od_index)[:number_of_od_pairs]
+        od_index.sort()
+    path_demand = path2linux(os.path.join(output_dir, 'demand.csv'))
+    for start in range(0, len(od_index), chunk_size):
+        od = od_index[start:start + chunk_size]
+        o_zone_id, d_zone_id = od // number_of_zones + 1, od % number_of_zones + 1
+        pd.DataFrame({'o_zone_id': o_zone_id,
+                      'd_zone_id': d_zone_id,
+                      'volume': np.round(rng.gamma(1.5, 20.0, len(od)), 2),
+                      'geometry': _linestring_wkt([centroid_x[o_zone_id - 1], centroid_x[d_zone_id - 1]],
+                                                  [centroid_y[o_zone_id - 1], centroid_y[d_zone_id - 1]])}
+                     ).to_csv(path_demand, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+    print(f"Successfully generate a synthetic network of {number_of_nodes} nodes, {number_of_links} links, "
+          f"{number_of_pois} POIs, {number_of_zones} zones and {len(od_index)} OD pairs to {output_dir}")
+    return output_dir
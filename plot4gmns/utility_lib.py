@@ -4,12 +4,14 @@
 # @File    : utility_lib.py
 # obj:
 import os
+import hashlib
+import tarfile
+import zipfile
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Union
 
 target_files = ['node.csv', 'link.csv', 'poi.csv']
-required_files = ['node.csv', 'link.csv', ]
-optional_files = ['poi.csv', 'demand.csv', 'zone.csv']
 
 required_columns = {
     'node': ['x_coord', 'y_coord'],
@@ -18,8 +20,65 @@ required_columns = {
     'demand': ['geometry'],
     'zone': ['geometry']}
 
+# GMNS tables in loading order, nodes are loaded before links
+network_tables = ['node', 'link', 'poi', 'demand', 'zone']
+
+# file extensions of each supported table format, 'auto' prefers columnar files over CSV
+table_formats = {
+    'parquet': ['.parquet', '.geoparquet'],
+    'feather': ['.feather', '.arrow'],
+    'csv': ['.csv']}
+
+# compression of single CSV files by extension, e.g. link.csv.gz, decompressed while parsing
+compression_formats = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.zst': 'zstd'}
+
+# archives of whole datasets, tables are read from the members without extracting the archive
+archive_formats = ['.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz']
+
+# link columns required when link geometries are built from node coordinates
+link_node_columns = ['from_node_id', 'to_node_id']
+
+# demand columns required when OD lines are joined from zone centroids
+demand_od_columns = ['o_zone_id', 'd_zone_id', 'volume']
+
 network_modes = ['all', 'bike', 'walk', 'auto', 'railway']
 
+# link attributes derived at load if missing, length from geometry and the others by facility type
+link_attribute_columns = ['length', 'lanes', 'free_speed', 'capacity']
+
+# default lanes, free_speed (km/h) and capacity (veh/h/lane) by facility type, e.g. for links of 'primary_link'
+# the defaults of 'primary' are used, and unknown facility types get the defaults of 'other'
+default_link_attributes = {
+    'motorway': {'lanes': 4, 'free_speed': 120, 'capacity': 2300},
+    'trunk': {'lanes': 3, 'free_speed': 100, 'capacity': 2200},
+    'primary': {'lanes': 3, 'free_speed': 80, 'capacity': 1800},
+    'secondary': {'lanes': 2, 'free_speed': 60, 'capacity': 1600},
+    'tertiary': {'lanes': 2, 'free_speed': 40, 'capacity': 1200},
+    'residential': {'lanes': 1, 'free_speed': 30, 'capacity': 1000},
+    'living_street': {'lanes': 1, 'free_speed': 15, 'capacity': 800},
+    'unclassified': {'lanes': 1, 'free_speed': 30, 'capacity': 800},
+    'service': {'lanes': 1, 'free_speed': 30, 'capacity': 800},
+    'track': {'lanes': 1, 'free_speed': 20, 'capacity': 800},
+    'cycleway': {'lanes': 1, 'free_speed': 15, 'capacity': 800},
+    'footway': {'lanes': 1, 'free_speed': 5, 'capacity': 800},
+    'railway': {'lanes': 1, 'free_speed': 70, 'capacity': 1000},
+    'connector': {'lanes': 2, 'free_speed': 120, 'capacity': 9999},
+    'other': {'lanes': 1, 'free_speed': 30, 'capacity': 800}}
+
+# cached data of a layer derived from other layers, e.g. demand matrix depends on zone number
+layer_dependencies = {
+    'node': ['link'],
+    'link': [],
+    'poi': [],
+    'demand': ['zone'],
+    'zone': []}
+
+# attribute columns kept in memory in out-of-core mode, other columns stay in the CSV files
+out_of_core_columns = {
+    'link': ['link_id', 'from_node_id', 'to_node_id', 'length', 'lanes', 'free_speed', 'capacity',
+             'facility_type', 'link_type_name', 'allowed_uses'],
+    'poi': ['poi_id', 'name', 'building', 'amenity', 'leisure', 'production', 'attraction', 'activity_zone_id']}
+
 
 class NodeStyle:
     def __init__(self):
@@ -41,6 +100,9 @@ class NodeStyle:
             'give_way': 'darkorange',
             'turning_circle': 'blue',
             'other': 'black'}
+        # draw nodes as a density mesh of 'hex' or 'square' cells instead of markers, None for markers
+        self.aggregation = None
+        self.gridsize = 100
 
 
 class LinkStyle:
@@ -53,6 +115,11 @@ class POIStyle:
     def __init__(self):
         self.facecolor = 'y'
         self.edgecolor = 'black'
+        # draw POI centroids as a density mesh of 'hex' or 'square' cells instead of polygons
+        self.aggregation = None
+        self.gridsize = 100
+        # POI column summed in each cell, e.g. 'production' or 'attraction', None for POI counts
+        self.weight = None
 
 
 class DemandStyle:
@@ -89,36 +156,180 @@ def path2linux(path: Union[str, Path]) -> str:
         return str(path).replace("\\", "/")
 
 
-def validate_filename(path_filename: str, ) -> bool:
-    filename_abspath = path2linux(os.path.abspath(path_filename))
-    return bool(os.path.exists(filename_abspath))
-
-
-def check_dir(input_dir: str,) -> list:
-    files_found = []
-    files_not_found = []
-    for file in required_files + optional_files:
-        path_filename = os.path.join(input_dir, file)
-        if validate_filename(path_filename):
-            files_found.append(file)
+def is_archive(path_filename: str) -> bool:
+    return os.path.isfile(path_filename) and path_filename.lower().endswith(tuple(archive_formats))
+
+
+def split_archive_path(path_filename: str) -> tuple:
+    """split the path of an archive member, e.g. ./scenario.zip/scenario/link.csv.gz
+
+    Returns:
+        tuple: (archive path, member name), or (path_filename, None) if the path is not in an archive
+    """
+    path_filename = path2linux(path_filename)
+    parts = path_filename.split('/')
+    for i in range(len(parts) - 1, 0, -1):
+        archive = '/'.join(parts[:i])
+        if is_archive(archive):
+            return archive, '/'.join(parts[i:])
+    return path_filename, None
+
+
+def list_archive_members(archive: str) -> list:
+    # names of the files in a zip or tar archive
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf:
+            return [info.filename for info in zf.infolist() if not info.is_dir()]
+    with tarfile.open(archive, 'r:*') as tf:
+        return [member.name for member in tf.getmembers() if member.isfile()]
+
+
+@contextmanager
+def open_network_table(path_filename: str):
+    """open a GMNS table file, or a member of a zip or tar archive, as a binary stream
+
+    Members are decompressed while they are read, the archive is not extracted.
+    """
+    archive, member = split_archive_path(path_filename)
+    if member is None:
+        with open(path_filename, 'rb') as f:
+            yield f
+    elif zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf, zf.open(member) as f:
+            yield f
+    else:
+        with tarfile.open(archive, 'r:*') as tf, tf.extractfile(member) as f:
+            yield f
+
+
+def get_table_compression(path_filename: str) -> Union[str, None]:
+    # compression of a table file by its last extension, e.g. 'gzip' for link.csv.gz
+    compression = compression_formats.get(os.path.splitext(path_filename)[-1].lower())
+    if compression == 'zstd':
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            raise Exception("ImportError: zstandard is required to read .zst files, "
+                            "please install it by: pip install zstandard") from None
+    return compression
+
+
+def find_network_tables(input_dir: str, file_format: str = 'csv') -> dict:
+    """find GMNS tables of a file format in the first layer of a folder or in a zip or tar archive
+
+    CSV tables may be compressed, e.g. link.csv.gz or link.csv.zst. Tables in an archive may be
+    in a subfolder, e.g. scenario.zip/scenario/link.csv, and the shallowest one is used.
+
+    Args:
+        input_dir (str): folder of GMNS tables, or a zip or tar archive of them
+        file_format (str): 'csv', 'parquet', 'feather' or 'auto'. For 'auto', Parquet is preferred
+            over Feather and CSV if a table exists in several formats. Defaults to 'csv'.
+
+    Returns:
+        dict: {table name: file path}, e.g. {'node': './node.parquet', 'link': './data.zip/link.csv.gz'},
+            paths of archive members start with the archive path
+    """
+
+    if file_format != 'auto' and file_format not in table_formats:
+        raise Exception(f"ValueError: file_format should be one of {list(table_formats) + ['auto']}")
+    formats = list(table_formats) if file_format == 'auto' else [file_format]
+
+    # candidate files by lower case file name, shallow members of archives first
+    input_dir = path2linux(input_dir)
+    if is_archive(input_dir):
+        members = sorted(list_archive_members(input_dir), key=lambda name: (name.count('/'), name))
+        files = {}
+        for name in members:
+            files.setdefault(name.split('/')[-1].lower(), f"{input_dir}/{name}")
+    else:
+        files = {name.lower(): path2linux(os.path.join(input_dir, name)) for name in os.listdir(input_dir)
+                 if os.path.isfile(os.path.join(input_dir, name))}
+
+    tables_found = {}
+    for table in network_tables:
+        for table_format in formats:
+            compressions = [''] + list(compression_formats) if table_format == 'csv' else ['']
+            candidates = [f"{table}{suffix}{compression}" for suffix in table_formats[table_format]
+                          for compression in compressions]
+            path_filename = next((files[name] for name in candidates if name in files), None)
+            if path_filename:
+                tables_found[table] = path_filename
+                break
+    print(f"The following table(s) was found in the folder: \n \t {[Path(v).name for v in tables_found.values()]}")
+    print(f"The following table(s) was not found in the folder: \n \t "
+          f"{[table for table in network_tables if table not in tables_found]}")
+    return tables_found
+
+
+def import_pyarrow():
+    # pyarrow is only required by Parquet and Feather files
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError:
+        raise Exception("ImportError: pyarrow is required to read and write Parquet and Feather files, "
+                        "please install it by: pip install pyarrow") from None
+    return pyarrow
+
+
+def get_file_fingerprint(path_filename: str, isContentHash: bool = True) -> dict:
+    """get modification time, size and content digest of a file
+
+    For a member of an archive, the modification time and size are those of the archive,
+    and the digest is computed from the decompressed content of the member.
+
+    Args:
+        path_filename (str): file path
+        isContentHash (bool): if True, compute the blake2b digest of the file content. Defaults to True.
+
+    Returns:
+        dict: {'mtime': int, 'size': int, 'digest': str or None}
+    """
+    stat = os.stat(split_archive_path(path_filename)[0])
+    fingerprint = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'digest': None}
+    if isContentHash:
+        file_hash = hashlib.blake2b(digest_size=16)
+        with open_network_table(path_filename) as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                file_hash.update(block)
+        fingerprint['digest'] = file_hash.hexdigest()
+    return fingerprint
+
+
+def get_object_digest(*values) -> str:
+    """get the blake2b digest of parameter values, tables and arrays, e.g. of a network delta
+
+    DataFrames and Series are hashed by rows, arrays by their bytes, lists, tuples and dicts
+    by their items, and other values by their repr.
+
+    Returns:
+        str: hex digest
+    """
+    import numpy as np
+    import pandas as pd
+
+    def update(value) -> None:
+        object_hash.update(type(value).__name__.encode())
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            object_hash.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+            object_hash.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        elif isinstance(value, np.ndarray) and value.dtype != object:
+            object_hash.update(f"{value.dtype}{value.shape}".encode())
+            object_hash.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, (list, tuple, set, frozenset, np.ndarray)):
+            items = sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value
+            object_hash.update(str(len(items)).encode())
+            for item in items:
+                update(item)
+        elif isinstance(value, dict):
+            update(sorted(value.items(), key=lambda item: repr(item[0])))
         else:
-            files_not_found.append(file)
-    print(f"The following file(s) was found in the folder: \n \t {files_found}")
-    print(f"The following file(s) was not found in the folder: \n \t {files_not_found}")
-
-    return files_found
-
-
-def get_file_names_from_folder_by_type(dir_name: str, file_type: str = "txt",
-                                       isTraverseSubdirectory: bool = False) -> list:
-    if isTraverseSubdirectory:
-        files_list = []
-        for root, dirs, files in os.walk(dir_name):
-            files_list.extend([os.path.join(root, file) for file in files])
-        return [path2linux(file) for file in files_list if file.split(".")[-1] == file_type]
+            object_hash.update(repr(value).encode())
 
-    # files in the first layer of the folder
-    return [path2linux(os.path.join(dir_name, file)) for file in os.listdir(dir_name) if file.split(".")[-1] == file_type]
+    object_hash = hashlib.blake2b(digest_size=16)
+    update(values)
+    return object_hash.hexdigest()
 
 
 def check_required_files_exist(required_files: list, dir_files: list) -> bool:
@@ -0,0 +1,141 @@
+# -*- coding:utf-8 -*-
+##############################################################
+# Created Date: Monday, October 19th 2026
+# Contact Info: luoxiangyong01@gmail.com
+# Author/Copyright: Mr. Xiangyong Luo
+##############################################################
+
+import numpy as np
+import pandas as pd
+from .network import MultiNet
+from .geometry_lib import GEOM_EMPTY, GEOM_LINESTRING
+
+# id column of each layer, demand rows are identified by their OD pair
+layer_id_columns = {'node': 'node_id', 'link': 'link_id', 'poi': 'poi_id', 'zone': 'zone_id'}
+
+# checks of the validator and whether failed rows are dropped by isDropInvalid
+validation_checks = {
+    'duplicate_id': True,  # rows of an id that appeared before, the first row is kept
+    'invalid_coordinates': True,  # nodes with missing or non-numeric x_coord or y_coord
+    'dangling_node': True,  # links whose from_node_id or to_node_id is not a node
+    'empty_geometry': True,  # missing, EMPTY or unparsable WKT
+    'invalid_geometry': True,  # lines with less than 2 vertices, rings with less than 4, or non-finite vertices
+    'unknown_zone': True,  # demand rows whose o_zone_id or d_zone_id is not a zone
+    'zone_id_range': False,  # zone ids outside 1..N (N zones), demand rows of them are dropped instead
+}
+
+
+def get_invalid_geometries(buffer) -> tuple:
+    """empty and invalid flags of every geometry of a GeometryBuffer, by vectorized checks of the offsets
+
+    Returns:
+        tuple: (isEmpty, isInvalid) boolean arrays of len(buffer)
+    """
+    number_of_geometries = len(buffer)
+    geom_types = np.asarray(buffer.geom_types)
+    parts_per_geometry = np.diff(np.asarray(buffer.geom_offsets))
+    part_geometry = np.repeat(np.arange(number_of_geometries), parts_per_geometry)
+    vertex_counts = np.diff(np.asarray(buffer.part_offsets))
+    min_vertices = np.where(geom_types[part_geometry] == GEOM_LINESTRING, 2, 4)
+    isPartInvalid = vertex_counts < min_vertices
+
+    # non-finite vertices are counted per part
+    isNonFinite = ~np.isfinite(np.asarray(buffer.coords)).all(axis=1)
+    if isNonFinite.any():
+        part_of_vertex = np.repeat(np.arange(len(vertex_counts)), vertex_counts)
+        isPartInvalid |= np.bincount(part_of_vertex[isNonFinite], minlength=len(vertex_counts)) > 0
+
+    isEmpty = (geom_types == GEOM_EMPTY) | (parts_per_geometry == 0)
+    isInvalid = np.bincount(part_geometry[isPartInvalid], minlength=number_of_geometries) > 0
+    return isEmpty, isInvalid & ~isEmpty
+
+
+def validate_multi_network(mnet: MultiNet, isDropInvalid: bool = False, sample_size: int = 5) -> pd.DataFrame:
+    """check the integrity of the loaded GMNS tables with vectorized joins and set operations
+
+    Layers are checked in the order node, link, poi, zone and demand. If isDropInvalid is True,
+    failed rows are dropped from each layer before the next layer is checked, e.g. links of dropped
+    nodes are reported as dangling. Zones outside 1..N are only reported, as they can be drawn, and
+    demand rows of them are dropped, as the demand matrix is indexed by zone_id.
+
+    Args:
+        mnet (MultiNet): MultiNet object
+        isDropInvalid (bool): if True, drop the failed rows, see validation_checks. Defaults to False.
+        sample_size (int): number of sample ids of each failed check in the report. Defaults to 5.
+
+    Returns:
+        pd.DataFrame: one row of each failed check: layer, check, number_of_rows, sample (ids, or OD
+            pairs of demand rows) and isDropped. Empty if all checks pass.
+    """
+
+    report = []
+    changed_elements = []
+
+    def add_failed_rows(element: str, layer, check: str, isFailed: np.ndarray, isDropped: bool = None) -> None:
+        if not isFailed.any():
+            return
+        rows = layer.value[isFailed]
+        if element == 'demand':
+            sample = list(zip(rows['o_zone_id'].head(sample_size).tolist(), rows['d_zone_id'].head(sample_size).tolist()))
+        elif layer_id_columns[element] in rows.columns:
+            sample = rows[layer_id_columns[element]].head(sample_size).tolist()
+        else:
+            sample = rows.index[:sample_size].tolist()
+        isDropped = validation_checks[check] if isDropped is None else isDropped
+        report.append({'layer': element, 'check': check, 'number_of_rows': int(isFailed.sum()),
+                       'sample': sample, 'isDropped': isDropInvalid and isDropped})
+        if isDropInvalid and isDropped:
+            dropped[element] |= isFailed
+
+    layers = {'node': (mnet.node, mnet.node_loaded), 'link': (mnet.link, mnet.link_loaded),
+              'poi': (mnet.POI, mnet.POI_loaded), 'zone': (mnet.zone, mnet.zone_loaded),
+              'demand': (mnet.demand, mnet.demand_loaded)}
+    dropped = {}
+    for element, (layer, isLoaded) in layers.items():
+        if not isLoaded or layer.value is None:
+            continue
+        df = layer.value
+        dropped[element] = np.zeros(len(df), dtype=np.bool_)
+
+        id_column = layer_id_columns.get(element)
+        if id_column in df.columns:
+            add_failed_rows(element, layer, 'duplicate_id', df[id_column].duplicated().to_numpy())
+
+        if element == 'node':
+            coords = df[['x_coord', 'y_coord']].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+            add_failed_rows(element, layer, 'invalid_coordinates', ~np.isfinite(coords).all(axis=1))
+
+        if element == 'link' and mnet.node_loaded and {'from_node_id', 'to_node_id'} <= set(df.columns):
+            node_ids = mnet.node.value['node_id']
+            add_failed_rows(element, layer, 'dangling_node',
+                            ~(df['from_node_id'].isin(node_ids) & df['to_node_id'].isin(node_ids)).to_numpy())
+
+        if getattr(layer, 'geometry', None) is not None and 'geometry_id' in df.columns:
+            isEmpty, isInvalid = get_invalid_geometries(layer.geometry)
+            geometry_ids = df['geometry_id'].to_numpy()
+            add_failed_rows(element, layer, 'empty_geometry', isEmpty[geometry_ids])
+            add_failed_rows(element, layer, 'invalid_geometry', isInvalid[geometry_ids])
+
+        if element == 'zone':
+            zone_ids = pd.to_numeric(df['zone_id'], errors='coerce')
+            add_failed_rows(element, layer, 'zone_id_range', ~zone_ids.between(1, len(df)).to_numpy())
+
+        if element == 'demand' and mnet.zone_loaded:
+            zones = mnet.zone.value
+            isKnown = (df['o_zone_id'].isin(zones['zone_id']) & df['d_zone_id'].isin(zones['zone_id'])).to_numpy()
+            add_failed_rows(element, layer, 'unknown_zone', ~isKnown)
+            o_zone_ids = pd.to_numeric(df['o_zone_id'], errors='coerce')
+            d_zone_ids = pd.to_numeric(df['d_zone_id'], errors='coerce')
+            isInRange = (o_zone_ids.between(1, len(zones)) & d_zone_ids.between(1, len(zones))).to_numpy()
+            add_failed_rows(element, layer, 'zone_id_range', isKnown & ~isInRange, True)
+
+        # rows are dropped before the next layer is checked, row labels of the kept rows are unchanged
+        if dropped[element].any():
+            layer.value = df[~dropped[element]]
+            changed_elements.append(element)
+
+    if changed_elements:
+        mnet.update_data_digest('validation', {element: np.flatnonzero(dropped[element]) for element in changed_elements})
+        mnet.clear_cache(changed_elements)
+        print(f"Invalid rows are dropped: { {element: int(dropped[element].sum()) for element in changed_elements} }")
+    return pd.DataFrame(report, columns=['layer', 'check', 'number_of_rows', 'sample', 'isDropped'])
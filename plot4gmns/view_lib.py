@@ -0,0 +1,215 @@
+# -*- coding:utf-8 -*-
+##############################################################
+# Created Date: Monday, October 19th 2026
+# Contact Info: luoxiangyong01@gmail.com
+# Author/Copyright: Mr. Xiangyong Luo
+##############################################################
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.collections import Collection, LineCollection, PolyCollection
+from .network import MultiNet
+from .stats_lib import start_stats
+
+# filters of NetworkView.update: link filters by a list of categories, or by a (min, max) range of a column
+view_category_filters = {'modes': None, 'link_types': 'facility_type'}
+view_range_filters = {'lanes': 'lanes', 'free_speed': 'free_speed', 'length': 'length', 'capacity': 'capacity'}
+
+
+class NetworkView:
+    """a figure bound to a MultiNet, whose node, link and POI artists are updated in place by filters
+
+    All layers are drawn once when the view is created, and the path of every link and POI is built
+    once. A filter change only selects rows with vectorized masks, swaps the paths and node offsets of
+    the existing artists and redraws the canvas, so sliders and widgets stay responsive on large
+    networks. The axis limits are fixed to the full network. Nodes are drawn as markers and POIs as
+    polygons, node_style.aggregation and poi_style.aggregation are not used by the view.
+
+    The view reads the layers as they are when it is created, create a new view after the layers of
+    the MultiNet are changed, e.g. by apply_network_delta or refresh.
+    """
+
+    def __init__(self, mnet: MultiNet, fig_obj: plt = None):
+        """
+        Args:
+            mnet (MultiNet): MultiNet object
+            fig_obj (plt): figure object (plt). If not None, the view draws on its current axes.
+        """
+
+        self.mnet = mnet
+        self.filters = {}  # {filter: value} of the current selection, see update
+        self.link_mask = None  # boolean mask of the selected link rows
+        self.node_mask = None  # boolean mask of the drawn node rows
+        self.poi_mask = None  # boolean mask of the selected POI rows
+        self.link_collection = None
+        self.node_collection = None
+        self.poi_collection = None
+        self._columns = {}  # numeric link columns of range filters, converted on first use
+
+        if fig_obj:
+            # fig_obj is the plt returned by show_* functions, or a figure
+            self.fig = fig_obj.gcf() if hasattr(fig_obj, 'gcf') else fig_obj
+            self.ax = fig_obj.gca()
+        else:
+            self.fig, self.ax = plt.subplots(figsize=mnet.style.figure_size, dpi=mnet.style.dpi)
+
+        if mnet.node_loaded:
+            node_style = mnet.style.node_style
+            self._node_xy = mnet.node.value[['x_coord', 'y_coord']].to_numpy(dtype=float)
+            self.node_collection = self.ax.scatter(self._node_xy[:, 0],
+                                                   self._node_xy[:, 1],
+                                                   marker=node_style.markers['other'],
+                                                   c=node_style.colors['other'],
+                                                   s=node_style.size,
+                                                   edgecolors=node_style.edgecolors,
+                                                   zorder=2)
+
+        if mnet.link_loaded:
+            self.link_collection = LineCollection(mnet.link.get_link_coords(mnet.link.value),
+                                                  colors=mnet.style.link_style.linecolor,
+                                                  linewidths=mnet.style.link_style.linewidth,
+                                                  zorder=1)
+            self.ax.add_collection(self.link_collection)
+            self._link_paths = np.empty(len(mnet.link.value), dtype=object)
+            self._link_paths[:] = self.link_collection.get_paths()
+            if mnet.node_loaded:
+                # row positions of the end nodes of each link, -1 for unknown nodes
+                node_ids = pd.Index(mnet.node.value['node_id'])
+                self._link_nodes = np.concatenate([node_ids.get_indexer(mnet.link.value['from_node_id']),
+                                                   node_ids.get_indexer(mnet.link.value['to_node_id'])])
+                self._link_nodes = self._link_nodes.reshape(2, -1)
+
+        if mnet.POI_loaded:
+            self.poi_collection = PolyCollection(mnet.POI.get_poi_coords(mnet.POI.value),
+                                                 alpha=0.7,
+                                                 facecolors=mnet.style.poi_style.facecolor,
+                                                 edgecolors=mnet.style.poi_style.edgecolor,
+                                                 zorder=0)
+            self.ax.add_collection(self.poi_collection)
+            self._poi_paths = np.empty(len(mnet.POI.value), dtype=object)
+            self._poi_paths[:] = self.poi_collection.get_paths()
+
+        self.ax.autoscale_view()
+        self.ax.set_autoscale_on(False)
+        self.ax.set_xlabel('x_coord')
+        self.ax.set_ylabel('y_coord')
+        self.fig.tight_layout()
+
+    def __repr__(self) -> str:
+        number_of_links = 0 if self.link_mask is None else int(self.link_mask.sum())
+        return f"NetworkView(filters={self.filters}, links={number_of_links})"
+
+    def update(self, **filters) -> int:
+        """change filters of the view and update the drawn artists in place, other filters are kept
+
+        Args:
+            modes (list): network modes of links, e.g. ['auto', 'bike'], 'all' means no filter.
+            link_types (list): facility_type of links.
+            lanes, free_speed, length, capacity (tuple): (min, max) range of the link column, bounds included.
+            poi_types (list): building, amenity or leisure types of POIs.
+            A filter set to None is removed.
+
+        Returns:
+            int: number of selected links
+        """
+
+        unknown_filters = set(filters) - set(view_category_filters) - set(view_range_filters) - {'poi_types'}
+        if unknown_filters:
+            raise Exception(f"ValueError: unknown filters {sorted(unknown_filters)}, please use "
+                            f"{list(view_category_filters) + list(view_range_filters) + ['poi_types']}")
+        for name, value in filters.items():
+            if value is None:
+                self.filters.pop(name, None)
+            else:
+                self.filters[name] = value
+
+        stats = start_stats('NetworkView.update', self.mnet.isStats)
+        self._check_layers()
+        self.link_mask = self.get_link_mask()
+        self.node_mask = self.get_node_mask(self.link_mask)
+        self.poi_mask = self.get_poi_mask()
+        stats.lap('selection', int(self.link_mask.sum()) if self.link_mask is not None else None)
+
+        # the prebuilt paths are reused, set_paths of Line- and PolyCollection would rebuild them from vertices
+        if self.link_collection is not None:
+            Collection.set_paths(self.link_collection, self._link_paths[self.link_mask].tolist())
+        if self.node_collection is not None:
+            self.node_collection.set_offsets(self._node_xy[self.node_mask])
+        if self.poi_collection is not None:
+            Collection.set_paths(self.poi_collection, self._poi_paths[self.poi_mask].tolist())
+        self.fig.canvas.draw_idle()
+        stats.lap('artist_update')
+
+        stats.finish(self.mnet)
+        return 0 if self.link_mask is None else int(self.link_mask.sum())
+
+    def reset(self) -> int:
+        """remove all filters and draw the full network
+
+        Returns:
+            int: number of links
+        """
+        return self.update(**{name: None for name in self.filters})
+
+    def get_link_mask(self) -> np.ndarray:
+        # boolean mask of the links passing all filters, None if links are not loaded
+        if not self.mnet.link_loaded:
+            return None
+        df = self.mnet.link.value
+        mask = np.ones(len(df), dtype=bool)
+
+        modes = self.filters.get('modes')
+        if modes is not None and 'all' not in modes:
+            isMode = np.zeros(len(df), dtype=bool)
+            for mode in modes:
+                if mode not in df.columns:
+                    raise Exception(f"ValueError: '{mode}' mode not found")
+                isMode |= df[mode].to_numpy() == True
+            mask &= isMode
+
+        if self.filters.get('link_types') is not None:
+            if view_category_filters['link_types'] not in df.columns:
+                raise Exception(f"ValueError: {view_category_filters['link_types']} not found in the link table")
+            mask &= df[view_category_filters['link_types']].isin(self.filters['link_types']).to_numpy()
+
+        for name, column in view_range_filters.items():
+            if self.filters.get(name) is None:
+                continue
+            if column not in self._columns:
+                if column not in df.columns:
+                    raise Exception(f"ValueError: {column} not found in the link table")
+                self._columns[column] = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+            min_v, max_v = self.filters[name]
+            mask &= (self._columns[column] >= min_v) & (self._columns[column] <= max_v)
+        return mask
+
+    def get_node_mask(self, link_mask: np.ndarray) -> np.ndarray:
+        # nodes of the selected links, or all nodes if no link is filtered out, like extract_coordinates_by_*
+        if not self.mnet.node_loaded:
+            return None
+        mask = np.ones(len(self._node_xy), dtype=bool)
+        if link_mask is None or link_mask.all():
+            return mask
+        mask[:] = False
+        node_positions = self._link_nodes[:, link_mask].ravel()
+        mask[node_positions[node_positions >= 0]] = True
+        return mask
+
+    def get_poi_mask(self) -> np.ndarray:
+        # POIs of the poi_types filter, all POIs if it is not set
+        if not self.mnet.POI_loaded:
+            return None
+        df = self.mnet.POI.value
+        poi_types = self.filters.get('poi_types')
+        if poi_types is None:
+            return np.ones(len(df), dtype=bool)
+        return (df['building'].isin(poi_types) | df['amenity'].isin(poi_types) | df['leisure'].isin(poi_types)).to_numpy()
+
+    def _check_layers(self) -> None:
+        # the prebuilt artists are only valid for the layers the view was created from
+        layers = [(self.link_collection, '_link_paths', self.mnet.link), (self.node_collection, '_node_xy', self.mnet.node),
+                  (self.poi_collection, '_poi_paths', self.mnet.POI)]
+        for collection, attribute, layer in layers:
+            if collection is not None and len(getattr(self, attribute)) != len(layer.value):
+                raise Exception("ValueError: layers of the MultiNet are changed, please create a new NetworkView")